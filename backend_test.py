@@ -2,27 +2,186 @@
 """
 Comprehensive Backend API Tests for Velan Properties
 Tests Contact Form API, Properties API, and Property CRUD Operations
+
+Usage:
+    python backend_test.py                   functional tests against --base-url (default: the preview deployment)
+    python backend_test.py --local           functional tests against an in-process local_backend; tests of
+                                             features only the stand-in has are skipped without --local
+    python backend_test.py --load            concurrent load test (--workers, --rate, --duration); writes
+                                             contacts and listings, so a non-local --base-url also needs
+                                             --allow-remote-writes
+    python backend_test.py --pool-sizes 2,8  connection pool benchmark, one local backend per pool size
+    python backend_test.py --benchmark       sequential benchmark on a seeded local backend, compared with
+                                             --baseline (default benchmark_baseline.json) within --tolerance
+                                             and --noise-floor; --update-baseline records a new baseline
+                                             instead, and a run with no baseline fails
 """
 
-import requests
+import argparse
+import base64
+import io
+import ipaddress
 import json
+import math
+import os
+import platform
+import re
+import struct
+import tempfile
+import threading
+import time
 import uuid
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
+from urllib.parse import urlsplit
+
+import requests
+
+from local_backend import LocalAPI, LocalBackend, MemoryDatabase
+from local_backend.models import location_keys, parse_area, parse_price, parse_price_unit
+from local_backend.sample_data import generate_properties
+
+try:
+    from PIL import Image
+except ImportError:  # optional; only used to inspect rendered image variants
+    Image = None
 
 # Configuration
 BASE_URL = "https://trusted-estates.preview.emergentagent.com/api"
 TIMEOUT = 30
 
+# Load test configuration
+LOAD_WORKERS = 16
+LOAD_RATE = 50  # target requests per second across all workers (0 = as fast as possible)
+LOAD_DURATION = 30  # seconds
+LOAD_MIX = {
+    "list_properties": 6,
+    "submit_contact": 2,
+    "property_crud": 2
+}
+
+# Benchmark configuration (local backend only)
+BENCHMARK_SIZES = [1000, 10000, 50000]  # listing counts to grow the collection through
+BENCHMARK_QUERIES = 30  # timed requests per query per size
+FLAT_LATENCY_TOLERANCE = 3.0  # max ratio of largest to smallest median latency that still counts as flat
+PAGINATION_PAGES = 200  # pages walked per mode in the deep-pagination benchmark
+PAGINATION_LIMIT = 50
+BULK_IMPORT_ROWS = 500  # rows imported per mode in the bulk vs per-item benchmark
+UNREAD_BODY_SIZE = 2 * 1024 * 1024  # request body the server ignores, past what it drains to keep the connection
+NOTIFIER_DELAY = 0.5  # seconds the stand-in notifier takes per delivery
+NOTIFICATION_CONTACTS = 12
+DUPLICATE_SUBMISSIONS = 8  # identical contact submissions fired in parallel
+RATE_LIMIT_BURST = 5  # per-IP contact burst on the rate limit test backend
+RETRY_REFILL_PERIOD = 0.5  # seconds for the single-token IP bucket of the retry test backend to refill
+SEARCH_BENCHMARK_LISTINGS = 5000  # listings seeded for the search latency benchmark
+SEARCH_LATENCY_BUDGET_MS = 50  # max median latency of a search request
+POOL_SIZES = [1, 4, 16]  # connection pool sizes compared by the pool benchmark
+POOL_DB_LATENCY = 0.002  # simulated database round trip per operation, seconds
+POOL_CONNECT_LATENCY = 0.02  # simulated cost of opening one pooled connection, seconds
+POOL_BENCHMARK_DURATION = 10  # seconds of load per pool size
+IMAGE_SOURCE_SIZE = (1600, 1000)  # width, height of the generated upload
+IMAGE_READY_TIMEOUT = 30  # seconds to wait for variants to be rendered
+ANALYTICS_BENCHMARK_SIZES = [1000, 10000, 100000]  # listing counts the analytics benchmark grows through
+CHANGE_FEED_CHURN = 30  # listings created, updated and deleted to exercise change feed compaction
+
+# Performance regression harness
+REGRESSION_SCENARIOS = ["list_properties", "filtered_listing", "paginate", "submit_contact", "property_crud", "dashboard"]
+REGRESSION_LISTINGS = 10000  # listings seeded into the benchmark backend
+REGRESSION_ITERATIONS = 200  # timed runs per scenario
+REGRESSION_WARMUP = 20  # untimed runs per scenario before timing starts
+REGRESSION_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+REGRESSION_TOLERANCES = {"p50": 0.25, "p95": 0.50}  # allowed slowdown against the baseline, as a fraction
+# Metrics a tolerance can be set for, and which way is better
+REGRESSION_METRICS = {"p50": "lower", "p95": "lower", "p99": "lower", "throughput": "higher"}
+REGRESSION_NOISE_FLOOR_MS = 0.5  # slowdowns smaller than this are never reported as regressions
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def make_png(width, height, tint=128, alpha=None):
+    """A gradient PNG built with zlib, so the tester needs no imaging library; RGBA when alpha is given"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # filter type: none
+        for x in range(width):
+            rows += bytes((x * 255 // width, y * 255 // height, tint))
+            if alpha is not None:
+                rows.append(alpha)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2 if alpha is None else 6, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(bytes(rows))) + chunk(b"IEND", b"")
+
+
+METRIC_LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+METRIC_LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+
+def scrape_metrics(base_url):
+    """Parse the backend's Prometheus /metrics export into {name: [(labels, value)]}"""
+    try:
+        response = requests.get(f"{base_url}/metrics", timeout=TIMEOUT)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    metrics = defaultdict(list)
+    for line in response.text.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            metrics[name].append((dict(METRIC_LABEL.findall(labels)), float(value)))
+    return metrics
+
+
+def print_server_metrics(base_url):
+    """Print the server-side view of each route: requests, mean latency and where the time went"""
+    metrics = scrape_metrics(base_url)
+    if not metrics:
+        print("\nServer metrics: not available")
+        return
+    routes = defaultdict(lambda: defaultdict(float))
+    for name, field in (("velan_http_request_duration_seconds_sum", "seconds"),
+                        ("velan_http_request_duration_seconds_count", "requests"),
+                        ("velan_http_response_size_bytes_sum", "bytes")):
+        for labels, value in metrics.get(name, []):
+            routes[(labels["method"], labels["route"])][field] += value
+    for labels, value in metrics.get("velan_http_request_phase_seconds_sum", []):
+        routes[(labels["method"], labels["route"])][labels["phase"]] += value
+
+    print("\nSERVER METRICS (per route):")
+    for (method, route), stats in sorted(routes.items()):
+        requests_seen = stats["requests"]
+        if not requests_seen:
+            continue
+        total = stats["seconds"] or 1.0
+        split = " / ".join(f"{phase} {stats[phase] / total * 100:.0f}%" for phase in ("db", "serialize", "app"))
+        print(f"  {method} {route}: {requests_seen:.0f} requests, "
+              f"mean {stats['seconds'] / requests_seen * 1000:.2f} ms ({split}), "
+              f"mean response {stats['bytes'] / requests_seen / 1024:.1f} KiB")
+
+
 class VelanPropertiesAPITester:
-    def __init__(self):
-        self.base_url = BASE_URL
+    def __init__(self, base_url=BASE_URL, local_backend=None):
+        self.base_url = base_url
+        self.local_backend = local_backend
         self.session = requests.Session()
         self.session.timeout = TIMEOUT
         self.test_results = {
             "contact_form_api": {"passed": 0, "failed": 0, "details": []},
             "properties_api": {"passed": 0, "failed": 0, "details": []},
-            "property_crud": {"passed": 0, "failed": 0, "details": []}
+            "property_crud": {"passed": 0, "failed": 0, "details": []},
+            "admin_dashboard": {"passed": 0, "failed": 0, "details": []},
+            "performance": {"passed": 0, "failed": 0, "details": []}
         }
         
     def log_result(self, category, test_name, passed, details=""):
@@ -158,6 +317,223 @@ class VelanPropertiesAPITester:
                               f"Should reject short name, got HTTP {response.status_code}")
         except Exception as e:
             self.log_result("contact_form_api", "Name Length Validation", False, str(e))
+        
+        # Test 6: Cursor pagination of contacts
+        if not self.local_backend:
+            print("⚠️  Skipped: cursor pagination is only implemented by the local backend stand-in (--local)")
+        else:
+            try:
+                response = self.session.get(f"{self.base_url}/contacts", params={"cursor": "", "limit": 2})
+                if response.status_code == 200:
+                    data = response.json()
+                    if isinstance(data.get("items"), list) and len(data["items"]) <= 2 and "next_cursor" in data:
+                        self.log_result("contact_form_api", "Contacts Cursor Pagination", True, 
+                                      f"Got {len(data['items'])} contacts, next_cursor={'set' if data['next_cursor'] else 'null'}")
+                    else:
+                        self.log_result("contact_form_api", "Contacts Cursor Pagination", False, 
+                                      f"Invalid response structure: {data}")
+                else:
+                    self.log_result("contact_form_api", "Contacts Cursor Pagination", False, 
+                                  f"HTTP {response.status_code}: {response.text}")
+            except Exception as e:
+                self.log_result("contact_form_api", "Contacts Cursor Pagination", False, str(e))
+        
+        # Tests 7-9: Duplicate submissions store exactly one contact
+        if not self.local_backend:
+            print("⚠️  Skipped: idempotent submissions are only implemented by the local backend stand-in (--local)")
+        else:
+            self.check_duplicate_submissions()
+    
+    def _stored_contacts(self, message):
+        """Contacts among the newest 100 whose message is exactly message"""
+        response = self.session.get(f"{self.base_url}/contacts", params={"limit": 100})
+        return [contact for contact in response.json() if contact["message"] == message]
+    
+    def check_duplicate_submissions(self):
+        """Fire the same submission in parallel, with and without an Idempotency-Key"""
+        def submit(payload, headers=None):
+            response = requests.post(f"{self.base_url}/contacts", json=payload, headers=headers, timeout=TIMEOUT)
+            return response.status_code, response.json().get("contact_id"), response.headers.get("Idempotent-Replayed")
+        
+        # Test 7: Identical content sent in parallel (a double-clicked form)
+        try:
+            contact = {
+                "name": "Meena Krishnan",
+                "email": "meena.krishnan@example.com",
+                "message": f"Please share the brochure for the Bagalur Road villas. Ref {uuid.uuid4()}"
+            }
+            with ThreadPoolExecutor(max_workers=DUPLICATE_SUBMISSIONS) as pool:
+                results = list(pool.map(lambda _: submit(contact), range(DUPLICATE_SUBMISSIONS)))
+            stored = self._stored_contacts(contact["message"])
+            ids = {contact_id for _, contact_id, _ in results}
+            replayed = sum(1 for _, _, flag in results if flag == "true")
+            self.log_result("contact_form_api", "Parallel Duplicate Submissions", 
+                          all(status == 200 for status, _, _ in results) and len(stored) == 1 and len(ids) == 1, 
+                          f"{DUPLICATE_SUBMISSIONS} parallel requests -> {len(stored)} stored, {len(ids)} contact id(s), "
+                          f"{replayed} replayed")
+        except Exception as e:
+            self.log_result("contact_form_api", "Parallel Duplicate Submissions", False, str(e))
+        
+        # Test 8: Client retries carrying one Idempotency-Key
+        try:
+            key = str(uuid.uuid4())
+            contact = {
+                "name": "Vignesh Rao",
+                "email": "vignesh.rao@example.com",
+                "message": f"Is the Zuzuvadi plot still available? Ref {key}"
+            }
+            with ThreadPoolExecutor(max_workers=DUPLICATE_SUBMISSIONS) as pool:
+                results = list(pool.map(lambda _: submit(contact, {"Idempotency-Key": key}), range(DUPLICATE_SUBMISSIONS)))
+            stored = self._stored_contacts(contact["message"])
+            self.log_result("contact_form_api", "Idempotency-Key Retries", 
+                          all(status == 200 for status, _, _ in results) and len(stored) == 1 and 
+                          len({contact_id for _, contact_id, _ in results}) == 1, 
+                          f"{DUPLICATE_SUBMISSIONS} parallel requests -> {len(stored)} stored")
+            
+            # Test 9: Reusing the key for different content is rejected
+            status, _, _ = submit(dict(contact, message="A different question entirely."), {"Idempotency-Key": key})
+            self.log_result("contact_form_api", "Idempotency-Key Reuse Rejected", status == 422, f"HTTP {status}")
+        except Exception as e:
+            self.log_result("contact_form_api", "Idempotency-Key Retries", False, str(e))
+    
+    def test_contact_rate_limits(self):
+        """Test per-IP and per-email contact rate limits on a dedicated backend (local backend only)"""
+        print("\n=== Testing Contact Rate Limits ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: needs a local backend with tight limits (--local)")
+            return
+        
+        backend = LocalBackend(api=LocalAPI(seed=False, contact_ip_limit=(RATE_LIMIT_BURST, 60.0),
+                                            contact_email_limit=(2, 600.0))).start()
+        try:
+            def submit(n, email):
+                return requests.post(f"{backend.base_url}/contacts", timeout=TIMEOUT, json={
+                    "name": "Rate Tester", "email": email, "message": f"Rate limit test inquiry {n}"
+                })
+            
+            # Test 1: The email bucket runs out first
+            statuses = [submit(n, "same.sender@example.com").status_code for n in range(3)]
+            self.log_result("contact_form_api", "Per-Email Rate Limit", statuses == [200, 200, 429], f"statuses {statuses}")
+            
+            # Test 2: Then the IP bucket, whatever the email, with a Retry-After hint
+            responses = [submit(n, f"sender{n}@example.com") for n in range(RATE_LIMIT_BURST)]
+            statuses = [response.status_code for response in responses]
+            allowed = RATE_LIMIT_BURST - 2  # two tokens went to the accepted same-sender submissions
+            limited = responses[-1]
+            self.log_result("contact_form_api", "Per-IP Rate Limit", 
+                          statuses == [200] * allowed + [429] * (RATE_LIMIT_BURST - allowed) and 
+                          int(limited.headers.get("Retry-After", 0)) > 0, 
+                          f"statuses {statuses}, Retry-After {limited.headers.get('Retry-After')}")
+            
+            stored = backend.api.db.contacts.count()
+            self.log_result("contact_form_api", "Rate Limited Submissions Not Stored", stored == allowed + 2, 
+                          f"{stored} contacts stored")
+        except Exception as e:
+            self.log_result("contact_form_api", "Contact Rate Limits", False, str(e))
+        finally:
+            backend.stop()
+        
+        # Tests 4-5: A rate limited Idempotency-Key does not stay claimed
+        self.check_retry_after_rate_limit()
+    
+    def check_retry_after_rate_limit(self):
+        """A retry of a rate limited submission with the same Idempotency-Key is processed afresh, not answered 409"""
+        backend = LocalBackend(api=LocalAPI(seed=False, contact_ip_limit=(1, RETRY_REFILL_PERIOD))).start()
+        try:
+            headers = {"Idempotency-Key": str(uuid.uuid4())}
+            
+            def submit(n):
+                return requests.post(f"{backend.base_url}/contacts", timeout=TIMEOUT, headers=headers if n else {}, json={
+                    "name": "Retry Tester", "email": f"retry{n}@example.com", "message": "Retry after rate limit test"
+                })
+            
+            submit(0)  # uses up the IP bucket
+            limited = submit(1)
+            time.sleep(RETRY_REFILL_PERIOD * 1.5)
+            retry = submit(1)
+            replay = submit(1)
+            self.log_result("contact_form_api", "Retry After Rate Limit", 
+                          limited.status_code == 429 and retry.status_code == 200 and 
+                          "Idempotent-Replayed" not in retry.headers and replay.status_code == 200 and 
+                          replay.json().get("contact_id") == retry.json().get("contact_id"), 
+                          f"HTTP {limited.status_code}, retry HTTP {retry.status_code}, then HTTP {replay.status_code} "
+                          f"(replayed: {replay.headers.get('Idempotent-Replayed')})")
+        except Exception as e:
+            self.log_result("contact_form_api", "Retry After Rate Limit", False, str(e))
+        finally:
+            backend.stop()
+        
+        # Duplicates waiting on a submission that then fails take over instead of answering 409
+        db = MemoryDatabase(pool_size=1, wait_timeout=POOL_DB_LATENCY * 50, latency=POOL_DB_LATENCY * 200)
+        backend = LocalBackend(api=LocalAPI(db, seed=False, contact_ip_limit=None, contact_email_limit=None)).start()
+        try:
+            with ThreadPoolExecutor(max_workers=DUPLICATE_SUBMISSIONS + 1) as pool:
+                blocker = pool.submit(submit, 0)  # holds the only connection past the original's pool timeout
+                time.sleep(POOL_DB_LATENCY * 10)
+                original = pool.submit(submit, 1)
+                time.sleep(POOL_DB_LATENCY * 10)
+                duplicates = [pool.submit(submit, 1) for _ in range(DUPLICATE_SUBMISSIONS - 1)]
+                statuses = [future.result().status_code for future in [blocker, original, *duplicates]]
+            self.log_result("contact_form_api", "Duplicates Of Failed Submission Not Stuck", 
+                          409 not in statuses and 200 in statuses[1:], f"statuses {statuses}")
+        except Exception as e:
+            self.log_result("contact_form_api", "Duplicates Of Failed Submission Not Stuck", False, str(e))
+        finally:
+            backend.stop()
+    
+    def test_contact_notifications(self):
+        """Test that contact notifications are delivered off the request path (local backend only)"""
+        print("\n=== Testing Contact Notification Pipeline ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: plugging in a slow notifier needs the local backend (--local)")
+            return
+        
+        queue = self.local_backend.api.notifications
+        delivered = []
+        attempts = defaultdict(int)
+        lock = threading.Lock()
+        
+        def slow_flaky_notifier(contact):
+            """Stand-in provider: slow, and fails the first attempt for every third contact"""
+            time.sleep(NOTIFIER_DELAY)
+            with lock:
+                attempts[contact["id"]] += 1
+                if contact["name"].endswith(("0", "3", "6", "9")) and attempts[contact["id"]] == 1:
+                    raise ConnectionError("provider unavailable")
+                delivered.append(contact["id"])
+        
+        original = (queue.notifier, queue.base_delay)
+        queue.notifier, queue.base_delay = slow_flaky_notifier, 0.05
+        try:
+            before = self.session.get(f"{self.base_url}/admin/notifications").json()["notifications"]
+            latencies = []
+            contact_ids = []
+            for n in range(NOTIFICATION_CONTACTS):
+                started = time.perf_counter()
+                response = self.session.post(f"{self.base_url}/contacts", json={
+                    "name": f"Notify Tester {n}",
+                    "email": f"notify.tester{n}@example.com",
+                    "message": "Please call me back about villas in Hosur."
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                contact_ids.append(response.json().get("contact_id"))
+            
+            # Test 1: Submission latency does not include the notifier's delay
+            p95 = percentile(latencies, 95)
+            self.log_result("contact_form_api", "Submit Latency With Slow Notifier", p95 < NOTIFIER_DELAY * 1000 / 2, 
+                          f"p95 {p95:.1f} ms with a {NOTIFIER_DELAY * 1000:.0f} ms notifier")
+            
+            # Test 2: Every enqueued notification is eventually delivered, including retried ones
+            drained = queue.join(timeout=NOTIFIER_DELAY * NOTIFICATION_CONTACTS * 3)
+            after = self.session.get(f"{self.base_url}/admin/notifications").json()["notifications"]
+            missing = [contact_id for contact_id in contact_ids if contact_id not in delivered]
+            self.log_result("contact_form_api", "Notifications Eventually Delivered", drained and not missing, 
+                          f"delivered {after['delivered'] - before['delivered']}/{NOTIFICATION_CONTACTS}, "
+                          f"retried {after['retried'] - before['retried']}, dead-lettered {after['dead_lettered'] - before['dead_lettered']}")
+        except Exception as e:
+            self.log_result("contact_form_api", "Contact Notifications", False, str(e))
+        finally:
+            queue.notifier, queue.base_delay = original
     
     def test_properties_api(self):
         """Test Properties API with different query parameters"""
@@ -229,7 +605,66 @@ class VelanPropertiesAPITester:
             except Exception as e:
                 self.log_result("properties_api", f"Filter by Type ({property_type})", False, str(e))
         
-        # Test 4: Invalid pagination parameters
+        # Test 4: Filter by location
+        try:
+            response = self.session.get(f"{self.base_url}/properties", params={"location": "hosur"})
+            if response.status_code == 200:
+                data = response.json()
+                if isinstance(data, list) and all("hosur" in location_keys(prop.get("location")) for prop in data):
+                    self.log_result("properties_api", "Filter by Location", True, 
+                                  f"Filter working, got {len(data)} properties in Hosur")
+                else:
+                    self.log_result("properties_api", "Filter by Location", False, 
+                                  f"Filter failed, got: {[prop.get('location') for prop in data]}")
+            else:
+                self.log_result("properties_api", "Filter by Location", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("properties_api", "Filter by Location", False, str(e))
+        
+        # Test 5: Filter by price range
+        try:
+            response = self.session.get(f"{self.base_url}/properties", params={"price_range": "5000000-10000000"})
+            if response.status_code == 200:
+                data = response.json()
+                prices = [parse_price(prop.get("price")) for prop in data]
+                if isinstance(data, list) and all(p is not None and 5000000 <= p <= 10000000 for p in prices):
+                    self.log_result("properties_api", "Filter by Price Range", True, 
+                                  f"Filter working, got {len(data)} properties between ₹50L and ₹1Cr")
+                else:
+                    self.log_result("properties_api", "Filter by Price Range", False, 
+                                  f"Filter failed, got prices: {[prop.get('price') for prop in data]}")
+            else:
+                self.log_result("properties_api", "Filter by Price Range", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("properties_api", "Filter by Price Range", False, str(e))
+        
+        # Tests 6-7: Numeric price sort and cursor pagination
+        if not self.local_backend:
+            print("⚠️  Skipped: numeric price sort and cursor pagination are only implemented by the local backend stand-in (--local)")
+        else:
+            try:
+                response = self.session.get(f"{self.base_url}/properties", params={"price_unit": "sale", "sort": "price_asc"})
+                if response.status_code == 200:
+                    data = response.json()
+                    prices = [prop.get("price_value") for prop in data]
+                    if isinstance(data, list) and None not in prices and prices == sorted(prices):
+                        self.log_result("properties_api", "Sort by Price", True, 
+                                      f"Sorted {len(data)} sale listings by price_value")
+                    else:
+                        self.log_result("properties_api", "Sort by Price", False, 
+                                      f"Listings not sorted by price_value: {prices}")
+                else:
+                    self.log_result("properties_api", "Sort by Price", False, 
+                                  f"HTTP {response.status_code}: {response.text}")
+            except Exception as e:
+                self.log_result("properties_api", "Sort by Price", False, str(e))
+        
+            # Cursor pagination stays consistent while listings are added
+            self.check_cursor_pagination()
+        
+        # Test 8: Invalid pagination parameters
         try:
             response = self.session.get(f"{self.base_url}/properties?limit=-1")
             if response.status_code == 422:  # Validation error expected
@@ -241,6 +676,398 @@ class VelanPropertiesAPITester:
         except Exception as e:
             self.log_result("properties_api", "Invalid Pagination Parameters", False, str(e))
     
+    def test_property_search(self):
+        """Test full-text property search: relevance, prefix/typo tolerance and index updates"""
+        print("\n=== Testing Property Search ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: full-text search is only implemented by the local backend stand-in (--local)")
+            return
+        
+        image = "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80"
+        listings = {
+            "penthouse": {"title": "Lakefront 3BHK Penthouse", "price": "₹1,20,00,000", "location": "Kelavarapalli, Hosur",
+                          "bedrooms": 3, "parking": 2, "area": "2,800 sq ft", "type": "For Sale", "image": image,
+                          "description": "Penthouse overlooking the Kelavarapalli reservoir.",
+                          "features": ["Gym", "Rooftop Terrace", "Lift"]},
+            "studio": {"title": "Compact 1BHK Studio", "price": "₹9,000/month", "location": "Kelavarapalli, Hosur",
+                       "bedrooms": 1, "parking": 0, "area": "450 sq ft", "type": "For Rent", "image": image,
+                       "description": "Studio flat a short walk from the reservoir.", "features": ["Lift"]},
+            "bungalow": {"title": "Heritage 3BHK Bungalow", "price": "₹95,00,000", "location": "Chinna Elasagiri, Hosur",
+                         "bedrooms": 3, "parking": 2, "area": "3,200 sq ft", "type": "For Sale", "image": image,
+                         "description": "Bungalow with a mango orchard.", "features": ["Garden", "Gym"]}
+        }
+        ids = {}
+        
+        def search(params):
+            return self.session.get(f"{self.base_url}/properties/search", params=params)
+        
+        try:
+            for name, listing in listings.items():
+                ids[name] = self.session.post(f"{self.base_url}/properties", json=listing).json()["property_id"]
+            
+            # Relevance suite: query -> listing expected as the top hit
+            cases = [
+                ("penthouse kelavarapalli", "penthouse"),
+                ("studio kelavarapalli", "studio"),
+                ("3 BHK gym orchard", "bungalow"),
+                ("3bhk rooftop terrace", "penthouse"),
+                ("bungal", "bungalow"),              # prefix
+                ("penthuose", "penthouse"),          # transposed letters
+                ("kelavarapali studoi", "studio"),   # dropped and transposed letters
+            ]
+            for query, expected in cases:
+                response = search({"q": query})
+                results = response.json() if response.status_code == 200 else []
+                top = results[0]["id"] if results else None
+                self.log_result("properties_api", f"Search Relevance '{query}'", top == ids[expected], 
+                              f"top hit {results[0]['title'] if results else None!r}, expected {listings[expected]['title']!r}")
+            
+            # Listing filters apply to search results
+            results = search({"q": "kelavarapalli", "type": "For Rent"}).json()
+            self.log_result("properties_api", "Search With Filters", [r["id"] for r in results] == [ids["studio"]], 
+                          f"{len(results)} results for 'kelavarapalli' + For Rent")
+            
+            # The index follows updates and deletes
+            self.session.put(f"{self.base_url}/properties/{ids['studio']}", json={"title": "Compact 1BHK Duplex"})
+            duplex = [r["id"] for r in search({"q": "duplex"}).json()]
+            self.session.delete(f"{self.base_url}/properties/{ids.pop('penthouse')}")
+            penthouse = search({"q": "penthouse"}).json()
+            self.log_result("properties_api", "Search Index Follows Writes", 
+                          ids["studio"] in duplex and all(r["title"] != listings["penthouse"]["title"] for r in penthouse), 
+                          f"'duplex' -> {len(duplex)} results, 'penthouse' after delete -> {len(penthouse)} results")
+            
+            response = search({})
+            self.log_result("properties_api", "Search Requires Query", response.status_code == 422, 
+                          f"HTTP {response.status_code} without q")
+        except Exception as e:
+            self.log_result("properties_api", "Property Search", False, str(e))
+        finally:
+            for property_id in ids.values():
+                self.session.delete(f"{self.base_url}/properties/{property_id}")
+    
+    def check_cursor_pagination(self):
+        """Page through listings one at a time with a cursor while a new listing is created mid-walk"""
+        new_property_id = None
+        try:
+            response = self.session.get(f"{self.base_url}/properties", params={"limit": 100})
+            expected_ids = [prop["id"] for prop in response.json()]
+            
+            seen_ids = []
+            cursor = ""
+            while cursor is not None:
+                response = self.session.get(f"{self.base_url}/properties", params={"limit": 1, "cursor": cursor})
+                if response.status_code != 200:
+                    self.log_result("properties_api", "Cursor Pagination", False, 
+                                  f"HTTP {response.status_code}: {response.text}")
+                    return
+                data = response.json()
+                seen_ids.extend(prop["id"] for prop in data["items"])
+                cursor = data["next_cursor"]
+                if new_property_id is None:
+                    # A listing created between pages must not shift the remaining pages
+                    created = self.session.post(f"{self.base_url}/properties", json={
+                        "title": "Cursor Test Listing",
+                        "price": "₹27,00,000",
+                        "location": "Zuzuvadi, Hosur",
+                        "bedrooms": 2,
+                        "parking": 1,
+                        "area": "1,050 sq ft",
+                        "type": "For Sale",
+                        "image": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?auto=format&fit=crop&w=800&q=80"
+                    })
+                    new_property_id = created.json().get("property_id")
+            
+            if seen_ids == expected_ids:
+                self.log_result("properties_api", "Cursor Pagination", True, 
+                              f"Walked {len(seen_ids)} listings with no duplicates or gaps despite a concurrent insert")
+            else:
+                self.log_result("properties_api", "Cursor Pagination", False, 
+                              f"Expected {len(expected_ids)} listings in order, got {len(seen_ids)} "
+                              f"({len(set(seen_ids))} unique)")
+            
+            # Malformed cursors, including a timestamp with a UTC offset, are a 422 rather than a server error
+            aware = json.dumps(["2024-01-01T10:00:00+05:30", str(uuid.uuid4())]).encode("utf-8")
+            bad_cursors = {"garbage": "not-a-cursor!", 
+                           "offset timestamp": base64.urlsafe_b64encode(aware).decode("ascii").rstrip("=")}
+            statuses = {name: self.session.get(f"{self.base_url}/properties", 
+                                               params={"limit": 1, "cursor": cursor}).status_code 
+                        for name, cursor in bad_cursors.items()}
+            self.log_result("properties_api", "Invalid Cursor Rejected", 
+                          all(status == 422 for status in statuses.values()), f"HTTP statuses: {statuses}")
+        except Exception as e:
+            self.log_result("properties_api", "Cursor Pagination", False, str(e))
+        finally:
+            if new_property_id:
+                self.session.delete(f"{self.base_url}/properties/{new_property_id}")
+    
+    def test_field_projection(self):
+        """Test fields= and view=card projections on the properties listing"""
+        print("\n=== Testing Field Projection ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: field projection and the card view are only implemented by the local backend stand-in (--local)")
+            return
+        card_fields = {"id", "title", "price", "location", "bedrooms", "parking", "area", "type", "image", "image_variants"}
+        
+        def keys(params, path="/properties"):
+            response = self.session.get(f"{self.base_url}{path}", params=params)
+            if response.status_code != 200:
+                return response.status_code, None
+            data = response.json()
+            items = data["items"] if isinstance(data, dict) else data
+            return 200, [set(item) for item in items]
+        
+        try:
+            # Test 1: The card view returns exactly the fields the listing cards render
+            status, items = keys({"view": "card"})
+            self.log_result("properties_api", "Card View Projection", bool(items) and all(k == card_fields for k in items), 
+                          f"HTTP {status}, fields {sorted(items[0]) if items else None}")
+            
+            # Test 2: An explicit field list, plus id
+            status, items = keys({"fields": "title,price"})
+            self.log_result("properties_api", "Fields Projection", bool(items) and all(k == {"id", "title", "price"} for k in items), 
+                          f"HTTP {status}, fields {sorted(items[0]) if items else None}")
+            
+            # Test 3: Projection combines with cursor pagination and search
+            status, items = keys({"view": "card", "cursor": "", "limit": 2})
+            _, search_items = keys({"q": "Hosur", "view": "card"}, "/properties/search")
+            projected = bool(items) and all(k == card_fields for k in items) and \
+                bool(search_items) and all(k == card_fields for k in search_items)
+            self.log_result("properties_api", "Projection With Cursor And Search", projected, 
+                          f"cursor page {len(items or [])} items, search {len(search_items or [])} items")
+            
+            # Test 4: Unknown fields and views are rejected
+            unknown_field, _ = keys({"fields": "title,owner_phone"})
+            unknown_view, _ = keys({"view": "poster"})
+            self.log_result("properties_api", "Invalid Projection Rejected", unknown_field == 422 and unknown_view == 422, 
+                          f"unknown field HTTP {unknown_field}, unknown view HTTP {unknown_view}")
+        except Exception as e:
+            self.log_result("properties_api", "Field Projection", False, str(e))
+    
+    def test_response_compression(self):
+        """Test gzip negotiation on listing, export and small responses"""
+        print("\n=== Testing Response Compression ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: response compression is only implemented by the local backend stand-in (--local)")
+            return
+        try:
+            identity = self.session.get(f"{self.base_url}/properties", headers={"Accept-Encoding": "identity"})
+            gzipped = self.session.get(f"{self.base_url}/properties", headers={"Accept-Encoding": "gzip"})
+            
+            # Test 1: gzip is applied when accepted and decodes to the same listing
+            encoded = (gzipped.headers.get("Content-Encoding") == "gzip" and 
+                       identity.headers.get("Content-Encoding") is None and 
+                       gzipped.json() == identity.json())
+            self.log_result("properties_api", "Gzip Listing Response", encoded, 
+                          f"Content-Encoding {gzipped.headers.get('Content-Encoding')!r}, "
+                          f"Vary {gzipped.headers.get('Vary')!r}")
+            
+            # Test 2: Encodings get distinct ETags so caches never mix them up
+            self.log_result("properties_api", "Per-Encoding ETags", 
+                          gzipped.headers.get("ETag") != identity.headers.get("ETag"), 
+                          f"identity {identity.headers.get('ETag')}, gzip {gzipped.headers.get('ETag')}")
+            
+            # Test 3: Streamed exports are compressed too
+            response = self.session.get(f"{self.base_url}/properties/export", headers={"Accept-Encoding": "gzip"})
+            rows = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+            self.log_result("properties_api", "Gzip Streamed Export", 
+                          response.headers.get("Content-Encoding") == "gzip" and len(rows) > 0, 
+                          f"{len(rows)} rows, Content-Encoding {response.headers.get('Content-Encoding')!r}")
+            
+            # Test 4: Tiny bodies are sent as-is
+            response = self.session.get(f"{self.base_url}/", headers={"Accept-Encoding": "gzip"})
+            self.log_result("properties_api", "Small Responses Uncompressed", 
+                          response.headers.get("Content-Encoding") is None, 
+                          f"{len(response.content)} bytes, Content-Encoding {response.headers.get('Content-Encoding')!r}")
+        except Exception as e:
+            self.log_result("properties_api", "Response Compression", False, str(e))
+    
+    def test_image_pipeline(self):
+        """Test image uploads: async variant rendering, immutable variant files and listing variants"""
+        print("\n=== Testing Image Pipeline ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the image pipeline is only implemented by the local backend stand-in (--local)")
+            return
+        origin = self.base_url.rsplit("/api", 1)[0]
+        source = make_png(*IMAGE_SOURCE_SIZE, tint=uuid.uuid4().int % 256)
+        property_id = None
+        try:
+            # Test 1: An upload is queued and answered without waiting for the resize
+            started = time.perf_counter()
+            response = self.session.post(f"{self.base_url}/images", data=source, headers={"Content-Type": "image/png"})
+            elapsed = time.perf_counter() - started
+            if response.status_code == 503:
+                print(f"⚠️  Skipped image pipeline: {response.json().get('detail')}")
+                return
+            manifest = response.json()
+            image_id = manifest.get("image_id")
+            self.log_result("properties_api", "Image Upload Accepted", 
+                          response.status_code in (200, 202) and image_id is not None, 
+                          f"HTTP {response.status_code} in {elapsed * 1000:.0f} ms, status {manifest.get('status')!r}")
+            
+            # Test 2: A listing can use the image before its variants exist
+            response = self.session.post(f"{self.base_url}/properties", json={
+                "title": "Image Pipeline Test Listing",
+                "price": "₹42,00,000",
+                "location": "Mathigiri, Hosur",
+                "bedrooms": 3,
+                "parking": 1,
+                "area": "1,350 sq ft",
+                "type": "For Sale",
+                "image": manifest.get("url")
+            })
+            property_id = response.json().get("property_id")
+            
+            # Test 3: Every width is rendered in both formats
+            manifest = self.wait_for_image(manifest)
+            rendered = {(v["format"], v["width"]) for v in manifest.get("variants", [])}
+            expected = {(f, w) for f in ("webp", "jpg") for w in (320, 640, 1280)}
+            self.log_result("properties_api", "Image Variants Rendered", 
+                          manifest.get("status") == "ready" and rendered == expected, 
+                          f"status {manifest.get('status')!r}, {len(rendered)} variants")
+            
+            # Test 4: The same bytes map to the same image without reprocessing
+            response = self.session.post(f"{self.base_url}/images", data=source, headers={"Content-Type": "image/png"})
+            self.log_result("properties_api", "Duplicate Upload Reused", 
+                          response.status_code == 200 and response.json().get("image_id") == image_id, 
+                          f"HTTP {response.status_code}, same id {response.json().get('image_id') == image_id}")
+            
+            # Test 5: Variant files are immutable and revalidate with 304
+            webp = next((v for v in manifest.get("variants", []) if v["format"] == "webp"), None)
+            if webp:
+                response = self.session.get(origin + webp["url"])
+                revalidated = self.session.get(origin + webp["url"], headers={"If-None-Match": response.headers.get("ETag", "")})
+                self.log_result("properties_api", "Immutable Variant Files", 
+                              response.status_code == 200 and response.headers.get("Content-Type") == "image/webp" and 
+                              "immutable" in response.headers.get("Cache-Control", "") and revalidated.status_code == 304, 
+                              f"{len(response.content)} bytes, Cache-Control {response.headers.get('Cache-Control')!r}, "
+                              f"revalidation HTTP {revalidated.status_code}")
+            else:
+                self.log_result("properties_api", "Immutable Variant Files", False, "No webp variant to fetch")
+            
+            # Test 6: The listing picks up its variants, also in the card view
+            time.sleep(0.2)
+            listed = self.session.get(f"{self.base_url}/properties/{property_id}").json().get("image_variants") or {}
+            cards = self.session.get(f"{self.base_url}/properties", params={"view": "card", "limit": 100}).json()
+            card = next((c for c in cards if c["id"] == property_id), {})
+            self.log_result("properties_api", "Listing Image Variants", 
+                          [v["width"] for v in listed.get("webp", [])] == [320, 640, 1280] and 
+                          card.get("image_variants") == listed, 
+                          f"formats {sorted(listed)}, card view {'matches' if card.get('image_variants') == listed else 'differs'}")
+            
+            # Test 7: Non-images and unknown files are rejected
+            bad_upload = self.session.post(f"{self.base_url}/images", data=b"not an image", 
+                                           headers={"Content-Type": "application/octet-stream"})
+            missing = self.session.get(f"{self.base_url}/images/files/{'0' * 32}.webp")
+            self.log_result("properties_api", "Image Validation", 
+                          bad_upload.status_code == 415 and missing.status_code == 404, 
+                          f"garbage upload HTTP {bad_upload.status_code}, unknown file HTTP {missing.status_code}")
+            
+            # Test 8: Transparent areas are rendered white, not as the colour under them
+            response = self.session.post(f"{self.base_url}/images", data=make_png(400, 300, tint=0, alpha=0), 
+                                         headers={"Content-Type": "image/png"})
+            transparent = self.wait_for_image(response.json())
+            jpg = next((v for v in transparent.get("variants", []) if v["format"] == "jpg"), None)
+            if jpg and Image is not None:
+                with Image.open(io.BytesIO(self.session.get(origin + jpg["url"]).content)) as rendered:
+                    darkest = rendered.convert("L").getextrema()[0]
+                self.log_result("properties_api", "Transparent Source On White", darkest >= 250, 
+                              f"darkest pixel {darkest} in the {jpg['width']}px JPEG")
+            elif jpg:
+                print("⚠️  Skipped transparency check: inspecting variants needs Pillow")
+            else:
+                self.log_result("properties_api", "Transparent Source On White", False, 
+                              f"status {transparent.get('status')!r}, no JPEG variant")
+            
+            # Test 9: Source URLs on private addresses are refused without echoing the fetch error
+            response = self.session.post(f"{self.base_url}/images", json={"url": f"{origin}/api/"})
+            refused = self.wait_for_image(response.json())
+            self.log_result("properties_api", "Private Source URL Refused", 
+                          refused.get("status") == "failed" and refused.get("error") == "Source URL is not allowed", 
+                          f"status {refused.get('status')!r}, error {refused.get('error')!r}")
+        except Exception as e:
+            self.log_result("properties_api", "Image Pipeline", False, str(e))
+        finally:
+            if property_id:
+                self.session.delete(f"{self.base_url}/properties/{property_id}")
+    
+    def wait_for_image(self, manifest):
+        """Poll an image manifest until it is no longer pending (or IMAGE_READY_TIMEOUT passes)"""
+        deadline = time.monotonic() + IMAGE_READY_TIMEOUT
+        while manifest.get("status") == "pending" and time.monotonic() < deadline:
+            time.sleep(0.2)
+            manifest = self.session.get(f"{self.base_url}/images/{manifest['image_id']}").json()
+        return manifest
+    
+    def test_listing_cache(self):
+        """Test listing cache: conditional GETs and no stale reads after writes"""
+        print("\n=== Testing Property Listing Cache ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the listing cache is only implemented by the local backend stand-in (--local)")
+            return
+        listing_url = f"{self.base_url}/properties"
+        params = {"limit": 100}
+        
+        def listing():
+            response = self.session.get(listing_url, params=params)
+            return response, {prop["id"]: prop for prop in response.json()}
+        
+        property_id = None
+        try:
+            response = self.session.post(listing_url, json={
+                "title": "Cache Test Listing",
+                "price": "₹31,00,000",
+                "location": "Alasanatham, Hosur",
+                "bedrooms": 2,
+                "parking": 1,
+                "area": "1,100 sq ft",
+                "type": "For Sale",
+                "image": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?auto=format&fit=crop&w=800&q=80"
+            })
+            property_id = response.json().get("property_id")
+            
+            # Test 1: Repeat read is served from cache and revalidates with 304
+            listing()
+            response, listed = listing()
+            etag = response.headers.get("ETag")
+            if property_id in listed and etag:
+                revalidated = self.session.get(listing_url, params=params, headers={"If-None-Match": etag})
+                self.log_result("properties_api", "Listing ETag Revalidation", revalidated.status_code == 304, 
+                              f"X-Cache={response.headers.get('X-Cache')}, If-None-Match -> HTTP {revalidated.status_code}")
+            else:
+                self.log_result("properties_api", "Listing ETag Revalidation", False, 
+                              f"New listing missing or no ETag (etag={etag})")
+            
+            # Test 2: Cached read reflects a PUT immediately
+            self.session.put(f"{listing_url}/{property_id}", json={"price": "₹29,50,000"})
+            response, listed = listing()
+            price = listed.get(property_id, {}).get("price")
+            fresh = price == "₹29,50,000" and response.headers.get("ETag") != etag
+            self.log_result("properties_api", "Listing Cache Fresh After Update", fresh, 
+                          f"Listed price after PUT: {price}")
+            
+            # Test 3: Cached read reflects a DELETE immediately
+            self.session.delete(f"{listing_url}/{property_id}")
+            response, listed = listing()
+            self.log_result("properties_api", "Listing Cache Fresh After Delete", property_id not in listed, 
+                          "Deleted listing no longer returned" if property_id not in listed else "Stale listing returned")
+            property_id = None
+            
+            # Test 4: Hit/miss counters are exposed
+            response = self.session.get(f"{self.base_url}/admin/cache")
+            if response.status_code == 200:
+                stats = response.json().get("listing_cache", {})
+                self.log_result("properties_api", "Listing Cache Stats", stats.get("hits", 0) > 0, 
+                              f"hits={stats.get('hits')}, misses={stats.get('misses')}, "
+                              f"invalidations={stats.get('invalidations')}")
+            else:
+                self.log_result("properties_api", "Listing Cache Stats", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("properties_api", "Listing Cache", False, str(e))
+        finally:
+            if property_id:
+                self.session.delete(f"{listing_url}/{property_id}")
+    
     def test_property_crud_operations(self):
         """Test Property CRUD Operations"""
         print("\n=== Testing Property CRUD Operations ===")
@@ -277,7 +1104,15 @@ class VelanPropertiesAPITester:
         except Exception as e:
             self.log_result("property_crud", "Create Property", False, str(e))
         
-        # Test 2: Create property with invalid data
+        # Test 2: Numeric price and area stored alongside the display strings
+        if not self.local_backend:
+            print("⚠️  Skipped: numeric price and area fields are only implemented by the local backend stand-in (--local)")
+        elif created_property_id:
+            self.check_numeric_fields(created_property_id, "Numeric Fields on Create", 
+                                      {"price": "₹35,00,000", "price_value": 3500000, "price_unit": "sale", 
+                                       "area": "1,800 sq ft", "area_sqft": 1800})
+        
+        # Test 3: Create property with invalid data
         invalid_property = {
             "title": "A",  # Too short
             "price": "",   # Empty
@@ -300,7 +1135,7 @@ class VelanPropertiesAPITester:
         except Exception as e:
             self.log_result("property_crud", "Create Property Validation", False, str(e))
         
-        # Test 3: Update property (if we created one successfully)
+        # Test 4: Update property (if we created one successfully)
         if created_property_id:
             update_data = {
                 "price": "₹38,00,000",
@@ -323,8 +1158,19 @@ class VelanPropertiesAPITester:
                                   f"HTTP {response.status_code}: {response.text}")
             except Exception as e:
                 self.log_result("property_crud", "Update Property", False, str(e))
+            
+            # Test 5: Numeric price follows the updated display price
+            if self.local_backend:
+                self.check_numeric_fields(created_property_id, "Numeric Fields on Update", 
+                                          {"price": "₹38,00,000", "price_value": 3800000, "price_unit": "sale", 
+                                           "area_sqft": 1800})
+        
+        # Test 5b: Rent listings, yearly rents and area units
+        if self.local_backend:
+            self.check_rent_listing()
+            self.check_price_and_area_parsing()
         
-        # Test 4: Update non-existent property
+        # Test 6: Update non-existent property
         fake_id = str(uuid.uuid4())
         try:
             response = self.session.put(f"{self.base_url}/properties/{fake_id}", json={"price": "₹50,00,000"})
@@ -337,7 +1183,7 @@ class VelanPropertiesAPITester:
         except Exception as e:
             self.log_result("property_crud", "Update Non-existent Property", False, str(e))
         
-        # Test 5: Delete property (if we created one)
+        # Test 7: Delete property (if we created one)
         if created_property_id:
             try:
                 response = self.session.delete(f"{self.base_url}/properties/{created_property_id}")
@@ -355,7 +1201,7 @@ class VelanPropertiesAPITester:
             except Exception as e:
                 self.log_result("property_crud", "Delete Property", False, str(e))
         
-        # Test 6: Delete non-existent property
+        # Test 8: Delete non-existent property
         fake_id = str(uuid.uuid4())
         try:
             response = self.session.delete(f"{self.base_url}/properties/{fake_id}")
@@ -368,6 +1214,341 @@ class VelanPropertiesAPITester:
         except Exception as e:
             self.log_result("property_crud", "Delete Non-existent Property", False, str(e))
     
+    def test_bulk_import_export(self):
+        """Test bulk NDJSON/CSV property import and streaming export"""
+        print("\n=== Testing Bulk Property Import/Export ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: bulk import and export are only implemented by the local backend stand-in (--local)")
+            return
+        created_ids = []
+        image = "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80"
+        rows = [
+            {"title": "Bulk Villa One", "price": "₹72,00,000", "location": "Mathigiri, Hosur", "bedrooms": 3, 
+             "parking": 2, "area": "2,100 sq ft", "type": "For Sale", "image": image, "features": ["Garden"]},
+            {"title": "B", "price": "", "location": "Hosur", "bedrooms": 0, "parking": 1, 
+             "area": "900 sq ft", "type": "Lease", "image": image},
+            {"title": "Bulk Flat Two", "price": "₹16,500/month", "location": "Zuzuvadi, Hosur", "bedrooms": 2, 
+             "parking": 1, "area": "1,000 sq ft", "type": "For Rent", "image": image}
+        ]
+        
+        # Test 1: NDJSON import reports every row and keeps the valid ones
+        try:
+            body = "".join(json.dumps(row) + "\n" for row in rows)
+            response = self.session.post(f"{self.base_url}/properties/bulk", data=body.encode("utf-8"), 
+                                         headers={"Content-Type": "application/x-ndjson"})
+            if response.status_code == 200:
+                data = response.json()
+                statuses = [result["status"] for result in data.get("results", [])]
+                created_ids += [r["property_id"] for r in data.get("results", []) if r["status"] == "created"]
+                passed = statuses == ["created", "error", "created"] and data.get("created") == 2
+                self.log_result("property_crud", "Bulk Import NDJSON", passed, 
+                              f"created={data.get('created')}, failed={data.get('failed')}, rows={statuses}")
+            else:
+                self.log_result("property_crud", "Bulk Import NDJSON", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("property_crud", "Bulk Import NDJSON", False, str(e))
+        
+        # Test 2: CSV import
+        try:
+            body = ("title,price,location,bedrooms,parking,area,type,image,features\n"
+                    f"Bulk CSV Plot,\"₹9,50,000\",\"Bagalur Road, Hosur\",1,0,3 cents,Investment,{image},Corner Plot|Road Facing\n")
+            response = self.session.post(f"{self.base_url}/properties/bulk", data=body.encode("utf-8"), 
+                                         headers={"Content-Type": "text/csv"})
+            if response.status_code == 200:
+                data = response.json()
+                created_ids += [r["property_id"] for r in data.get("results", []) if r["status"] == "created"]
+                self.log_result("property_crud", "Bulk Import CSV", data.get("created") == 1, 
+                              f"created={data.get('created')}, failed={data.get('failed')}")
+            else:
+                self.log_result("property_crud", "Bulk Import CSV", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("property_crud", "Bulk Import CSV", False, str(e))
+        
+        # Test 2b: A CSV record with invalid UTF-8 is a failed row, not a failed import
+        try:
+            header = "title,price,location,bedrooms,parking,area,type,image\n".encode("utf-8")
+            good = f"Bulk CSV Flat,\"₹31,00,000\",\"Mathigiri, Hosur\",2,1,950 sq ft,For Sale,{image}\n".encode("utf-8")
+            bad = good.replace(b"Bulk CSV Flat", b"Bulk CSV \xff Flat")
+            response = self.session.post(f"{self.base_url}/properties/bulk", data=b"\xef\xbb\xbf" + header + good + bad + good, 
+                                         headers={"Content-Type": "text/csv"})
+            if response.status_code == 200:
+                data = response.json()
+                statuses = [result["status"] for result in data.get("results", [])]
+                created_ids += [r["property_id"] for r in data.get("results", []) if r["status"] == "created"]
+                self.log_result("property_crud", "Bulk Import CSV Invalid UTF-8", statuses == ["created", "error", "created"], 
+                              f"rows={statuses}")
+            else:
+                self.log_result("property_crud", "Bulk Import CSV Invalid UTF-8", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("property_crud", "Bulk Import CSV Invalid UTF-8", False, str(e))
+        
+        # Test 2c: A large body the handler never reads is not drained; the connection is closed instead
+        try:
+            fake_url = f"{self.base_url}/properties/{uuid.uuid4()}"
+            with requests.Session() as session:
+                small = session.delete(fake_url, data=b"x" * 1024)
+                large = session.delete(fake_url, data=b"x" * UNREAD_BODY_SIZE)
+            closes = [response.headers.get("Connection", "").lower() == "close" for response in (small, large)]
+            self.log_result("property_crud", "Unread Body Closes Connection", 
+                          small.status_code == large.status_code == 404 and closes == [False, True], 
+                          f"Connection: close on small/large body: {closes}")
+        except Exception as e:
+            self.log_result("property_crud", "Unread Body Closes Connection", False, str(e))
+        
+        # Test 3: Streaming export includes the imported rows
+        try:
+            response = self.session.get(f"{self.base_url}/properties/export", stream=True)
+            if response.status_code == 200:
+                exported = {json.loads(line)["id"] for line in response.iter_lines() if line}
+                missing = [property_id for property_id in created_ids if property_id not in exported]
+                self.log_result("property_crud", "Streaming Export NDJSON", not missing, 
+                              f"Exported {len(exported)} properties, missing imported: {missing}")
+            else:
+                self.log_result("property_crud", "Streaming Export NDJSON", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("property_crud", "Streaming Export NDJSON", False, str(e))
+        finally:
+            for property_id in created_ids:
+                self.session.delete(f"{self.base_url}/properties/{property_id}")
+    
+    def check_numeric_fields(self, property_id, test_name, expected):
+        """Fetch a property and compare its display and parsed numeric fields"""
+        try:
+            response = self.session.get(f"{self.base_url}/properties/{property_id}")
+            if response.status_code == 200:
+                data = response.json()
+                mismatched = {field: data.get(field) for field, value in expected.items() if data.get(field) != value}
+                if not mismatched:
+                    self.log_result("property_crud", test_name, True, 
+                                  f"price_value={data.get('price_value')} ({data.get('price_unit')}), "
+                                  f"area_sqft={data.get('area_sqft')}")
+                else:
+                    self.log_result("property_crud", test_name, False, 
+                                  f"Expected {expected}, got mismatched fields: {mismatched}")
+            else:
+                self.log_result("property_crud", test_name, False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("property_crud", test_name, False, str(e))
+    
+    def check_rent_listing(self):
+        """A For Rent listing is priced per month whatever its price text says, also after a PUT"""
+        rent_property = {
+            "title": "Test Rental Villa - Automated Test",
+            "price": "₹18,000",
+            "location": "Mathigiri, Hosur",
+            "bedrooms": 2,
+            "parking": 1,
+            "area": "200 sq yds",
+            "type": "For Rent",
+            "image": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80"
+        }
+        try:
+            response = self.session.post(f"{self.base_url}/properties", json=rent_property)
+            if response.status_code != 200:
+                self.log_result("property_crud", "Rent Listing Price Unit", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+                return
+            property_id = response.json().get("property_id")
+            try:
+                self.check_numeric_fields(property_id, "Rent Listing Price Unit", 
+                                          {"price_value": 18000, "price_unit": "rent", "area_sqft": 1800})
+                self.session.put(f"{self.base_url}/properties/{property_id}", json={"price": "₹2 Lakh/year"})
+                self.check_numeric_fields(property_id, "Yearly Rent Update Keeps Unit", 
+                                          {"price_value": 16666.67, "price_unit": "rent", "area_sqft": 1800})
+                self.session.put(f"{self.base_url}/properties/{property_id}", json={"type": "For Sale"})
+                self.check_numeric_fields(property_id, "Type Change Updates Unit", 
+                                          {"price_unit": "sale"})
+            finally:
+                self.session.delete(f"{self.base_url}/properties/{property_id}")
+        except Exception as e:
+            self.log_result("property_crud", "Rent Listing Price Unit", False, str(e))
+    
+    def check_price_and_area_parsing(self):
+        """The price and area parsers against the formats listings use"""
+        price_cases = [
+            ("₹18,000", "For Rent", 18000, "rent"),
+            ("₹18,000 p.m.", None, 18000, "rent"),
+            ("₹15,000 monthly", None, 15000, "rent"),
+            ("₹18,000/month", None, 18000, "rent"),
+            ("₹2 Lakh/year", None, 16666.67, "rent"),
+            ("₹85,00,000", None, 8500000, "sale"),
+            ("1.5-2 Cr", "Investment", 15000000, "sale")
+        ]
+        area_cases = [
+            ("1,800 sq ft", 1800),
+            ("1,800 sq.ft.", 1800),
+            ("1,800 square feet", 1800),
+            ("200 sq yds", 1800),
+            ("100 square meters", 1076),
+            ("5 cents", 2178),
+            ("1,200 sq ft carpet", 1200),
+            ("3 bighas", None)
+        ]
+        failures = []
+        for text, property_type, value, unit in price_cases:
+            parsed = (parse_price(text), parse_price_unit(text, property_type))
+            if parsed != (value, unit):
+                failures.append(f"{text!r} ({property_type}) -> {parsed}, expected {(value, unit)}")
+        for text, sqft in area_cases:
+            if parse_area(text) != sqft:
+                failures.append(f"{text!r} -> {parse_area(text)}, expected {sqft}")
+        self.log_result("property_crud", "Price And Area Parsing", not failures, 
+                      "; ".join(failures) or f"{len(price_cases)} prices and {len(area_cases)} areas parsed")
+    
+    def _replay_changes(self, base_url, since=0, state=None):
+        """Apply the change feed after since to state ({(collection, id): document}); returns (state, last_seq, reset)"""
+        state = {} if state is None else state
+        reset = False
+        while True:
+            page = self.session.get(f"{base_url}/admin/changes/feed", params={"since": since, "limit": 1000}).json()
+            if page["reset"]:
+                state.clear()
+                reset = True
+            for change in page["changes"]:
+                key = (change["collection"], change["id"])
+                if change["op"] == "delete":
+                    state.pop(key, None)
+                else:
+                    state[key] = change["document"]
+            since = page["last_seq"]
+            if not page["has_more"]:
+                return state, since, reset
+    
+    def _collection_snapshot(self, base_url):
+        """Every property and contact as served by the API, keyed like _replay_changes"""
+        response = self.session.get(f"{base_url}/properties/export")
+        snapshot = {("properties", row["id"]): row for row in map(json.loads, response.text.splitlines()) if row}
+        cursor = ""
+        while cursor is not None:
+            page = self.session.get(f"{base_url}/contacts", params={"limit": 100, "cursor": cursor}).json()
+            snapshot.update((("contacts", contact["id"]), contact) for contact in page["items"])
+            cursor = page["next_cursor"]
+        return snapshot
+    
+    def _replay_matches_snapshot(self, base_url, attempts=3):
+        """Replay the feed from zero and compare with the collections; retried if a write lands in between"""
+        for _ in range(attempts):
+            head = self.session.get(f"{base_url}/admin/changes/feed", params={"since": 0, "limit": 1}).json()["head"]
+            snapshot = self._collection_snapshot(base_url)
+            replayed, last_seq, _ = self._replay_changes(base_url)
+            if last_seq == head:
+                return replayed == snapshot, len(replayed), len(snapshot)
+        return False, len(replayed), len(snapshot)
+    
+    def test_change_feed(self):
+        """Test the change feed: ordered deltas, replay from zero, event stream and compaction"""
+        print("\n=== Testing Change Feed ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the change feed is only implemented by the local backend stand-in (--local)")
+            return
+        listing_url = f"{self.base_url}/properties"
+        property_id = None
+        try:
+            head = self.session.get(f"{self.base_url}/changes", params={"since": 0, "limit": 1}).json()["head"]
+            
+            # Test 1: Follow the feed over an event stream while writing
+            events = []
+            
+            def follow():
+                with requests.get(f"{self.base_url}/changes/stream", params={"since": head, "collection": "properties"}, 
+                                  stream=True, timeout=TIMEOUT) as response:
+                    for line in response.iter_lines():
+                        if line.startswith(b"data:"):
+                            events.append(json.loads(line[5:]))
+                            if len(events) == 3:
+                                return
+            
+            follower = threading.Thread(target=follow, daemon=True)
+            follower.start()
+            response = self.session.post(listing_url, json={
+                "title": "Change Feed Test Listing",
+                "price": "₹27,00,000",
+                "location": "Zuzuvadi, Hosur",
+                "bedrooms": 2,
+                "parking": 1,
+                "area": "980 sq ft",
+                "type": "For Sale",
+                "image": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?auto=format&fit=crop&w=800&q=80"
+            })
+            property_id = response.json().get("property_id")
+            self.session.put(f"{listing_url}/{property_id}", json={"price": "₹26,00,000"})
+            self.session.delete(f"{listing_url}/{property_id}")
+            deleted_id, property_id = property_id, None
+            
+            # Test 2: The feed lists the writes in order with full documents
+            page = self.session.get(f"{self.base_url}/changes", params={"since": head, "collection": "properties"}).json()
+            ops = [(change["op"], change["id"]) for change in page["changes"]]
+            expected = [("insert", deleted_id), ("update", deleted_id), ("delete", deleted_id)]
+            self.log_result("properties_api", "Change Feed Records Writes", 
+                          ops == expected and page["changes"][1]["document"]["price"] == "₹26,00,000", 
+                          f"{len(ops)} changes after seq {head}, last_seq {page['last_seq']}")
+            
+            follower.join(TIMEOUT)
+            self.log_result("properties_api", "Change Event Stream", 
+                          [(event["op"], event["id"]) for event in events] == expected, 
+                          f"{len(events)} events received over text/event-stream")
+            
+            # Test 3: Contact submissions stay off the public feed and stream
+            head = page["head"]
+            response = self.session.post(f"{self.base_url}/contacts", json={
+                "name": "Change Feed Enquirer",
+                "email": f"feed-{uuid.uuid4().hex[:8]}@example.com",
+                "phone": "+91 98765 43210",
+                "message": "Please keep my details private."
+            })
+            contact_id = response.json().get("contact_id")
+            public = self.session.get(f"{self.base_url}/changes", params={"since": head}).json()
+            admin = self.session.get(f"{self.base_url}/admin/changes/feed", params={"since": head}).json()
+            rejected = self.session.get(f"{self.base_url}/changes/stream", params={"collection": "contacts"})
+            self.log_result("properties_api", "Public Change Feed Omits Contacts", 
+                          response.status_code == 200 and not public["changes"] and 
+                          [change["id"] for change in admin["changes"]] == [contact_id] and rejected.status_code == 422, 
+                          f"public feed {len(public['changes'])} changes, admin feed {len(admin['changes'])}, "
+                          f"public contacts stream HTTP {rejected.status_code}")
+            
+            # Test 4: Replaying from zero rebuilds both collections exactly
+            matches, replayed, stored = self._replay_matches_snapshot(self.base_url)
+            self.log_result("properties_api", "Change Feed Replay", matches, 
+                          f"{replayed} documents replayed, {stored} in the collections")
+        except Exception as e:
+            self.log_result("properties_api", "Change Feed", False, str(e))
+        finally:
+            if property_id:
+                self.session.delete(f"{listing_url}/{property_id}")
+        
+        # Test 5: Compaction shrinks the log without changing what a replay rebuilds
+        backend = LocalBackend(api=LocalAPI(change_tombstone_ttl=0)).start()
+        try:
+            _, since, _ = self._replay_changes(backend.base_url)
+            for n in range(CHANGE_FEED_CHURN):
+                payload = {"title": f"Churn Listing {n}", "price": "₹35,00,000", "location": "Hosur", "bedrooms": 2,
+                           "parking": 1, "area": "1,000 sq ft", "type": "For Sale", "image": "https://example.com/a.jpg"}
+                churn_id = self.session.post(f"{backend.base_url}/properties", json=payload).json()["property_id"]
+                self.session.put(f"{backend.base_url}/properties/{churn_id}", json={"price": "₹34,00,000"})
+                if n % 2:
+                    self.session.delete(f"{backend.base_url}/properties/{churn_id}")
+            before = self.session.get(f"{backend.base_url}/admin/changes").json()["changes"]
+            compaction = self.session.post(f"{backend.base_url}/admin/changes/compact").json()["compaction"]
+            matches, replayed, stored = self._replay_matches_snapshot(backend.base_url)
+            self.log_result("properties_api", "Change Feed Compaction", 
+                          compaction["entries"] < before["entries"] and matches, 
+                          f"{before['entries']} -> {compaction['entries']} entries, "
+                          f"{compaction['tombstones_dropped']} tombstones dropped, replay {'matches' if matches else 'differs'}")
+            
+            # Test 6: A client behind a dropped tombstone is told to rebuild
+            _, _, reset = self._replay_changes(backend.base_url, since=since)
+            self.log_result("properties_api", "Change Feed Reset After Compaction", reset, 
+                          f"since={since} -> reset {reset}")
+        except Exception as e:
+            self.log_result("properties_api", "Change Feed Compaction", False, str(e))
+        finally:
+            backend.stop()
+    
     def test_admin_dashboard(self):
         """Test admin dashboard endpoint"""
         print("\n=== Testing Admin Dashboard ===")
@@ -394,6 +1575,614 @@ class VelanPropertiesAPITester:
             print(f"❌ Admin Dashboard: {str(e)}")
             return False
     
+    def test_dashboard_counters(self):
+        """Test that dashboard counters track contact and property writes"""
+        print("\n=== Testing Admin Dashboard Counters ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: dashboard counter reconciliation is only implemented by the local backend stand-in (--local)")
+            return
+        
+        def dashboard():
+            return self.session.get(f"{self.base_url}/admin/dashboard").json()
+        
+        property_id = None
+        try:
+            before = dashboard()
+            
+            # Test 1: Breakdowns add up to the totals
+            contacts, properties = before["contacts"], before["properties"]
+            consistent = (sum(contacts.get("by_status", {}).values()) == contacts["total"] and
+                          sum(properties.get("by_status", {}).values()) == properties["total"] and
+                          sum(properties.get("by_type", {}).values()) == properties["total"])
+            self.log_result("admin_dashboard", "Counter Breakdowns Match Totals", consistent, 
+                          f"contacts by_status={contacts.get('by_status')}, properties by_type={properties.get('by_type')}")
+            
+            # Test 2: A new contact moves the total and the "new" bucket
+            response = self.session.post(f"{self.base_url}/contacts", json={
+                "name": "Karthik Selvam",
+                "email": "karthik.selvam@example.com",
+                "message": "Please share details of plots available on Bagalur Road."
+            })
+            contact_id = response.json().get("contact_id")
+            after = dashboard()
+            counted = (after["contacts"]["total"] == contacts["total"] + 1 and
+                       after["contacts"]["by_status"].get("new", 0) == contacts.get("by_status", {}).get("new", 0) + 1)
+            self.log_result("admin_dashboard", "Contact Insert Counted", counted, 
+                          f"contacts total {contacts['total']} -> {after['contacts']['total']}")
+            
+            # Test 3: A contact status change moves it between buckets
+            self.session.put(f"{self.base_url}/admin/contacts/{contact_id}", json={"status": "contacted"})
+            moved = dashboard()["contacts"]["by_status"]
+            counted = (moved.get("contacted", 0) == after["contacts"]["by_status"].get("contacted", 0) + 1 and
+                       moved.get("new", 0) == after["contacts"]["by_status"].get("new", 0) - 1)
+            self.log_result("admin_dashboard", "Contact Status Change Counted", counted, f"by_status={moved}")
+            
+            # Test 4: Property create, status update and delete
+            response = self.session.post(f"{self.base_url}/properties", json={
+                "title": "Counter Test Plot",
+                "price": "₹12,00,000",
+                "location": "Belagondapalli, Hosur",
+                "bedrooms": 1,
+                "parking": 0,
+                "area": "5 cents",
+                "type": "Investment",
+                "image": "https://images.unsplash.com/photo-1560518883-ce09059eeffa?auto=format&fit=crop&w=800&q=80"
+            })
+            property_id = response.json().get("property_id")
+            created = dashboard()["properties"]
+            self.session.put(f"{self.base_url}/properties/{property_id}", json={"status": "sold"})
+            sold = dashboard()["properties"]
+            self.session.delete(f"{self.base_url}/properties/{property_id}")
+            property_id = None
+            deleted = dashboard()["properties"]
+            counted = (created["total"] == properties["total"] + 1 and
+                       created["by_type"].get("Investment", 0) == properties["by_type"].get("Investment", 0) + 1 and
+                       sold["by_status"].get("sold", 0) == created["by_status"].get("sold", 0) + 1 and
+                       deleted["total"] == properties["total"] and
+                       deleted["by_status"].get("sold", 0) == properties["by_status"].get("sold", 0))
+            self.log_result("admin_dashboard", "Property Writes Counted", counted, 
+                          f"total {properties['total']} -> {created['total']} -> {deleted['total']}")
+            
+            # Test 5: Reconcile finds no drift
+            response = self.session.post(f"{self.base_url}/admin/counters/reconcile")
+            if response.status_code == 200:
+                drift = response.json().get("drift", {})
+                self.log_result("admin_dashboard", "Counter Reconcile", not any(drift.values()), f"drift={drift}")
+            else:
+                self.log_result("admin_dashboard", "Counter Reconcile", False, 
+                              f"HTTP {response.status_code}: {response.text}")
+        except Exception as e:
+            self.log_result("admin_dashboard", "Dashboard Counters", False, str(e))
+        finally:
+            if property_id:
+                self.session.delete(f"{self.base_url}/properties/{property_id}")
+    
+    def test_market_analytics(self):
+        """Test locality analytics: counts, type mix and median price per sq ft follow property writes"""
+        print("\n=== Testing Market Analytics ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: market analytics is only implemented by the local backend stand-in (--local)")
+            return
+        locality = f"Analytics Nagar {uuid.uuid4().hex[:6]}"
+        locality_url = f"{self.base_url}/admin/analytics/localities/{locality}"
+        listing_url = f"{self.base_url}/properties"
+        localities_url = f"{self.base_url}/admin/analytics/localities"
+        aggregates = self.local_backend.api.locality_aggregates
+        property_id = None
+        try:
+            # The sorted locality list is cached from here on; every write below must refresh it
+            self.session.get(localities_url, params={"sort": "median_sale_per_sqft"})
+            
+            # Test 1: A new listing opens its locality with exact figures
+            response = self.session.post(listing_url, json={
+                "title": "Analytics Test Villa",
+                "price": "₹60,00,000",
+                "location": f"{locality}, Hosur",
+                "bedrooms": 3,
+                "parking": 2,
+                "area": "2,000 sq ft",
+                "type": "For Sale",
+                "image": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80"
+            })
+            property_id = response.json().get("property_id")
+            summary = self.session.get(locality_url).json()
+            self.log_result("admin_dashboard", "Locality Aggregates On Create", 
+                          summary.get("listings") == 1 and summary.get("type_mix") == {"For Sale": 1.0} and 
+                          summary.get("median_price_per_sqft", {}).get("For Sale") == 3000.0, 
+                          f"{summary.get('name')}: listings {summary.get('listings')}, "
+                          f"median {summary.get('median_price_per_sqft')}")
+            
+            # Test 1b: The sorted list is served from the cache, refreshed by the write
+            ranked = self.session.get(localities_url, params={"sort": "median_sale_per_sqft"}).json()["localities"]
+            listed = [item for item in ranked if item["name"] == locality]
+            self.log_result("admin_dashboard", "Locality Ranking Cached And Refreshed", 
+                          len(listed) == 1 and listed[0]["listings"] == 1 and 
+                          aggregates.localities("median_sale_per_sqft") is aggregates.localities("median_sale_per_sqft"), 
+                          f"{locality} ranked {ranked.index(listed[0]) + 1 if listed else None} of {len(ranked)}")
+            
+            # Test 2: Changing the type moves the listing's contribution, even with no unit in the price
+            self.session.put(f"{listing_url}/{property_id}", json={"price": "₹25,000", "type": "For Rent"})
+            summary = self.session.get(locality_url).json()
+            self.log_result("admin_dashboard", "Locality Aggregates On Update", 
+                          summary.get("type_mix") == {"For Rent": 1.0} and 
+                          summary.get("median_price_per_sqft") == {"For Sale": None, "For Rent": 12.5, "Investment": None}, 
+                          f"type_mix {summary.get('type_mix')}, median {summary.get('median_price_per_sqft')}")
+            
+            # Test 2b: Only active listings count; a rented listing leaves the market and comes back when relisted
+            self.session.put(f"{listing_url}/{property_id}", json={"status": "rented"})
+            rented = self.session.get(locality_url)
+            self.session.put(f"{listing_url}/{property_id}", json={"status": "active"})
+            relisted = self.session.get(locality_url).json()
+            self.log_result("admin_dashboard", "Locality Aggregates Follow Status", 
+                          rented.status_code == 404 and relisted.get("listings") == 1, 
+                          f"rented HTTP {rented.status_code}, relisted listings {relisted.get('listings')}")
+            
+            # Test 3: Deleting the only listing removes the locality
+            self.session.delete(f"{listing_url}/{property_id}")
+            property_id = None
+            response = self.session.get(locality_url)
+            ranked = self.session.get(localities_url, params={"sort": "median_sale_per_sqft"}).json()["localities"]
+            self.log_result("admin_dashboard", "Locality Aggregates On Delete", 
+                          response.status_code == 404 and all(item["name"] != locality for item in ranked), 
+                          f"HTTP {response.status_code}, {len(ranked)} localities ranked")
+            
+            # Test 4: Localities add up to the market overview and the dashboard's active listings
+            overview = self.session.get(f"{self.base_url}/admin/analytics/overview").json()
+            localities = self.session.get(localities_url).json()["localities"]
+            total = self.session.get(f"{self.base_url}/admin/dashboard").json()["properties"]["active"]
+            self.log_result("admin_dashboard", "Analytics Overview Consistent", 
+                          overview["listings"] == total == sum(item["listings"] for item in localities) and 
+                          overview["localities"] == len(localities), 
+                          f"{overview['listings']} listings in {overview['localities']} localities, "
+                          f"median {overview['median_price_per_sqft']}")
+        except Exception as e:
+            self.log_result("admin_dashboard", "Market Analytics", False, str(e))
+        finally:
+            if property_id:
+                self.session.delete(f"{listing_url}/{property_id}")
+    
+    def test_readiness_probe(self):
+        """Test the readiness endpoint, a cold start and a saturated pool (local backend only)"""
+        print("\n=== Testing Readiness And Connection Pool ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the readiness probe is only implemented by the local backend stand-in (--local)")
+            return
+        try:
+            # Test 1: A running backend reports ready with pool statistics
+            response = self.session.get(f"{self.base_url}/health")
+            data = response.json() if response.status_code in (200, 503) else {}
+            pool = data.get("pool", {})
+            self.log_result("performance", "Readiness Probe", 
+                          response.status_code == 200 and data.get("ready") is True and 
+                          {"size", "in_use", "waiting", "saturation"} <= set(pool), 
+                          f"HTTP {response.status_code}, status {data.get('status')!r}, pool {pool.get('in_use')}/{pool.get('size')}")
+        except Exception as e:
+            self.log_result("performance", "Readiness Probe", False, str(e))
+        
+        # Test 2: Until startup finishes, listings answer 503 and the probe reports starting
+        db = MemoryDatabase(pool_size=4, min_pool_size=4, latency=POOL_DB_LATENCY, connect_latency=POOL_CONNECT_LATENCY * 5)
+        started = time.perf_counter()
+        backend = LocalBackend(api=LocalAPI(db, contact_ip_limit=None, contact_email_limit=None)).start(wait=False)
+        try:
+            early = requests.get(f"{backend.base_url}/properties", timeout=TIMEOUT)
+            probe = requests.get(f"{backend.base_url}/health", timeout=TIMEOUT)
+            self.log_result("performance", "Not Ready During Startup", 
+                          early.status_code == 503 and probe.status_code == 503 and probe.json()["status"] == "starting", 
+                          f"listing HTTP {early.status_code}, probe HTTP {probe.status_code}")
+            
+            # Test 3: The first listing after startup is served from the warmed cache
+            first = time_to_first_request(backend.base_url, started)
+            response = requests.get(f"{backend.base_url}/properties", timeout=TIMEOUT)
+            self.log_result("performance", "Time To First Request", 
+                          first is not None and response.headers.get("X-Cache") == "HIT", 
+                          f"{first * 1000 if first is not None else float('nan'):.0f} ms after start, "
+                          f"startup {backend.api.startup_seconds or 0:.3f}s, first listing X-Cache {response.headers.get('X-Cache')}")
+            
+            # Test 4: Concurrent requests queue for the pool instead of exceeding it
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                statuses = list(pool.map(lambda n: requests.get(f"{backend.base_url}/properties", params={"offset": n},
+                                                                timeout=TIMEOUT).status_code, range(64)))
+            stats = requests.get(f"{backend.base_url}/health", timeout=TIMEOUT).json()["pool"]
+            self.log_result("performance", "Pool Bounded Under Load", 
+                          all(status == 200 for status in statuses) and stats["peak_in_use"] <= stats["size"], 
+                          f"peak {stats['peak_in_use']}/{stats['size']} connections, mean wait {stats['avg_wait_ms']:.2f} ms")
+        except Exception as e:
+            self.log_result("performance", "Cold Start", False, str(e))
+        finally:
+            backend.stop()
+    
+    def test_metrics_export(self):
+        """Test the Prometheus metrics export counts requests per route"""
+        print("\n=== Testing Metrics Export ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the metrics export is only implemented by the local backend stand-in (--local)")
+            return
+        
+        def listing_count(metrics):
+            return sum(value for labels, value in metrics.get("velan_http_requests_total", [])
+                       if labels.get("route") == "/properties" and labels.get("method") == "GET")
+        
+        try:
+            response = self.session.get(f"{self.base_url}/metrics")
+            if response.status_code != 200:
+                self.log_result("performance", "Metrics Export", False, f"HTTP {response.status_code}")
+                return
+            self.log_result("performance", "Metrics Export", response.headers.get("Content-Type", "").startswith("text/plain"),
+                          f"Content-Type: {response.headers.get('Content-Type')}")
+            
+            before = listing_count(scrape_metrics(self.base_url))
+            for _ in range(3):
+                self.session.get(f"{self.base_url}/properties")
+            metrics = scrape_metrics(self.base_url)
+            counted = listing_count(metrics) == before + 3
+            self.log_result("performance", "Metrics Count Requests Per Route", counted, 
+                          f"GET /properties count {before:.0f} -> {listing_count(metrics):.0f}")
+            
+            phases = {labels["phase"] for labels, _ in metrics.get("velan_http_request_phase_seconds_sum", [])
+                      if labels.get("route") == "/properties"}
+            self.log_result("performance", "Metrics Phase Breakdown", phases == {"db", "serialize", "app"}, 
+                          f"phases={sorted(phases)}")
+        except Exception as e:
+            self.log_result("performance", "Metrics Export", False, str(e))
+    
+    def _median_latency(self, path, params=None, runs=BENCHMARK_QUERIES, base_url=None):
+        """Median wall-clock latency (ms) of an uncached GET request, or None if any call fails"""
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            response = self.session.get(f"{base_url or self.base_url}{path}", params=params, 
+                                        headers={"Cache-Control": "no-cache"})
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                return None
+        return percentile(samples, 50)
+    
+    def test_search_latency(self):
+        """Benchmark full-text search latency over a few thousand listings (local backend only)"""
+        print("\n=== Benchmarking Property Search ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: seeding listings needs the local backend (--local)")
+            return
+        
+        queries = ["3 BHK gym Hosur", "swimming pool mathigiri", "apartmnt", "villa garden"]
+        backend = LocalBackend(api=LocalAPI(seed=False)).start()
+        try:
+            backend.api.load_properties(generate_properties(SEARCH_BENCHMARK_LISTINGS))
+            for query in queries:
+                latency = self._median_latency("/properties/search", {"q": query}, base_url=backend.base_url)
+                if latency is None:
+                    self.log_result("performance", f"Search '{query}'", False, "Request failed")
+                    continue
+                self.log_result("performance", f"Search '{query}' ({SEARCH_BENCHMARK_LISTINGS} listings)", 
+                              latency <= SEARCH_LATENCY_BUDGET_MS, 
+                              f"median {latency:.2f} ms (budget {SEARCH_LATENCY_BUDGET_MS} ms)")
+        finally:
+            backend.stop()
+    
+    def test_regression_harness(self):
+        """Test the regression benchmark: every scenario measured, baselines round-trip, slowdowns flagged"""
+        print("\n=== Testing Performance Regression Harness ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the regression benchmark runs on its own local backend (--local)")
+            return
+        try:
+            results = run_regression_benchmark(listings=500, iterations=5, warmup=1)
+            
+            # Test 1: Every scenario produces error-free samples
+            report = results["results"]
+            self.log_result("performance", "Benchmark Scenarios Measured", 
+                          len(report) >= len(REGRESSION_SCENARIOS) and 
+                          all(stats["requests"] == 5 and not stats["error_rate"] for stats in report.values()), 
+                          f"{len(report)} endpoints: {', '.join(report)}")
+            
+            # Test 2: A stored baseline reads back and matches itself
+            path = os.path.join(tempfile.mkdtemp(prefix="velan-benchmark-"), "baseline.json")
+            save_baseline(path, results)
+            rows = compare_to_baseline(results, load_baseline(path))
+            self.log_result("performance", "Baseline Round Trip", 
+                          bool(rows) and not any(row["regressed"] for row in rows), 
+                          f"{len(rows)} comparisons against the stored copy")
+            
+            # Test 3: Running slower than the baseline beyond tolerance is a regression
+            faster = {"results": {endpoint: {metric: value / 2 for metric, value in stats.items()}
+                                  for endpoint, stats in report.items()}}
+            rows = compare_to_baseline(results, faster, noise_floor_ms=0.0)
+            self.log_result("performance", "Regression Detected", 
+                          bool(rows) and all(row["regressed"] for row in rows), 
+                          f"{sum(row['regressed'] for row in rows)}/{len(rows)} metrics flagged at 2x the baseline")
+            
+            # Test 4: Throughput regresses when it drops, not when it rises
+            busier = {"results": {endpoint: dict(stats, throughput=stats["throughput"] * 2)
+                                  for endpoint, stats in report.items()}}
+            dropped = compare_to_baseline(results, busier, {"throughput": 0.2})
+            risen = compare_to_baseline(busier, results, {"throughput": 0.2})
+            self.log_result("performance", "Throughput Drop Detected", 
+                          bool(dropped) and all(row["regressed"] for row in dropped) and 
+                          not any(row["regressed"] for row in risen), 
+                          f"{sum(row['regressed'] for row in dropped)}/{len(dropped)} flagged at half the baseline, "
+                          f"{sum(row['regressed'] for row in risen)} at double")
+            
+            # Test 5: Metrics the baseline predates are reported as new, not compared
+            older = {"results": {endpoint: {metric: value for metric, value in stats.items() if metric != "p95"}
+                                 for endpoint, stats in report.items()}}
+            rows = compare_to_baseline(results, older)
+            new = [row for row in rows if row["baseline"] is None]
+            self.log_result("performance", "Baseline Missing Metric", 
+                          len(new) == len(report) and all(row["metric"] == "p95" and not row["regressed"] for row in new), 
+                          f"{len(new)} p95 rows reported as new against a baseline without p95")
+            
+            # Test 6: Throughput is per scenario, so each endpoint's rate reflects its own requests
+            rates = {endpoint: stats["throughput"] for endpoint, stats in report.items()}
+            self.log_result("performance", "Per Scenario Throughput", 
+                          all(rate > 5 / results["elapsed"] for rate in rates.values()), 
+                          ", ".join(f"{endpoint} {rate:.0f} req/s" for endpoint, rate in rates.items()))
+            
+            # Test 7: Tolerances for unknown metrics or without a value are rejected
+            rejected = []
+            for text in ("p42=0.1", "p50", "p95=fast"):
+                try:
+                    parse_tolerances(text)
+                except ValueError:
+                    rejected.append(text)
+            self.log_result("performance", "Invalid Tolerances Rejected", len(rejected) == 3 and 
+                          parse_tolerances("throughput=0.1")["throughput"] == 0.1, f"rejected {rejected}")
+        except Exception as e:
+            self.log_result("performance", "Regression Harness", False, str(e))
+    
+    def test_load_tester(self):
+        """Test that the load tester deletes what it creates, stops at its deadline and guards remote runs"""
+        print("\n=== Testing Load Tester ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: the load tester runs against its own local backend (--local)")
+            return
+        backend = LocalBackend(api=LocalAPI(contact_ip_limit=None, contact_email_limit=None)).start()
+        try:
+            # Test 1: A listing created just before the deadline is still deleted
+            before = backend.api.db.properties.count()
+            tester = VelanPropertiesLoadTester(backend.base_url, rate=1)  # one slot a second: the PUT falls past the end
+            tester._next_slot = time.perf_counter()
+            tester._deadline = tester._next_slot + 0.5
+            tester.scenario_property_crud(0)
+            sent = {endpoint: len(samples) for endpoint, samples in tester.latencies.items()}
+            self.log_result("performance", "Load Tester Cleans Up", 
+                          sent == {"POST /properties": 1, "DELETE /properties/{id}": 1} and not tester.errors and 
+                          backend.api.db.properties.count() == before, 
+                          f"sent {sent}, {backend.api.db.properties.count() - before} listings left behind")
+            
+            # Test 2: No scenario starts once it could not finish before the deadline
+            tester = VelanPropertiesLoadTester(backend.base_url, workers=8, rate=0, duration=1.0, mix={"property_crud": 1})
+            tester.drive()
+            self.log_result("performance", "Load Tester Stops At Deadline", 
+                          tester.elapsed < tester.duration + 0.25 and backend.api.db.properties.count() == before, 
+                          f"ran {tester.elapsed:.3f}s for a {tester.duration:.1f}s run, "
+                          f"{len(tester.latencies['POST /properties'])} listings created and deleted")
+        except Exception as e:
+            self.log_result("performance", "Load Tester", False, str(e))
+        finally:
+            backend.stop()
+        
+        # Test 3: Only loopback URLs count as local, so --load needs --allow-remote-writes elsewhere
+        local = [url for url in ("http://localhost:8001/api", "http://127.0.0.1:8001/api", "http://[::1]/api",
+                                 BASE_URL, "http://10.0.0.5/api") if is_local_url(url)]
+        self.log_result("performance", "Load Tester Remote Guard", len(local) == 3, f"treated as local: {local}")
+    
+    def test_analytics_latency(self):
+        """Benchmark analytics queries as listings grow by orders of magnitude (local backend only)"""
+        print("\n=== Benchmarking Market Analytics ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: seeding a large collection needs the local backend (--local)")
+            return
+        
+        queries = {
+            "overview": ("/admin/analytics/overview", None),
+            "localities": ("/admin/analytics/localities", {"sort": "median_sale_per_sqft"}),
+            "locality": ("/admin/analytics/localities/Mathigiri", None)
+        }
+        backend = LocalBackend(api=LocalAPI(seed=False)).start()
+        try:
+            medians = defaultdict(list)
+            seeded = 0
+            for size in ANALYTICS_BENCHMARK_SIZES:
+                backend.api.load_properties(generate_properties(size - seeded, start=seeded))
+                seeded = size
+                # What answering on demand would cost: a rebuild scans every listing
+                started = time.perf_counter()
+                backend.api.locality_aggregates.reconcile()
+                rebuild = (time.perf_counter() - started) * 1000
+                for name, (path, params) in queries.items():
+                    latency = self._median_latency(path, params, base_url=backend.base_url)
+                    if latency is None:
+                        self.log_result("performance", f"Analytics {name} ({size} listings)", False, "Request failed")
+                        return
+                    medians[name].append(latency)
+                self.log_result("performance", f"Analytics Queries ({size} listings)", True, 
+                              ", ".join(f"{name} {latencies[-1]:.2f} ms" for name, latencies in medians.items()) + 
+                              f"; full rebuild {rebuild:.0f} ms")
+            
+            for name, latencies in medians.items():
+                ratio = max(latencies) / min(latencies)
+                self.log_result("performance", f"Analytics {name} Latency Flat", ratio <= FLAT_LATENCY_TOLERANCE, 
+                              f"{ANALYTICS_BENCHMARK_SIZES[0]} -> {ANALYTICS_BENCHMARK_SIZES[-1]} listings, "
+                              f"slowest/fastest median = {ratio:.2f}x (tolerance {FLAT_LATENCY_TOLERANCE}x)")
+        finally:
+            backend.stop()
+    
+    def _wire_size(self, path, params, accept_encoding):
+        """Bytes on the wire and median latency (ms) of an uncached GET with the given Accept-Encoding"""
+        headers = {"Cache-Control": "no-cache", "Accept-Encoding": accept_encoding}
+        samples = []
+        size = 0
+        for _ in range(BENCHMARK_QUERIES):
+            started = time.perf_counter()
+            response = self.session.get(f"{self.base_url}{path}", params=params, headers=headers, stream=True)
+            size = len(response.raw.read(decode_content=False))
+            samples.append((time.perf_counter() - started) * 1000)
+        return size, percentile(samples, 50)
+    
+    def test_listing_payload_size(self):
+        """Benchmark listing payload size and latency: full documents vs card view, identity vs gzip"""
+        print("\n=== Benchmarking Listing Payload Size ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: projection and compression are only implemented by the local backend stand-in (--local)")
+            return
+        variants = [
+            ("full", {"limit": 100}, "identity"),
+            ("card", {"limit": 100, "view": "card"}, "identity"),
+            ("card+gzip", {"limit": 100, "view": "card"}, "gzip")
+        ]
+        sizes = {}
+        try:
+            for name, params, encoding in variants:
+                sizes[name], latency = self._wire_size("/properties", params, encoding)
+                self.log_result("performance", f"Listing Payload {name}", sizes[name] > 0, 
+                              f"{sizes[name] / 1024:.1f} KiB, median {latency:.2f} ms")
+            self.log_result("performance", "Card View Shrinks Payload", sizes["card"] < sizes["full"], 
+                          f"{sizes['full'] / sizes['card']:.1f}x smaller than full documents")
+            self.log_result("performance", "Gzip Shrinks Payload", sizes["card+gzip"] < sizes["card"], 
+                          f"{sizes['full'] / sizes['card+gzip']:.1f}x smaller than uncompressed full documents")
+        except Exception as e:
+            self.log_result("performance", "Listing Payload Size", False, str(e))
+    
+    def test_filtered_query_scaling(self):
+        """Benchmark filtered listing latency as the collection grows (local backend only)"""
+        print("\n=== Benchmarking Filtered Property Queries ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: seeding a large collection needs the local backend (--local)")
+            return
+        
+        backend = LocalBackend(api=LocalAPI(seed=False)).start()
+        try:
+            api = backend.api
+            needle_location = "Thally Road"
+            # A fixed set of listings the queries target, while unrelated listings grow around them
+            needles = list(generate_properties(40, localities=[needle_location], start=10_000_000))
+            for needle in needles:
+                if needle["type"] == "For Sale":
+                    needle["price"] = "₹20,50,000"  # generated sale prices are whole lakhs, so only needles cost this
+            api.load_properties(needles)
+            queries = {
+                "location": {"location": f"{needle_location}, Hosur"},
+                "location+type+price": {"location": needle_location, "type": "For Sale",
+                                        "min_price": 2000000, "max_price": 15000000},
+                # Broad filters: a third of all listings have each type
+                "type": {"type": "For Rent"},
+                # Broad type, narrow price band that only the needles fall in
+                "type+price": {"type": "For Sale", "min_price": 2010000, "max_price": 2090000}
+            }
+            
+            medians = defaultdict(list)
+            seeded = 0
+            for size in BENCHMARK_SIZES:
+                api.load_properties(generate_properties(size - seeded, start=seeded))
+                seeded = size
+                for name, params in queries.items():
+                    latency = self._median_latency("/properties", params, base_url=backend.base_url)
+                    if latency is None:
+                        self.log_result("performance", f"Filtered Query {name} ({size} listings)", False, 
+                                      "Request failed")
+                        return
+                    medians[name].append(latency)
+                    self.log_result("performance", f"Filtered Query {name} ({size} listings)", True, 
+                                  f"median {latency:.2f} ms")
+            
+            for name, latencies in medians.items():
+                ratio = max(latencies) / min(latencies)
+                self.log_result("performance", f"Filtered Query {name} Latency Flat", ratio <= FLAT_LATENCY_TOLERANCE, 
+                              f"{BENCHMARK_SIZES[0]} -> {BENCHMARK_SIZES[-1]} listings, slowest/fastest median = {ratio:.2f}x "
+                              f"(tolerance {FLAT_LATENCY_TOLERANCE}x)")
+        finally:
+            backend.stop()
+    
+    def test_deep_pagination(self):
+        """Benchmark offset vs cursor pagination walking deep into a large collection (local backend only)"""
+        print("\n=== Benchmarking Deep Pagination ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: seeding a large collection needs the local backend (--local)")
+            return
+        
+        backend = LocalBackend(api=LocalAPI(seed=False)).start()
+        try:
+            api = backend.api
+            api.load_properties(generate_properties(PAGINATION_PAGES * PAGINATION_LIMIT * 4))
+            
+            offset_latencies = []
+            for page in range(PAGINATION_PAGES):
+                started = time.perf_counter()
+                response = self.session.get(f"{backend.base_url}/properties", 
+                                            params={"limit": PAGINATION_LIMIT, "offset": page * PAGINATION_LIMIT})
+                offset_latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    self.log_result("performance", "Offset Pagination", False, f"HTTP {response.status_code}")
+                    return
+            
+            cursor_latencies = []
+            cursor = ""
+            seen_ids = set()
+            for page in range(PAGINATION_PAGES):
+                started = time.perf_counter()
+                response = self.session.get(f"{backend.base_url}/properties", 
+                                            params={"limit": PAGINATION_LIMIT, "cursor": cursor})
+                cursor_latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    self.log_result("performance", "Cursor Pagination", False, f"HTTP {response.status_code}")
+                    return
+                data = response.json()
+                seen_ids.update(prop["id"] for prop in data["items"])
+                cursor = data["next_cursor"]
+            
+            depth = PAGINATION_PAGES * PAGINATION_LIMIT
+            offset_first = percentile(offset_latencies[:10], 50)
+            offset_deep = percentile(offset_latencies[-10:], 50)
+            cursor_first = percentile(cursor_latencies[:10], 50)
+            cursor_deep = percentile(cursor_latencies[-10:], 50)
+            collection_size = api.db.properties.count()
+            self.log_result("performance", f"Offset Pagination ({collection_size} listings)", True, 
+                          f"first pages {offset_first:.2f} ms, pages near row {depth} {offset_deep:.2f} ms")
+            self.log_result("performance", f"Cursor Pagination ({collection_size} listings)", True, 
+                          f"first pages {cursor_first:.2f} ms, pages near row {depth} {cursor_deep:.2f} ms")
+            self.log_result("performance", "Cursor Pagination No Duplicates", len(seen_ids) == depth, 
+                          f"{len(seen_ids)} unique listings over {depth} rows")
+            self.log_result("performance", "Cursor Pagination Latency Flat", cursor_deep <= cursor_first * FLAT_LATENCY_TOLERANCE, 
+                          f"deep/first page median = {cursor_deep / cursor_first:.2f}x (tolerance {FLAT_LATENCY_TOLERANCE}x); "
+                          f"cursor is {offset_deep / cursor_deep:.1f}x faster than offset at depth")
+        finally:
+            backend.stop()
+    
+    def test_bulk_import_throughput(self):
+        """Benchmark one streamed bulk import against per-item POSTs (local backend only)"""
+        print("\n=== Benchmarking Bulk vs Per-Item Import ===")
+        if not self.local_backend:
+            print("⚠️  Skipped: imports thousands of listings, run against the local backend (--local)")
+            return
+        
+        backend = LocalBackend(api=LocalAPI(seed=False)).start()
+        try:
+            started = time.perf_counter()
+            for payload in generate_properties(BULK_IMPORT_ROWS, start=30_000_000):
+                response = self.session.post(f"{backend.base_url}/properties", json=payload)
+                if response.status_code != 200:
+                    self.log_result("performance", "Per-Item Import", False, f"HTTP {response.status_code}")
+                    return
+            per_item_rate = BULK_IMPORT_ROWS / (time.perf_counter() - started)
+            
+            def ndjson_body():
+                for payload in generate_properties(BULK_IMPORT_ROWS, start=31_000_000):
+                    yield (json.dumps(payload) + "\n").encode("utf-8")
+            
+            started = time.perf_counter()
+            response = self.session.post(f"{backend.base_url}/properties/bulk", data=ndjson_body(), 
+                                         headers={"Content-Type": "application/x-ndjson"})
+            bulk_rate = BULK_IMPORT_ROWS / (time.perf_counter() - started)
+            if response.status_code != 200 or response.json().get("created") != BULK_IMPORT_ROWS:
+                self.log_result("performance", "Bulk Import", False, f"HTTP {response.status_code}: {response.text[:200]}")
+                return
+            
+            self.log_result("performance", "Per-Item Import Throughput", True, f"{per_item_rate:.0f} rows/s")
+            self.log_result("performance", "Bulk Import Throughput", bulk_rate > per_item_rate, 
+                          f"{bulk_rate:.0f} rows/s ({bulk_rate / per_item_rate:.1f}x per-item)")
+        finally:
+            backend.stop()
+    
     def print_summary(self):
         """Print test summary"""
         print("\n" + "="*60)
@@ -423,6 +2212,7 @@ class VelanPropertiesAPITester:
         print(f"✅ Total Passed: {total_passed}")
         print(f"❌ Total Failed: {total_failed}")
         print(f"📊 Success Rate: {(total_passed/(total_passed+total_failed)*100):.1f}%" if (total_passed+total_failed) > 0 else "No tests run")
+        print_server_metrics(self.base_url)
         
         return total_failed == 0
     
@@ -438,16 +2228,539 @@ class VelanPropertiesAPITester:
         
         # Run all test suites
         self.test_contact_form_api()
+        self.test_contact_rate_limits()
+        self.test_contact_notifications()
         self.test_properties_api()
+        self.test_property_search()
+        self.test_field_projection()
+        self.test_response_compression()
+        self.test_image_pipeline()
+        self.test_listing_cache()
         self.test_property_crud_operations()
+        self.test_bulk_import_export()
+        self.test_change_feed()
         self.test_admin_dashboard()
+        self.test_dashboard_counters()
+        self.test_market_analytics()
+        self.test_metrics_export()
+        self.test_readiness_probe()
+        self.test_regression_harness()
+        self.test_load_tester()
+        self.test_search_latency()
+        self.test_listing_payload_size()
+        self.test_filtered_query_scaling()
+        self.test_analytics_latency()
+        self.test_deep_pagination()
+        self.test_bulk_import_throughput()
         
         # Print summary
         return self.print_summary()
 
+
+class VelanPropertiesLoadTester(VelanPropertiesAPITester):
+    """Concurrent load generator for the Velan Properties API"""
+
+    def __init__(self, base_url=BASE_URL, workers=LOAD_WORKERS, rate=LOAD_RATE, duration=LOAD_DURATION, mix=None):
+        super().__init__(base_url)
+        self.workers = workers
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or LOAD_MIX
+        self.schedule = [name for name, weight in self.mix.items() for _ in range(weight)]
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.elapsed = 0.0
+        self.endpoint_elapsed = {}  # endpoint -> seconds it was measured over, when not the whole run
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_slot = 0.0
+        self._deadline = float("inf")
+        self._sequence = 0
+        self._scenario_seconds = {}  # scenario -> (runs, total seconds), to judge whether one still fits
+
+    def _session(self):
+        """One requests.Session per worker thread (Session is not thread-safe)"""
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _record(self, endpoint, started, ok):
+        latency = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def _call(self, endpoint, method, path, expected=200, cleanup=False, **kwargs):
+        """Issue one request in the next rate slot and record its latency under the endpoint label.
+
+        Latency is measured from the slot's scheduled start, not from when
+        the request was actually sent, so time spent waiting for a busy
+        worker counts (no coordinated omission). Returns None without
+        sending once the slots run past the end of the run, unless cleanup
+        is set: cleanup requests past the end are sent straight away.
+        """
+        scheduled = self._reserve_slot()
+        if scheduled >= self._deadline:
+            if not cleanup:
+                return None
+            scheduled = time.perf_counter()
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            response = self._session().request(method, f"{self.base_url}{path}", timeout=TIMEOUT, **kwargs)
+            ok = response.status_code == expected
+        except Exception:
+            response = None
+            ok = False
+        self._record(endpoint, scheduled, ok)
+        return response if ok else None
+
+    def _reserve_slot(self):
+        """Scheduled start of the next request at the target rate (now when unbounded).
+
+        Slots follow a fixed schedule from the start of the run; a slot is
+        not moved later when the workers fall behind it.
+        """
+        if not self.rate:
+            return time.perf_counter()
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot = slot + 1.0 / self.rate
+        return slot
+
+    def _next_scenario(self):
+        with self._lock:
+            name = self.schedule[self._sequence % len(self.schedule)]
+            self._sequence += 1
+            return name, self._sequence
+
+    def scenario_list_properties(self, n):
+        self._call("GET /properties", "GET", "/properties")
+
+    def scenario_submit_contact(self, n):
+        contact = {
+            "name": f"Load Tester {n}",
+            "email": f"load.tester{n}@example.com",
+            "phone": "+919876543210",
+            "message": "Load test inquiry about 2BHK apartments near Hosur bus stand."
+        }
+        self._call("POST /contacts", "POST", "/contacts", json=contact)
+
+    def scenario_property_crud(self, n):
+        new_property = {
+            "title": f"Load Test Property {n}",
+            "price": "₹42,00,000",
+            "location": "Bagalur Road, Hosur",
+            "bedrooms": 2,
+            "parking": 1,
+            "area": "1,150 sq ft",
+            "type": "For Sale",
+            "image": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80"
+        }
+        response = self._call("POST /properties", "POST", "/properties", json=new_property)
+        property_id = response.json().get("property_id") if response is not None else None
+        if not property_id:
+            return
+        try:
+            self._call("PUT /properties/{id}", "PUT", f"/properties/{property_id}", json={"price": "₹41,50,000"})
+        finally:
+            self._call("DELETE /properties/{id}", "DELETE", f"/properties/{property_id}", cleanup=True)
+
+    def _worker(self, deadline):
+        """Run scenarios until the next one would not finish before the deadline"""
+        while True:
+            name, n = self._next_scenario()
+            runs, seconds = self._scenario_seconds.get(name, (0, 0.0))
+            started = time.perf_counter()
+            if started + (seconds / runs if runs else 0.0) >= deadline:
+                return
+            getattr(self, f"scenario_{name}")(n)
+            with self._lock:
+                runs, seconds = self._scenario_seconds.get(name, (0, 0.0))
+                self._scenario_seconds[name] = (runs + 1, seconds + time.perf_counter() - started)
+
+    def run_load_test(self):
+        """Drive the scenario mix from many workers at once for the configured duration"""
+        print("Starting Velan Properties API Load Test...")
+        print(f"Testing against: {self.base_url}")
+        print(f"Workers: {self.workers}, target rate: {self.rate or 'unbounded'} req/s, duration: {self.duration}s")
+
+        if not self.test_health_check():
+            print("❌ Backend API is not responding. Aborting load test.")
+            return False
+
+        self.drive()
+        return self.print_load_summary()
+
+    def drive(self):
+        """Run the workers for the configured duration, recording latencies"""
+        started = time.perf_counter()
+        self._next_slot = started
+        deadline = self._deadline = started + self.duration
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            workers = [pool.submit(self._worker, deadline) for _ in range(self.workers)]
+            for worker in workers:
+                worker.result()  # re-raise anything a worker died of
+        self.elapsed = time.perf_counter() - started
+
+    def load_report(self):
+        """Per-endpoint latency percentiles (ms), throughput (req/s) and error rate"""
+        report = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            count = len(samples)
+            elapsed = self.endpoint_elapsed.get(endpoint, self.elapsed)
+            report[endpoint] = {
+                "requests": count,
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+                "throughput": count / elapsed if elapsed else 0.0,
+                "error_rate": self.errors[endpoint] / count if count else 0.0
+            }
+        return report
+
+    def print_load_summary(self):
+        """Print load test summary"""
+        print("\n" + "="*60)
+        print("VELAN PROPERTIES BACKEND API LOAD TEST SUMMARY")
+        print("="*60)
+
+        report = self.load_report()
+        total_requests = 0
+        total_errors = 0
+        for endpoint, stats in report.items():
+            total_requests += stats["requests"]
+            total_errors += self.errors[endpoint]
+            print(f"\n{endpoint}:")
+            print(f"  Requests: {stats['requests']}")
+            print(f"  Latency p50/p95/p99: {stats['p50']:.1f} / {stats['p95']:.1f} / {stats['p99']:.1f} ms")
+            print(f"  Throughput: {stats['throughput']:.1f} req/s")
+            print(f"  Error Rate: {stats['error_rate']*100:.1f}%")
+
+        print(f"\nOVERALL RESULTS:")
+        print(f"📊 Total Requests: {total_requests} in {self.elapsed:.1f}s")
+        print(f"📊 Throughput: {(total_requests/self.elapsed if self.elapsed else 0):.1f} req/s")
+        print(f"❌ Total Errors: {total_errors}")
+        print_server_metrics(self.base_url)
+
+        return total_errors == 0
+
+
+class VelanPropertiesBenchmark(VelanPropertiesLoadTester):
+    """Sequential, repeatable latency benchmark of the main API scenarios.
+
+    Scenarios run one after another from a single client, so results
+    depend on the server rather than on client scheduling. GET requests
+    send Cache-Control: no-cache so every run does the full query work.
+    """
+
+    def __init__(self, base_url=BASE_URL, scenarios=None, iterations=REGRESSION_ITERATIONS, warmup=REGRESSION_WARMUP):
+        super().__init__(base_url, workers=1, rate=0)
+        self.scenarios = scenarios or REGRESSION_SCENARIOS
+        self.iterations = iterations
+        self.warmup = warmup
+        self._cursor = ""
+
+    def _session(self):
+        session = super()._session()
+        session.headers["Cache-Control"] = "no-cache"
+        return session
+
+    def scenario_filtered_listing(self, n):
+        self._call("GET /properties?filtered", "GET", "/properties",
+                   params={"location": "Hosur", "type": "For Sale", "min_price": 2000000, "max_price": 15000000})
+
+    def scenario_paginate(self, n):
+        """Walk the listing a page at a time with a cursor, starting over at the end"""
+        response = self._call("GET /properties?cursor", "GET", "/properties",
+                              params={"limit": PAGINATION_LIMIT, "cursor": self._cursor})
+        self._cursor = (response.json()["next_cursor"] or "") if response is not None else ""
+
+    def scenario_dashboard(self, n):
+        self._call("GET /admin/dashboard", "GET", "/admin/dashboard")
+
+    def run_scenarios(self):
+        """Time every scenario in turn; warmup samples are discarded.
+
+        An endpoint's throughput is over the timed runs of its own
+        scenario, not over the whole benchmark.
+        """
+        started = time.perf_counter()
+        for name in self.scenarios:
+            scenario = getattr(self, f"scenario_{name}")
+            recorded = set(self.latencies)
+            for n in range(self.warmup):
+                scenario(n)
+            for endpoint in set(self.latencies) - recorded:
+                del self.latencies[endpoint]
+                self.errors.pop(endpoint, None)
+            timed = time.perf_counter()
+            for n in range(self.iterations):
+                scenario(self.warmup + n)
+            elapsed = time.perf_counter() - timed
+            for endpoint in set(self.latencies) - recorded:
+                self.endpoint_elapsed[endpoint] = elapsed
+        self.elapsed = time.perf_counter() - started
+
+
+def is_local_url(url):
+    """Whether url points at this machine (localhost or a loopback address)"""
+    host = urlsplit(url).hostname or ""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def time_to_first_request(base_url, started, timeout=TIMEOUT):
+    """Seconds from started until GET /properties first succeeds, or None on timeout"""
+    session = requests.Session()
+    while time.perf_counter() - started < timeout:
+        try:
+            if session.get(f"{base_url}/properties", timeout=TIMEOUT).status_code == 200:
+                return time.perf_counter() - started
+        except requests.RequestException:
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def run_pool_benchmark(pool_sizes=POOL_SIZES, workers=LOAD_WORKERS, duration=POOL_BENCHMARK_DURATION):
+    """Cold-start and load a local backend per pool size against a simulated remote database.
+
+    Each backend opens its whole pool at startup, so larger pools start
+    slower but queue less under load. Reports time to first successful
+    request, latency percentiles, throughput and pool waits per size.
+    """
+    print("Starting Velan Properties Connection Pool Benchmark...")
+    print(f"Pool sizes: {pool_sizes}, workers: {workers}, duration: {duration}s per size, "
+          f"database round trip {POOL_DB_LATENCY * 1000:.0f} ms")
+    rows = []
+    for size in pool_sizes:
+        db = MemoryDatabase(pool_size=size, min_pool_size=size, latency=POOL_DB_LATENCY,
+                            connect_latency=POOL_CONNECT_LATENCY)
+        started = time.perf_counter()
+        backend = LocalBackend(api=LocalAPI(db, contact_ip_limit=None, contact_email_limit=None)).start(wait=False)
+        try:
+            first = time_to_first_request(backend.base_url, started)
+            tester = VelanPropertiesLoadTester(backend.base_url, workers=workers, rate=0, duration=duration)
+            tester.drive()
+            samples = [latency for latencies in tester.latencies.values() for latency in latencies]
+            rows.append({
+                "pool_size": size,
+                "first_request": first,
+                "requests": len(samples),
+                "errors": sum(tester.errors.values()),
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+                "throughput": len(samples) / tester.elapsed if tester.elapsed else 0.0,
+                "pool": db.pool.stats()
+            })
+        finally:
+            backend.stop()
+
+    print("\n" + "="*60)
+    print("VELAN PROPERTIES CONNECTION POOL BENCHMARK SUMMARY")
+    print("="*60)
+    for row in rows:
+        first = f"{row['first_request'] * 1000:.0f} ms" if row["first_request"] is not None else "timed out"
+        print(f"\nPool size {row['pool_size']}:")
+        print(f"  Time to first request: {first}")
+        print(f"  Latency p50/p95/p99: {row['p50']:.1f} / {row['p95']:.1f} / {row['p99']:.1f} ms")
+        print(f"  Throughput: {row['throughput']:.1f} req/s ({row['requests']} requests, {row['errors']} errors)")
+        print(f"  Pool: peak {row['pool']['peak_in_use']}/{row['pool']['size']} in use, "
+              f"mean wait {row['pool']['avg_wait_ms']:.2f} ms per operation")
+    return all(row["first_request"] is not None and not row["errors"] for row in rows)
+
+
+def benchmark_environment():
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def run_regression_benchmark(listings=REGRESSION_LISTINGS, iterations=REGRESSION_ITERATIONS, warmup=REGRESSION_WARMUP,
+                             scenarios=None):
+    """Run the benchmark scenarios against a freshly seeded local backend and return the results document"""
+    # One client submits every contact, so both contact rate limits are off
+    api = LocalAPI(contact_ip_limit=None, contact_email_limit=None)
+    backend = LocalBackend(api=api).start()
+    try:
+        api.load_properties(generate_properties(listings))
+        benchmark = VelanPropertiesBenchmark(backend.base_url, scenarios, iterations, warmup)
+        benchmark.run_scenarios()
+        report = benchmark.load_report()
+    finally:
+        backend.stop()
+    return {"created": datetime.now().isoformat(timespec="seconds"), "environment": benchmark_environment(),
+            "listings": listings, "iterations": iterations, "elapsed": benchmark.elapsed, "results": report}
+
+
+def load_baseline(path):
+    """The stored baseline document, or None if there is none yet"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, document):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_to_baseline(results, baseline, tolerances=REGRESSION_TOLERANCES, noise_floor_ms=REGRESSION_NOISE_FLOOR_MS):
+    """One row per endpoint and metric present in both runs.
+
+    Metrics the baseline lacks (added since it was recorded) get a row
+    with baseline None that never regresses. A metric regresses when it is worse than the baseline (slower latency,
+    lower throughput; see REGRESSION_METRICS) by more than its tolerance (a
+    fraction), and for latencies also by more than the noise floor.
+    """
+    rows = []
+    for endpoint, stats in sorted(results["results"].items()):
+        previous = baseline["results"].get(endpoint)
+        if previous is None:
+            continue
+        for metric, tolerance in tolerances.items():
+            if metric not in stats:
+                continue
+            before, after = previous.get(metric), stats[metric]
+            if before is None:
+                rows.append({"endpoint": endpoint, "metric": metric, "baseline": None, "current": after,
+                             "change": None, "tolerance": tolerance, "regressed": False})
+                continue
+            change = (after - before) / before if before else 0.0
+            if REGRESSION_METRICS[metric] == "higher":
+                regressed = -change > tolerance
+            else:
+                regressed = change > tolerance and after - before > noise_floor_ms
+            rows.append({"endpoint": endpoint, "metric": metric, "baseline": before, "current": after,
+                         "change": change, "tolerance": tolerance, "regressed": regressed})
+    return rows
+
+
+def print_regression_report(results, baseline, rows):
+    """Print the comparison; returns True when nothing regressed and no request failed"""
+    print("\n" + "="*60)
+    print("VELAN PROPERTIES PERFORMANCE REGRESSION REPORT")
+    print("="*60)
+    print(f"Baseline from {baseline.get('created')}, {baseline.get('listings')} listings, "
+          f"{baseline.get('iterations')} runs per scenario")
+    if baseline.get("environment") != results["environment"]:
+        print(f"⚠️  Baseline was recorded on a different environment: {baseline.get('environment')}")
+    
+    for row in rows:
+        mark = "❌" if row["regressed"] else "✅"
+        unit = "req/s" if row["metric"] == "throughput" else "ms"
+        if row["baseline"] is None:
+            print(f"➕ {row['endpoint']} {row['metric']}: {row['current']:.2f} {unit} (new, no baseline)")
+            continue
+        print(f"{mark} {row['endpoint']} {row['metric']}: {row['baseline']:.2f} -> {row['current']:.2f} {unit} "
+              f"({row['change'] * 100:+.0f}%, tolerance {row['tolerance'] * 100:.0f}%)")
+    for endpoint in sorted(set(results["results"]) - set(baseline["results"])):
+        print(f"➕ {endpoint}: not in baseline")
+    
+    errors = {endpoint: stats["error_rate"] for endpoint, stats in results["results"].items() if stats["error_rate"]}
+    for endpoint, rate in sorted(errors.items()):
+        print(f"❌ {endpoint}: {rate * 100:.1f}% of requests failed")
+    regressions = sum(row["regressed"] for row in rows)
+    compared = sum(row["baseline"] is not None for row in rows)
+    print(f"\n📊 {regressions} regression(s) in {compared} comparisons")
+    return not regressions and not errors
+
+
+def parse_tolerances(text):
+    """"p50=0.25,p95=0.5" -> {"p50": 0.25, "p95": 0.5}, on top of the defaults.
+
+    Raises ValueError for a malformed item or a metric not in REGRESSION_METRICS.
+    """
+    tolerances = dict(REGRESSION_TOLERANCES)
+    for item in filter(None, text.split(",")):
+        metric, separator, value = (part.strip() for part in item.partition("="))
+        if not separator:
+            raise ValueError(f"expected METRIC=FRACTION, got {item!r}")
+        if metric not in REGRESSION_METRICS:
+            raise ValueError(f"unknown metric {metric!r}, expected one of {', '.join(REGRESSION_METRICS)}")
+        try:
+            tolerances[metric] = float(value)
+        except ValueError:
+            raise ValueError(f"tolerance for {metric} is not a number: {value!r}")
+        if tolerances[metric] < 0:
+            raise ValueError(f"tolerance for {metric} must not be negative")
+    return tolerances
+
+
 if __name__ == "__main__":
-    tester = VelanPropertiesAPITester()
-    success = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description="Velan Properties backend API tests")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base URL to test against")
+    parser.add_argument("--local", action="store_true", help="start the in-process local backend and test against it")
+    parser.add_argument("--load", action="store_true", help="run the concurrent load test instead of the functional tests")
+    parser.add_argument("--workers", type=int, default=LOAD_WORKERS)
+    parser.add_argument("--rate", type=float, default=LOAD_RATE, help="target requests per second across all workers (0 = unbounded)")
+    parser.add_argument("--duration", type=float, default=LOAD_DURATION, help="load test duration in seconds")
+    parser.add_argument("--allow-remote-writes", action="store_true",
+                        help="let --load submit contacts and create and delete properties on a non-local --base-url")
+    parser.add_argument("--pool-sizes", help="comma-separated connection pool sizes to benchmark on local backends, "
+                                             f"e.g. {','.join(map(str, POOL_SIZES))}")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="run the regression benchmark on a seeded local backend and compare it with the baseline")
+    parser.add_argument("--baseline", default=REGRESSION_BASELINE, help="baseline JSON file for --benchmark")
+    parser.add_argument("--update-baseline", action="store_true", help="store this benchmark run as the new baseline")
+    parser.add_argument("--iterations", type=int, default=REGRESSION_ITERATIONS, help="timed runs per benchmark scenario")
+    parser.add_argument("--tolerance", default="", help="allowed regression per metric as a fraction, e.g. "
+                                                        f"p50=0.25,throughput=0.1 (metrics: {', '.join(REGRESSION_METRICS)})")
+    parser.add_argument("--noise-floor", type=float, default=REGRESSION_NOISE_FLOOR_MS,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+    try:
+        tolerances = parse_tolerances(args.tolerance)
+    except ValueError as e:
+        parser.error(f"--tolerance: {e}")
+    if args.load and not args.local and not args.allow_remote_writes and not is_local_url(args.base_url):
+        parser.error(f"--load writes contacts and properties; pass --allow-remote-writes to run it against {args.base_url}")
+
+    if args.benchmark:
+        results = run_regression_benchmark(iterations=args.iterations)
+        baseline = load_baseline(args.baseline)
+        if args.update_baseline:
+            save_baseline(args.baseline, results)
+            for endpoint, stats in results["results"].items():
+                print(f"{endpoint}: p50 {stats['p50']:.2f} ms, p95 {stats['p95']:.2f} ms")
+            print(f"\nBaseline written to {args.baseline}")
+            success = not any(stats["error_rate"] for stats in results["results"].values())
+        elif baseline is None:
+            print(f"\n❌ No baseline at {args.baseline}; nothing was compared. "
+                  "Record one on this machine with --update-baseline.")
+            success = False
+        else:
+            rows = compare_to_baseline(results, baseline, tolerances, args.noise_floor)
+            success = print_regression_report(results, baseline, rows)
+        exit(0 if success else 1)
+
+    if args.pool_sizes:
+        success = run_pool_benchmark([int(size) for size in args.pool_sizes.split(",")], workers=args.workers,
+                                     duration=min(args.duration, POOL_BENCHMARK_DURATION))
+        exit(0 if success else 1)
+
+    # Every test request comes from one address, so the per-IP contact limit is tested on its own backend
+    local_backend = LocalBackend(api=LocalAPI(contact_ip_limit=None)).start() if args.local else None
+    base_url = local_backend.base_url if local_backend else args.base_url
+
+    if args.load:
+        tester = VelanPropertiesLoadTester(base_url, workers=args.workers, rate=args.rate, duration=args.duration)
+        success = tester.run_load_test()
+    else:
+        tester = VelanPropertiesAPITester(base_url, local_backend)
+        success = tester.run_all_tests()
+
+    if local_backend:
+        local_backend.stop()
     
     if success:
         print("\n🎉 All tests passed! Backend API is working correctly.")
@@ -0,0 +1,16 @@
+"""
+Self-contained local stand-in for the Velan Properties backend API.
+"""
+
+from .server import HTTPException, LocalAPI, LocalBackend, Request, Response
+from .store import Collection, MemoryDatabase
+
+__all__ = [
+    "Collection",
+    "HTTPException",
+    "LocalAPI",
+    "LocalBackend",
+    "MemoryDatabase",
+    "Request",
+    "Response"
+]
@@ -0,0 +1,26 @@
+"""
+Run the local backend stand-in: python -m local_backend --port 8001
+"""
+
+import argparse
+import time
+
+from .server import LocalAPI, LocalBackend
+from .store import MemoryDatabase
+
+parser = argparse.ArgumentParser(description="Velan Properties local backend stand-in")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8001)
+parser.add_argument("--pool-size", type=int, default=100, help="database connections in the pool")
+parser.add_argument("--min-pool-size", type=int, default=0, help="connections opened at startup")
+parser.add_argument("--pool-timeout", type=float, default=None, help="seconds to wait for a free connection")
+args = parser.parse_args()
+
+db = MemoryDatabase(pool_size=args.pool_size, min_pool_size=args.min_pool_size, wait_timeout=args.pool_timeout)
+with LocalBackend(host=args.host, port=args.port, api=LocalAPI(db)) as backend:
+    print(f"Serving Velan Properties API at {backend.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
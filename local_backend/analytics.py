@@ -0,0 +1,204 @@
+"""
+Materialized per-locality market aggregates for the admin analytics endpoints.
+
+For each locality (the most specific part of a listing's location, e.g.
+"Mathigiri" in "Mathigiri, Hosur") it keeps the number of active listings,
+their counts by type, and per listing type a sorted list of price per
+square foot (rents are per month). Sold and rented listings are not on the
+market and are left out. The aggregates subscribe to the properties
+collection's write listener, so a write moves one listing's contribution
+between buckets (or in or out of them when its status changes) and no
+query ever scans or parses listings: a locality summary reads its counts
+and the middle of its sorted lists. The same figures are kept for the
+whole market, under the key None. The sorted locality list is cached
+per sort key until the next change to an aggregate.
+
+As with the dashboard counters, reconcile() rebuilds everything from a
+consistent scan and reports any drift.
+"""
+
+import bisect
+import threading
+from collections import Counter
+
+from . import models
+
+# sort= values for localities(): median price per sq ft of one listing type, listings or name
+SORT_MEDIANS = {"median_sale_per_sqft": "For Sale", "median_rent_per_sqft": "For Rent",
+                "median_investment_per_sqft": "Investment"}
+SORT_KEYS = ("listings", *SORT_MEDIANS, "locality")
+MARKET = None  # bucket key of the market-wide aggregates
+
+
+class LocalityBucket:
+    """Everything aggregated for one locality's active listings"""
+
+    def __init__(self, name):
+        self.name = name
+        self.listings = 0
+        self.by_type = Counter()
+        self.per_sqft = {kind: [] for kind in models.PROPERTY_TYPES}  # sorted price per sq ft, by listing type
+
+    def state(self):
+        return (self.listings, +self.by_type, self.per_sqft)
+
+
+def on_market(document):
+    return document.get("status") == "active"
+
+
+def price_per_sqft(document):
+    """(listing type, price per sq ft), or None when the price or area could not be parsed"""
+    price, area = document.get("price_value"), document.get("area_sqft")
+    if not price or not area or document.get("type") not in models.PROPERTY_TYPES:
+        return None
+    return document["type"], price / area
+
+
+def _median(values):
+    if not values:
+        return None
+    middle = len(values) // 2
+    median = values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+    return round(median, 2)
+
+
+class LocalityAggregates:
+    """Per-locality and market-wide listing aggregates over a properties collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._buckets = {}  # locality key (or MARKET) -> LocalityBucket
+        self._sorted = {}  # sort key -> sorted locality summaries, cleared by every change
+        self._lock = threading.Lock()
+        collection.add_listener(self.record)
+        self.reconcile()
+
+    @staticmethod
+    def _keys(document):
+        """(bucket key, display name) pairs a listing counts towards"""
+        yield MARKET, "All localities"
+        key, name = models.locality(document.get("location"))
+        if key:
+            yield key, name
+
+    def _add(self, buckets, document):
+        if not on_market(document):
+            return
+        priced = price_per_sqft(document)
+        for key, name in self._keys(document):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = LocalityBucket(name)
+            bucket.listings += 1
+            bucket.by_type[document.get("type")] += 1
+            if priced is not None:
+                bisect.insort(bucket.per_sqft[priced[0]], priced[1])
+
+    def _remove(self, buckets, document):
+        if not on_market(document):
+            return
+        priced = price_per_sqft(document)
+        for key, _ in self._keys(document):
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.listings -= 1
+            bucket.by_type[document.get("type")] -= 1
+            if priced is not None:
+                values = bucket.per_sqft[priced[0]]
+                position = bisect.bisect_left(values, priced[1])
+                if position < len(values) and values[position] == priced[1]:
+                    del values[position]
+            if bucket.listings <= 0:
+                del buckets[key]
+
+    def record(self, before, after):
+        """Write listener: move the listing's contribution from before to after (either may be off the market)"""
+        if not any(document is not None and on_market(document) for document in (before, after)):
+            return
+        with self._lock:
+            if before is not None:
+                self._remove(self._buckets, before)
+            if after is not None:
+                self._add(self._buckets, after)
+            self._invalidate()
+
+    def _invalidate(self):
+        """Drop the cached sorted lists; called with the lock held"""
+        self._sorted.clear()
+
+    def reconcile(self):
+        """Rebuild from the collection; returns {locality: listing count drift} for buckets that differed.
+
+        The scan holds the collection lock, so no write can land between
+        rebuilding and swapping the buckets in.
+        """
+        def rebuild(documents):
+            buckets = {}
+            for document in documents:
+                self._add(buckets, document)
+            drift = {}
+            with self._lock:
+                for key in set(buckets) | set(self._buckets):
+                    current, rebuilt = self._buckets.get(key), buckets.get(key)
+                    if current is None or rebuilt is None or current.state() != rebuilt.state():
+                        drift[key or "all"] = (rebuilt.listings if rebuilt else 0) - (current.listings if current else 0)
+                self._buckets = buckets
+                self._invalidate()
+            return drift
+
+        return self.collection.scan(rebuild)
+
+    @staticmethod
+    def _summary(key, bucket):
+        listings = bucket.listings
+        return {
+            "locality": key,
+            "name": bucket.name,
+            "listings": listings,
+            "by_type": {kind: n for kind, n in bucket.by_type.items() if n},
+            "type_mix": {kind: round(n / listings, 4) for kind, n in bucket.by_type.items() if n and listings},
+            "median_price_per_sqft": {kind: _median(values) for kind, values in bucket.per_sqft.items()},
+            "priced_listings": {kind: len(values) for kind, values in bucket.per_sqft.items()}
+        }
+
+    def locality(self, text):
+        """Summary for the locality text names, or None if it has no active listings"""
+        key, _ = models.locality(text)
+        with self._lock:
+            bucket = self._buckets.get(key) if key else None
+            return self._summary(key, bucket) if bucket is not None else None
+
+    def overview(self):
+        """Market-wide summary plus the number of localities"""
+        with self._lock:
+            bucket = self._buckets.get(MARKET) or LocalityBucket("All localities")
+            summary = self._summary(None, bucket)
+            summary["localities"] = len(self._buckets) - (MARKET in self._buckets)
+            return summary
+
+    def localities(self, sort="listings", limit=None):
+        """Summaries of every locality, largest first for numeric sorts (missing medians last).
+
+        The sorted list is built once per sort key and served from the
+        cache until an aggregate changes. Callers must not modify it.
+        """
+        with self._lock:
+            summaries = self._sorted.get(sort)
+            if summaries is None:
+                summaries = [self._summary(key, bucket) for key, bucket in self._buckets.items() if key is not MARKET]
+                self._sort(summaries, sort)
+                self._sorted[sort] = summaries
+        return summaries[:limit] if limit else summaries
+
+    @staticmethod
+    def _sort(summaries, sort):
+        if sort == "locality":
+            summaries.sort(key=lambda summary: summary["locality"])
+        elif sort == "listings":
+            summaries.sort(key=lambda summary: (-summary["listings"], summary["locality"]))
+        else:
+            kind = SORT_MEDIANS[sort]
+            summaries.sort(key=lambda summary: (summary["median_price_per_sqft"][kind] is None,
+                                                -(summary["median_price_per_sqft"][kind] or 0), summary["locality"]))
@@ -0,0 +1,107 @@
+"""
+Row readers and writers for bulk property import and export.
+
+Readers consume a request body stream line by line and yield one payload
+(or a ValidationError for an unreadable row) per record; writers turn an
+iterable of documents into byte chunks. Neither side ever holds a whole
+file in memory.
+"""
+
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+
+from .models import ValidationError, json_default
+
+EXPORT_FIELDS = ["id", "title", "price", "location", "bedrooms", "parking", "area", "type", "image",
+                 "description", "features", "status", "created_at", "updated_at"]
+INTEGER_FIELDS = ("bedrooms", "parking")
+FEATURE_SEPARATOR = "|"
+
+
+def _row_error(message):
+    return ValidationError([{"type": "value_error", "loc": ["body"], "msg": message}])
+
+
+def read_ndjson(stream):
+    """Yield one payload per non-blank line of a newline-delimited JSON stream"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield _row_error(f"Invalid JSON: {e}")
+
+
+def read_csv(stream):
+    """Yield one payload per CSV record; features are separated by "|".
+
+    Lines are decoded one at a time (UTF-8 never splits a character across
+    a newline), so a record with invalid UTF-8 is reported as a row error
+    and the rest of the file is still read.
+    """
+    invalid = []
+
+    def lines():
+        for number, line in enumerate(stream):
+            if number == 0 and line.startswith(codecs.BOM_UTF8):
+                line = line[len(codecs.BOM_UTF8):]
+            try:
+                yield line.decode("utf-8")
+            except UnicodeDecodeError as e:
+                invalid.append(f"Invalid UTF-8: {e.reason} at byte {e.start} of line {number + 1}")
+                yield line.decode("utf-8", "replace")
+
+    for payload in _csv_payloads(csv.DictReader(lines())):
+        if invalid:
+            yield _row_error(invalid[0])
+            invalid.clear()
+        else:
+            yield payload
+
+
+def _csv_payloads(reader):
+    for record in reader:
+        payload = {}
+        for name, value in record.items():
+            if name is None or value is None or value == "":
+                continue
+            name = name.strip()
+            value = value.strip()
+            if name in INTEGER_FIELDS:
+                try:
+                    value = int(value)
+                except ValueError:
+                    pass  # left as a string so validation reports it
+            elif name == "features":
+                value = [feature.strip() for feature in value.split(FEATURE_SEPARATOR) if feature.strip()]
+            payload[name] = value
+        yield payload
+
+
+def write_ndjson(documents):
+    for document in documents:
+        yield (json.dumps(document, default=json_default, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def write_csv(documents):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    for document in documents:
+        row = dict(document)
+        row["features"] = FEATURE_SEPARATOR.join(row.get("features") or [])
+        for name in ("created_at", "updated_at"):
+            if isinstance(row.get(name), datetime):
+                row[name] = row[name].isoformat()
+        writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,90 @@
+"""
+Response cache for read-heavy listing endpoints.
+
+Entries are serialized response bodies keyed by normalized request
+parameters, with TTL expiry and LRU eviction. Writers call invalidate();
+a generation counter makes sure a response computed before a write can
+never be stored after it, so a cached read is never staler than the last
+completed write.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_etag(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256, ttl=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (body, etag, headers) for a fresh entry, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1], entry[3]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def put(self, key, body, generation, headers=None):
+        """Store a body (and headers describing it) computed at generation; dropped if a write happened since"""
+        etag = make_etag(body)
+        with self._lock:
+            if generation != self._generation:
+                return etag
+            self._entries[key] = (body, etag, self.clock() + self.ttl, dict(headers or {}))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return etag
+
+    def invalidate(self):
+        """Drop every entry; call on each write to the underlying data"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,135 @@
+"""
+Change feed over the contacts and properties collections.
+
+Every insert, update and delete is appended to an in-memory log under a
+global, increasing sequence number, from the collections' write
+listeners, so the log order is the commit order. Clients that mirror the
+data read the entries after the last sequence number they applied,
+instead of re-fetching whole collections.
+
+Entries carry the full document after the write, so applying a change is
+an upsert (or a removal for deletes) regardless of what came before it.
+That makes the log compactable: compact() keeps only the newest entry per
+document, and drops delete tombstones once they are older than
+tombstone_ttl. Replaying a compacted log from zero still rebuilds the
+current collections. A client whose position is older than the newest
+dropped tombstone may have missed a delete, so it is told to reset and
+replay from zero.
+"""
+
+import bisect
+import threading
+from datetime import datetime, timedelta
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+class ChangeFeed:
+    """Sequence-numbered log of the writes to some collections, followed from their write listeners"""
+
+    def __init__(self, collections, tombstone_ttl=86400.0):
+        self.tombstone_ttl = tombstone_ttl
+        self._entries = []  # (seq, collection, op, document id, document, timestamp), in seq order
+        self._seqs = []  # seq of each entry, for bisecting
+        self._latest = {}  # (collection, document id) -> seq of its newest entry
+        self._head = 0
+        self._horizon = 0  # newest seq of a dropped tombstone
+        self._closed = False
+        self._changed = threading.Condition()
+        for collection in collections:
+            collection.scan(lambda documents, collection=collection: self._attach(collection, documents))
+
+    def _attach(self, collection, documents):
+        """Record what a collection already holds as inserts, then follow its writes.
+
+        Runs inside collection.scan(), so no write can slip in between.
+        """
+        for document in documents:
+            self.record(collection.name, None, document)
+        collection.add_listener(lambda before, after: self.record(collection.name, before, after))
+
+    def record(self, collection, before, after):
+        """Write listener: append one entry for the write"""
+        if after is None:
+            op, document_id, document = DELETE, before["id"], None
+        else:
+            # Shallow is enough: the store replaces top-level values on update and never mutates nested ones
+            op, document_id, document = (INSERT if before is None else UPDATE), after["id"], dict(after)
+        with self._changed:
+            self._head += 1
+            self._entries.append((self._head, collection, op, document_id, document, datetime.utcnow()))
+            self._seqs.append(self._head)
+            self._latest[(collection, document_id)] = self._head
+            self._changed.notify_all()
+
+    @staticmethod
+    def _as_dict(entry):
+        seq, collection, op, document_id, document, timestamp = entry
+        return {"seq": seq, "collection": collection, "op": op, "id": document_id, "document": document,
+                "timestamp": timestamp}
+
+    def read(self, since=0, limit=100, collections=None):
+        """Entries after since, oldest first: (entries, head, reset).
+
+        reset is True when changes after since can no longer be served
+        exactly (a tombstone the client has not seen was compacted away,
+        or since is ahead of this feed, e.g. after a restart); the entries
+        then start from zero and the client must rebuild from scratch.
+        """
+        with self._changed:
+            reset = since > self._head or 0 < since < self._horizon
+            if reset:
+                since = 0
+            entries = []
+            for entry in self._entries[bisect.bisect_right(self._seqs, since):]:
+                if collections is None or entry[1] in collections:
+                    entries.append(self._as_dict(entry))
+                    if len(entries) >= limit:
+                        break
+            return entries, self._head, reset
+
+    def wait(self, since, timeout):
+        """Block until there are entries after since; False on timeout or once the feed is closed"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._head > since or self._closed, timeout)
+            return self._head > since and not self._closed
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Wake every waiter so streaming clients can finish"""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    def compact(self):
+        """Drop superseded entries and expired tombstones; returns what was removed"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.tombstone_ttl)
+        with self._changed:
+            before = len(self._entries)
+            kept = []
+            tombstones = 0
+            for entry in self._entries:
+                seq, collection, op, document_id, _, timestamp = entry
+                key = (collection, document_id)
+                if self._latest.get(key) != seq:
+                    continue
+                if op == DELETE and timestamp <= cutoff:
+                    del self._latest[key]
+                    self._horizon = max(self._horizon, seq)
+                    tombstones += 1
+                    continue
+                kept.append(entry)
+            self._entries = kept
+            self._seqs = [entry[0] for entry in kept]
+            return {"removed": before - len(kept), "tombstones_dropped": tombstones, "entries": len(kept)}
+
+    def stats(self):
+        with self._changed:
+            return {"head": self._head, "entries": len(self._entries), "documents": len(self._latest),
+                    "oldest_seq": self._seqs[0] if self._seqs else None, "reset_horizon": self._horizon,
+                    "tombstone_ttl_seconds": self.tombstone_ttl}
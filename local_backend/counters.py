@@ -0,0 +1,81 @@
+"""
+Incrementally maintained collection counters for the admin dashboard.
+
+Counters subscribe to a collection's write listener, so each insert,
+update and delete adjusts a handful of integers and the dashboard never
+has to count documents. reconcile() recomputes from a consistent scan and
+repairs any drift.
+"""
+
+import threading
+from collections import Counter
+
+
+class CollectionCounters:
+    """Total document count plus a per-value breakdown of some fields"""
+
+    def __init__(self, collection, fields):
+        self.collection = collection
+        self.fields = fields
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self.reconciled_drift = 0
+        collection.add_listener(self.record)
+        self.reconcile()
+        self.reconciled_drift = 0
+
+    def _keys(self, document):
+        yield ("total", None)
+        for field in self.fields:
+            yield (field, document.get(field))
+
+    def record(self, before, after):
+        """Write listener: move the document's contribution from before to after"""
+        with self._lock:
+            if before is not None:
+                for key in self._keys(before):
+                    self._counts[key] -= 1
+            if after is not None:
+                for key in self._keys(after):
+                    self._counts[key] += 1
+
+    def _count(self, documents):
+        counts = Counter()
+        for document in documents:
+            for key in self._keys(document):
+                counts[key] += 1
+        return counts
+
+    def reconcile(self):
+        """Recompute from the collection and return the drift that was corrected.
+
+        The scan holds the collection lock, so no write can land between
+        counting and swapping the counters in.
+        """
+        def rebuild(documents):
+            counts = self._count(documents)
+            drift = {}
+            with self._lock:
+                for key in set(counts) | set(self._counts):
+                    delta = counts[key] - self._counts[key]
+                    if delta:
+                        field, value = key
+                        drift[field if value is None else f"{field}={value}"] = delta
+                self._counts = counts
+            return drift
+
+        drift = self.collection.scan(rebuild)
+        self.reconciled_drift += sum(abs(delta) for delta in drift.values())
+        return drift
+
+    def get(self, field=None, value=None):
+        with self._lock:
+            return self._counts[("total", None)] if field is None else self._counts[(field, value)]
+
+    def snapshot(self):
+        """{"total": n, "by_<field>": {value: n}} with zero counts dropped"""
+        with self._lock:
+            result = {"total": self._counts[("total", None)]}
+            for field in self.fields:
+                result[f"by_{field}"] = {value: n for (f, value), n in self._counts.items() if f == field and n}
+            return result
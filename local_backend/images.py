@@ -0,0 +1,260 @@
+"""
+Thumbnail pipeline for listing images.
+
+An image (uploaded bytes or a source URL) is resized to fixed widths and
+encoded as WebP and JPEG in a process pool, so decoding and resampling
+never run on a request thread. Variant files are named after a hash of
+their content, which makes them immutable and safe to serve with a
+year-long Cache-Control. A manifest per image records its variants; the
+same source submitted again reuses the existing manifest.
+
+Source URLs are fetched only from public addresses: the host is resolved
+once, every address must be globally routable, and the connection goes to
+the address that was checked. Redirects are not followed.
+
+Pillow is optional: without it, submit() raises ImagesUnavailable.
+"""
+
+import hashlib
+import http.client
+import io
+import ipaddress
+import json
+import logging
+import multiprocessing
+import os
+import re
+import socket
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional; the image endpoints answer 503 without it
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+VARIANT_FORMATS = {"webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+                   "jpg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True})}
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+MAX_SOURCE_PIXELS = 50_000_000  # larger sources are rejected before decoding
+FETCH_TIMEOUT = 15
+SIGNATURES = (b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a")
+FILE_NAME = re.compile(r"^[0-9a-f]{32}\.(webp|jpg)$")
+IMAGE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+if Image is not None:
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+
+
+class ImagesUnavailable(Exception):
+    """Image processing needs Pillow, which is not installed"""
+
+
+class ImageError(Exception):
+    """A source that cannot be processed; the message is safe to show to clients"""
+
+
+def looks_like_image(data):
+    """Cheap signature check so obviously wrong uploads are rejected before queueing"""
+    return data.startswith(SIGNATURES) or (data[:4] == b"RIFF" and data[8:12] == b"WEBP")
+
+
+def content_type(name):
+    return VARIANT_FORMATS[name.rsplit(".", 1)[1]][1]
+
+
+def _public_address(host, port):
+    """Resolve host and return an address to connect to, or raise ImageError unless every address is public"""
+    try:
+        addresses = [info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+    except OSError:
+        raise ImageError("Could not fetch the source image")
+    if not addresses or not all(ipaddress.ip_address(address.split("%")[0]).is_global for address in addresses):
+        raise ImageError("Source URL is not allowed")
+    return addresses[0]
+
+
+def _fetch(url):
+    """GET a source image from a public http(s) URL, without following redirects"""
+    parts = urlsplit(url)
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        port = None
+    if parts.scheme not in ("http", "https") or not parts.hostname or port is None:
+        raise ImageError("Source URL is not allowed")
+    address = _public_address(parts.hostname, port)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(parts.hostname, port, timeout=FETCH_TIMEOUT)
+    # Connect to the address that was checked, not to whatever the name resolves to next
+    connection._create_connection = lambda _, *args: socket.create_connection((address, port), *args)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    try:
+        connection.request("GET", path, headers={"Accept": "image/*"})
+        response = connection.getresponse()
+        if response.status != 200:
+            raise ImageError("Could not fetch the source image")
+        data = response.read(MAX_SOURCE_BYTES + 1)
+    except (OSError, http.client.HTTPException):
+        raise ImageError("Could not fetch the source image")
+    finally:
+        connection.close()
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageError(f"Source image is larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+
+def _flatten(source):
+    """Upright RGB copy of a decoded source; transparent areas become white"""
+    source = ImageOps.exif_transpose(source)
+    if source.mode in ("RGBA", "LA", "PA", "P"):
+        source = source.convert("RGBA")
+        background = Image.new("RGB", source.size, "white")
+        background.paste(source, mask=source.getchannel("A"))
+        return background
+    return source.convert("RGB")
+
+
+def _write_once(root, name, data):
+    path = os.path.join(root, name)
+    if not os.path.exists(path):
+        fd, temporary = tempfile.mkstemp(dir=root)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+
+def render_variants(root, image_id, data=None, url=None, widths=VARIANT_WIDTHS):
+    """Process pool task: decode a source, write every variant under root and return its manifest"""
+    if data is None:
+        data = _fetch(url)
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > MAX_SOURCE_PIXELS:
+                raise ImageError(f"Source image is larger than {MAX_SOURCE_PIXELS} pixels")
+            source = _flatten(source)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ImageError("Could not decode the source image")
+    targets = sorted({width for width in widths if width <= source.width} or {source.width})
+    variants = []
+    for width in targets:
+        height = max(1, round(source.height * width / source.width))
+        resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+        for extension, (pil_format, mime, options) in VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            encoded = buffer.getvalue()
+            name = f"{hashlib.sha256(encoded).hexdigest()[:32]}.{extension}"
+            _write_once(root, name, encoded)
+            variants.append({"width": width, "height": height, "format": extension, "content_type": mime,
+                             "bytes": len(encoded), "file": name})
+    manifest = {"image_id": image_id, "status": "ready", "source_url": url,
+                "source_width": source.width, "source_height": source.height, "variants": variants}
+    _write_once(root, f"{image_id}.json", json.dumps(manifest).encode("utf-8"))
+    return manifest
+
+
+class ImageStore:
+    """Variant files and manifests on local disk, produced by a lazily started process pool.
+
+    on_ready(manifest) is called from a pool thread whenever an image
+    finishes processing.
+    """
+
+    def __init__(self, root=None, workers=2, on_ready=None):
+        self.root = root  # a temporary directory is created on first use when None
+        if root:
+            os.makedirs(root, exist_ok=True)
+        self.workers = workers
+        self.on_ready = on_ready
+        self._pool = None
+        self._jobs = {}  # image id -> manifest, including pending and failed ones
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available():
+        return Image is not None
+
+    @staticmethod
+    def id_for(data=None, url=None):
+        source = data if data is not None else f"url:{url}".encode("utf-8")
+        return hashlib.sha256(source).hexdigest()[:32]
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the server process is full of threads holding locks
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def submit(self, data=None, url=None):
+        """Queue a source for processing and return its manifest (usually still pending)"""
+        if not self.available():
+            raise ImagesUnavailable()
+        image_id = self.id_for(data, url)
+        with self._lock:
+            if self.root is None:
+                self.root = tempfile.mkdtemp(prefix="velan-images-")
+            manifest = self._jobs.get(image_id) or self._load(image_id)
+            if manifest is not None and manifest["status"] != "failed":
+                return manifest
+            manifest = {"image_id": image_id, "status": "pending", "source_url": url, "variants": []}
+            self._jobs[image_id] = manifest
+        future = self._executor().submit(render_variants, self.root, image_id, data, url)
+        future.add_done_callback(lambda done: self._finished(image_id, url, done))
+        return manifest
+
+    def _finished(self, image_id, url, future):
+        try:
+            manifest = future.result()
+        except Exception as e:
+            logger.warning("Image %s failed: %r", image_id, e)
+            error = str(e) if isinstance(e, ImageError) else "Could not process the source image"
+            manifest = {"image_id": image_id, "status": "failed", "source_url": url, "variants": [], "error": error}
+        with self._lock:
+            self._jobs[image_id] = manifest
+        if manifest["status"] == "ready" and self.on_ready is not None:
+            try:
+                self.on_ready(manifest)
+            except Exception:
+                logger.exception("Image ready callback failed for %s", image_id)
+
+    def _load(self, image_id):
+        """A manifest written by an earlier run, if any"""
+        if self.root is None:
+            return None
+        try:
+            with open(os.path.join(self.root, f"{image_id}.json"), "rb") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._jobs[image_id] = manifest
+        return manifest
+
+    def get(self, image_id):
+        if not IMAGE_ID.match(image_id):
+            return None
+        with self._lock:
+            return self._jobs.get(image_id) or self._load(image_id)
+
+    def read(self, name):
+        """Bytes of a variant file, or None for unknown or malformed names"""
+        if not FILE_NAME.match(name) or self.root is None:
+            return None
+        try:
+            with open(os.path.join(self.root, name), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
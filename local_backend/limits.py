@@ -0,0 +1,123 @@
+"""
+Duplicate suppression and rate limiting for public form submissions.
+
+ReplayCache remembers the response to each submission under one or more
+keys (an Idempotency-Key header, a hash of the submitted content) for a
+time window, so a retried or double-clicked submission gets the original
+response back instead of creating another record. A concurrent duplicate
+waits for the first request to finish rather than racing it.
+
+TokenBucketLimiter caps how fast one client (an IP address, an email)
+can submit. Both structures are bounded: the least recently used entries
+are evicted once they hold max_entries keys.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReplayEntry:
+    """A submission in flight or completed under some key"""
+
+    def __init__(self, fingerprint, expires):
+        self.fingerprint = fingerprint
+        self.expires = expires
+        self.response = None
+        self.abandoned = False
+        self.done = threading.Event()
+
+
+class ReplayCache:
+    def __init__(self, window=600.0, max_entries=10000, clock=time.monotonic):
+        self.window = window
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.evictions = 0
+
+    def claim(self, key, fingerprint):
+        """Return (entry, owner). The owner must finish() or abandon() the entry.
+
+        A non-owner gets the existing entry for key and should wait() on it.
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(key)
+                self.replays += 1
+                return entry, False
+            entry = ReplayEntry(fingerprint, now + self.window)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return entry, True
+
+    def wait(self, entry, timeout):
+        """The response stored by the entry's owner, or None if it was abandoned or timed out"""
+        entry.done.wait(timeout)
+        return entry.response
+
+    def finish(self, entry, response):
+        entry.response = response
+        entry.done.set()
+
+    def abandon(self, key, entry):
+        """Forget a claim whose request failed, so a retry (or a waiting duplicate) is processed afresh"""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.abandoned = True
+        entry.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "window_seconds": self.window,
+                    "replays": self.replays, "evictions": self.evictions}
+
+
+class TokenBucketLimiter:
+    """capacity requests in a burst per key, refilled at capacity per period seconds"""
+
+    def __init__(self, capacity, period, max_entries=10000, clock=time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_entries = max_entries
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> (tokens, last refill time)
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def acquire(self, key):
+        """Take a token for key; returns 0 if allowed, else seconds until one is available"""
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                self.limited += 1
+                wait = (1 - tokens) / self.rate
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)  # an evicted key starts over with a full bucket
+            return wait
+
+    def refund(self, key):
+        """Return a token taken for a request that was then rejected for another reason"""
+        with self._lock:
+            if key in self._buckets:
+                tokens, last = self._buckets[key]
+                self._buckets[key] = (min(self.capacity, tokens + 1), last)
+
+    def stats(self):
+        with self._lock:
+            return {"keys": len(self._buckets), "max_entries": self.max_entries, "capacity": self.capacity,
+                    "limited": self.limited}
@@ -0,0 +1,164 @@
+"""
+Request metrics for the local backend, exported in Prometheus text format.
+
+Per route it records a latency histogram, status counts, in-flight
+requests, request/response payload sizes, and how much of each request
+was spent in the database, in JSON serialization and in everything else
+(parsing, validation, handler logic). Database operations are also timed
+per collection and operation.
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (128, 1024, 8192, 65536, 524288, 4194304, 33554432)
+PHASES = ("db", "serialize", "app")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        position = bisect.bisect_left(self.buckets, value)
+        if position < len(self.buckets):
+            self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield _format_number(bound), total
+        yield "+Inf", self.count
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class RequestTracker:
+    """Per-request state while a request is being handled"""
+
+    def __init__(self):
+        self.status = 500
+        self.phases = defaultdict(float)
+
+
+class MetricsRegistry:
+    def __init__(self, prefix="velan"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._latency = {}
+        self._statuses = defaultdict(int)
+        self._in_flight = defaultdict(int)
+        self._phases = defaultdict(lambda: [0.0, 0])
+        self._request_sizes = {}
+        self._response_sizes = {}
+        self._db = {}
+
+    @contextmanager
+    def track(self, method, route):
+        """Time one request; set .status on the yielded tracker before leaving"""
+        tracker = RequestTracker()
+        key = (method, route)
+        with self._lock:
+            self._in_flight[key] += 1
+        self._local.tracker = tracker
+        started = time.perf_counter()
+        try:
+            yield tracker
+        finally:
+            elapsed = time.perf_counter() - started
+            self._local.tracker = None
+            tracker.phases["app"] = max(0.0, elapsed - tracker.phases["db"] - tracker.phases["serialize"])
+            with self._lock:
+                self._in_flight[key] -= 1
+                self._latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+                self._statuses[(method, route, tracker.status)] += 1
+                for phase in PHASES:
+                    totals = self._phases[(method, route, phase)]
+                    totals[0] += tracker.phases[phase]
+                    totals[1] += 1
+
+    def _add_phase(self, phase, seconds):
+        tracker = getattr(self._local, "tracker", None)
+        if tracker is not None:
+            tracker.phases[phase] += seconds
+
+    @contextmanager
+    def phase(self, phase):
+        """Attribute the enclosed time of the current request to phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_phase(phase, time.perf_counter() - started)
+
+    def observe_db(self, collection, operation, seconds):
+        self._add_phase("db", seconds)
+        with self._lock:
+            self._db.setdefault((collection, operation), Histogram(LATENCY_BUCKETS)).observe(seconds)
+
+    def observe_payload(self, method, route, request_bytes, response_bytes):
+        key = (method, route)
+        with self._lock:
+            self._request_sizes.setdefault(key, Histogram(SIZE_BUCKETS)).observe(request_bytes)
+            self._response_sizes.setdefault(key, Histogram(SIZE_BUCKETS)).observe(response_bytes)
+
+    def _render_histogram(self, lines, name, help_text, histograms, label_names):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(histograms.items()):
+            labels = dict(zip(label_names, key))
+            for bound, count in histogram.cumulative():
+                lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+            lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+    def render(self):
+        """Prometheus text exposition of everything recorded so far"""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            lines.append(f"# HELP {p}_http_requests_total Requests handled, by route and status")
+            lines.append(f"# TYPE {p}_http_requests_total counter")
+            for (method, route, status), count in sorted(self._statuses.items()):
+                lines.append(f"{p}_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+            lines.append(f"# HELP {p}_http_requests_in_flight Requests currently being handled")
+            lines.append(f"# TYPE {p}_http_requests_in_flight gauge")
+            for (method, route), count in sorted(self._in_flight.items()):
+                lines.append(f"{p}_http_requests_in_flight{_labels(method=method, route=route)} {count}")
+
+            self._render_histogram(lines, f"{p}_http_request_duration_seconds", "Request latency",
+                                   self._latency, ("method", "route"))
+
+            lines.append(f"# HELP {p}_http_request_phase_seconds Request time split into db, serialize and app")
+            lines.append(f"# TYPE {p}_http_request_phase_seconds summary")
+            for (method, route, phase), (total, count) in sorted(self._phases.items()):
+                labels = _labels(method=method, route=route, phase=phase)
+                lines.append(f"{p}_http_request_phase_seconds_sum{labels} {total}")
+                lines.append(f"{p}_http_request_phase_seconds_count{labels} {count}")
+
+            self._render_histogram(lines, f"{p}_http_request_size_bytes", "Request body size",
+                                   self._request_sizes, ("method", "route"))
+            self._render_histogram(lines, f"{p}_http_response_size_bytes", "Response body size",
+                                   self._response_sizes, ("method", "route"))
+            self._render_histogram(lines, f"{p}_db_operation_duration_seconds", "Database operation latency",
+                                   self._db, ("collection", "operation"))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,352 @@
+"""
+Contact and Property models for the local backend stand-in.
+
+Same shapes as the models in contracts.md, with the validation rules the
+production Pydantic models enforce (see backend_test.py). Implemented with
+the standard library only so the stand-in runs without any installs.
+"""
+
+import hashlib
+import re
+import uuid
+from datetime import datetime
+
+PROPERTY_TYPES = ("For Sale", "For Rent", "Investment")
+PROPERTY_STATUSES = ("active", "sold", "rented")
+CONTACT_STATUSES = ("new", "contacted", "resolved")
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[A-Za-z]{2,}$")
+
+PRICE_MULTIPLIERS = {
+    "k": 1_000,
+    "thousand": 1_000,
+    "l": 100_000,
+    "lac": 100_000,
+    "lakh": 100_000,
+    "lakhs": 100_000,
+    "cr": 10_000_000,
+    "crore": 10_000_000,
+    "crores": 10_000_000
+}
+NUMBER = r"\d[\d,]*(?:\.\d+)?"
+RANGE = rf"(?:\s*(?:-|–|to)\s*{NUMBER})?"  # "1.5-2 Cr" is read as its lower bound, in the shared unit
+PRICE_PATTERN = re.compile(rf"({NUMBER}){RANGE}\s*([a-z]*)")
+PRICE_UNITS = ("sale", "rent")  # rent prices are per month
+MONTHLY_PATTERN = re.compile(r"(/|per\s*)(month|mo)\b|\bmonthly\b|(/-?|\b)\s*p\.?\s?m\b")
+YEARLY_PATTERN = re.compile(r"(/|per\s*)(year|yr|annum)\b|\b(yearly|annually)\b|(/-?|\b)\s*p\.?\s?a\b")
+
+AREA_MULTIPLIERS = {
+    "sq ft": 1,
+    "sqft": 1,
+    "sq feet": 1,
+    "square feet": 1,
+    "square foot": 1,
+    "sq m": 10.7639,
+    "sqm": 10.7639,
+    "sq mt": 10.7639,
+    "sq mtr": 10.7639,
+    "sq meters": 10.7639,
+    "sq metres": 10.7639,
+    "square meters": 10.7639,
+    "square metres": 10.7639,
+    "sq yd": 9,
+    "sq yds": 9,
+    "sq yards": 9,
+    "square yards": 9,
+    "gaj": 9,
+    "cent": 435.6,
+    "cents": 435.6,
+    "acre": 43560,
+    "acres": 43560
+}
+AREA_PATTERN = re.compile(rf"({NUMBER}){RANGE}\s*([a-z. ]*)")
+
+
+class ValidationError(Exception):
+    """Raised when a payload does not match a model; errors use FastAPI's 422 shape"""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class Field:
+    """Declarative field constraint, a small subset of pydantic.Field"""
+
+    def __init__(self, kind, required=True, default=None, default_factory=None,
+                 min_length=None, max_length=None, ge=None, le=None, choices=None, pattern=None):
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.default_factory = default_factory
+        self.min_length = min_length
+        self.max_length = max_length
+        self.ge = ge
+        self.le = le
+        self.choices = choices
+        self.pattern = pattern
+
+    def check(self, value):
+        """Return an error message for value, or None if it is valid"""
+        if self.kind is int and (isinstance(value, bool) or not isinstance(value, int)):
+            return "Input should be a valid integer"
+        if self.kind is str and not isinstance(value, str):
+            return "Input should be a valid string"
+        if self.kind is list and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+            return "Input should be a valid list of strings"
+        if self.min_length is not None and len(value) < self.min_length:
+            return f"Should have at least {self.min_length} characters"
+        if self.max_length is not None and len(value) > self.max_length:
+            return f"Should have at most {self.max_length} characters"
+        if self.ge is not None and value < self.ge:
+            return f"Input should be greater than or equal to {self.ge}"
+        if self.le is not None and value > self.le:
+            return f"Input should be less than or equal to {self.le}"
+        if self.choices is not None and value not in self.choices:
+            return f"Input should be one of: {', '.join(self.choices)}"
+        if self.pattern is not None and not self.pattern.match(value):
+            return "Input is not in a valid format"
+        return None
+
+
+def validate(payload, fields, partial=False):
+    """Validate payload against fields and return the cleaned document.
+
+    With partial=True only the supplied fields are checked (PUT semantics) and
+    no defaults are filled in.
+    """
+    if not isinstance(payload, dict):
+        raise ValidationError([{"type": "model_type", "loc": ["body"], "msg": "Input should be a valid object"}])
+
+    errors = []
+    document = {}
+    for name, spec in fields.items():
+        if payload.get(name) is None:
+            if partial:
+                continue
+            if spec.required:
+                errors.append({"type": "missing", "loc": ["body", name], "msg": "Field required"})
+            else:
+                document[name] = spec.default_factory() if spec.default_factory else spec.default
+            continue
+        value = payload[name]
+        message = spec.check(value)
+        if message:
+            errors.append({"type": "value_error", "loc": ["body", name], "msg": message, "input": value})
+        else:
+            document[name] = value.strip() if isinstance(value, str) else value
+
+    if errors:
+        raise ValidationError(errors)
+    return document
+
+
+def parse_price(text):
+    """Parse a display price such as "₹85,00,000", "₹18,000/month" or "1.2 Cr".
+
+    Returns the amount in rupees as a float, or None if no number is present.
+    Yearly rents ("₹2 Lakh/year") are converted to per month, and a range
+    ("1.5-2 Cr") gives its lower bound.
+    """
+    text = (text or "").lower()
+    match = PRICE_PATTERN.search(text)
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", "")) * PRICE_MULTIPLIERS.get(match.group(2), 1)
+    return round(amount / 12, 2) if YEARLY_PATTERN.search(text) else amount
+
+
+def parse_price_unit(text, property_type=None):
+    """Return "rent" or "sale" for a listing's price.
+
+    The listing type decides ("For Rent" prices are rents); only without a
+    type does the price text, e.g. "₹18,000/month" or "₹15,000 p.m.", decide.
+    """
+    if property_type is not None:
+        return "rent" if property_type == "For Rent" else "sale"
+    text = (text or "").lower()
+    return "rent" if MONTHLY_PATTERN.search(text) or YEARLY_PATTERN.search(text) else "sale"
+
+
+def parse_area(text):
+    """Parse a display area such as "2,800 sq ft" or "5 cents" into square feet.
+
+    Returns an int, or None if no number is present or the unit is not one
+    of AREA_MULTIPLIERS. A missing unit is taken to be square feet; words
+    after a known unit ("1,200 sq ft carpet") are ignored.
+    """
+    match = AREA_PATTERN.search((text or "").lower())
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", ""))
+    unit = " ".join(match.group(2).replace(".", " ").split())
+    if not unit:
+        return int(round(amount))
+    known = [name for name in AREA_MULTIPLIERS if unit == name or unit.startswith(name + " ")]
+    if not known:
+        return None
+    return int(round(amount * AREA_MULTIPLIERS[max(known, key=len)]))
+
+
+def numeric_fields(document):
+    """Parsed numeric columns for whichever of price/area the document carries.
+
+    The formatted strings stay as they are for display; these columns are
+    what the indexes, range filters and sorts use.
+    """
+    fields = {}
+    if "price" in document:
+        fields["price_value"] = parse_price(document["price"])
+        fields["price_unit"] = parse_price_unit(document["price"], document.get("type"))
+    if "area" in document:
+        fields["area_sqft"] = parse_area(document["area"])
+    return fields
+
+
+def numeric_changes(stored, changes):
+    """Numeric columns to $set along with changes to the stored document.
+
+    The price unit depends on both price and type, so the columns are
+    recomputed from the merged document whenever either of them changes.
+    """
+    if not {"price", "area", "type"} & changes.keys():
+        return {}
+    return numeric_fields({**stored, **changes})
+
+
+def location_keys(text):
+    """Normalized search keys for a location.
+
+    "Electronic City, Hosur" -> ["electronic city, hosur", "electronic city", "hosur"],
+    so a location filter matches the full address or any of its parts.
+    """
+    parts = [" ".join(re.sub(r"[^\w\s]", " ", part).lower().split()) for part in (text or "").split(",")]
+    parts = [part for part in parts if part]
+    keys = [", ".join(parts)] if len(parts) > 1 else []
+    return keys + parts
+
+
+def normalize_location(text):
+    """Normalize a location filter value the same way location_keys does"""
+    keys = location_keys(text)
+    return keys[0] if keys else ""
+
+
+def locality(text):
+    """(normalized key, display name) of a location's most specific part.
+
+    "Electronic City, Hosur" -> ("electronic city", "Electronic City");
+    ("", "") when the location is empty.
+    """
+    for part in (text or "").split(","):
+        key = " ".join(re.sub(r"[^\w\s]", " ", part).lower().split())
+        if key:
+            return key, part.strip()
+    return "", ""
+
+
+UPLOADED_IMAGE = re.compile(r"/api/images/([0-9a-f]{32})$")
+
+
+def image_key(url):
+    """Key that ties a listing's image to the image pipeline.
+
+    Links to an uploaded image (".../api/images/<id>") key on the image id;
+    any other URL keys on itself, matching an image submitted by source URL.
+    """
+    match = UPLOADED_IMAGE.search(url or "")
+    return f"image:{match.group(1)}" if match else url
+
+
+def json_default(value):
+    """json.dumps default= hook for the datetimes stored on documents"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _new_id():
+    return str(uuid.uuid4())
+
+
+CONTACT_CREATE_FIELDS = {
+    "name": Field(str, min_length=2, max_length=100),
+    "email": Field(str, max_length=254, pattern=EMAIL_PATTERN),
+    "phone": Field(str, required=False, max_length=20),
+    "message": Field(str, min_length=1, max_length=1000)
+}
+
+CONTACT_UPDATE_FIELDS = {
+    "status": Field(str, choices=CONTACT_STATUSES)
+}
+
+PROPERTY_CREATE_FIELDS = {
+    "title": Field(str, min_length=3, max_length=200),
+    "price": Field(str, min_length=1, max_length=50),
+    "location": Field(str, min_length=2, max_length=200),
+    "bedrooms": Field(int, ge=1, le=20),
+    "parking": Field(int, ge=0, le=20),
+    "area": Field(str, min_length=1, max_length=50),
+    "type": Field(str, choices=PROPERTY_TYPES),
+    "image": Field(str, min_length=10, max_length=1000),
+    "description": Field(str, required=False, max_length=2000),
+    "features": Field(list, required=False),
+    "status": Field(str, required=False, default="active", choices=PROPERTY_STATUSES)
+}
+
+PROPERTY_UPDATE_FIELDS = PROPERTY_CREATE_FIELDS
+
+# Every field a stored Property document can have, in response order
+PROPERTY_FIELDS = ("id", *PROPERTY_CREATE_FIELDS, "image_variants", "price_value", "price_unit", "area_sqft",
+                   "created_at", "updated_at")
+# Named projections for fields=; "card" is what the home page listing cards render
+PROPERTY_VIEWS = {
+    "card": ("id", "title", "price", "location", "bedrooms", "parking", "area", "type", "image", "image_variants")
+}
+
+
+def new_contact(payload):
+    """Validate a ContactCreate payload and return a Contact document"""
+    document = validate(payload, CONTACT_CREATE_FIELDS)
+    document.update({
+        "id": _new_id(),
+        "created_at": datetime.utcnow(),
+        "status": "new"
+    })
+    return document
+
+
+def contact_fingerprint(contact):
+    """Hash of what a contact submission says, ignoring case and whitespace differences"""
+    parts = [" ".join(str(contact.get(field) or "").lower().split()) for field in CONTACT_CREATE_FIELDS]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def contact_update(payload):
+    """Validate a contact status change"""
+    return validate(payload, CONTACT_UPDATE_FIELDS)
+
+
+def new_property(payload):
+    """Validate a PropertyCreate payload and return a Property document"""
+    document = validate(payload, PROPERTY_CREATE_FIELDS)
+    document.update(numeric_fields(document))
+    now = datetime.utcnow()
+    document.update({
+        "id": _new_id(),
+        "image_variants": None,  # thumbnail URLs, filled in once the image pipeline has them
+        "created_at": now,
+        "updated_at": now
+    })
+    return document
+
+
+def property_update(payload):
+    """Validate a PropertyUpdate payload and return the fields to $set.
+
+    The numeric columns depend on the stored document too; see numeric_changes().
+    """
+    changes = validate(payload, PROPERTY_UPDATE_FIELDS, partial=True)
+    if "image" in changes:
+        changes["image_variants"] = None
+    changes["updated_at"] = datetime.utcnow()
+    return changes
@@ -0,0 +1,164 @@
+"""
+Background delivery of new-inquiry notifications.
+
+POST /contacts only persists the contact and enqueues a job; a pool of
+worker threads hands each job to the notifier (email, WhatsApp, ...), so
+a slow or failing provider never adds latency to the form submission.
+Failed deliveries are retried with exponential backoff and land in a
+dead-letter list once their attempts are used up.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def log_notifier(contact):
+    """Default notifier: record the inquiry in the server log"""
+    logger.info("New inquiry from %s <%s>: %s", contact["name"], contact["email"], contact["message"][:80])
+
+
+class NotificationQueue:
+    def __init__(self, notifier=log_notifier, workers=4, max_attempts=5, base_delay=0.5, max_delay=30.0,
+                 dead_letter_limit=1000):
+        self.notifier = notifier
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letters = deque(maxlen=dead_letter_limit)
+        self._pending = []  # heap of (due, sequence, job)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._in_flight = 0
+        self.enqueued = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    def enqueue(self, contact):
+        """Queue a notification for contact; returns immediately"""
+        job = {"contact": contact, "attempts": 0}
+        with self._condition:
+            self.enqueued += 1
+            self._schedule(job, 0)
+
+    def _schedule(self, job, delay):
+        heapq.heappush(self._pending, (time.monotonic() + delay, next(self._sequence), job))
+        self._condition.notify_all()  # join() waits on the same condition, so wake everyone
+
+    def _backoff(self, attempts):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+
+    def _next_job(self):
+        with self._condition:
+            while self._running:
+                if self._pending:
+                    due = self._pending[0][0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        self._in_flight += 1
+                        return heapq.heappop(self._pending)[2]
+                    self._condition.wait(wait)
+                else:
+                    self._condition.wait()
+            return None
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            job["attempts"] += 1
+            try:
+                self.notifier(job["contact"])
+            except Exception as e:
+                with self._condition:
+                    self._in_flight -= 1
+                    if job["attempts"] < self.max_attempts:
+                        self.retried += 1
+                        self._schedule(job, self._backoff(job["attempts"]))
+                    else:
+                        self.dead_lettered += 1
+                        self.dead_letters.append({
+                            "contact_id": job["contact"]["id"],
+                            "attempts": job["attempts"],
+                            "error": repr(e),
+                            "failed_at": datetime.utcnow(),
+                            "contact": job["contact"]
+                        })
+                        logger.warning("Notification for contact %s dead-lettered: %r", job["contact"]["id"], e)
+                    self._condition.notify_all()
+            else:
+                with self._condition:
+                    self._in_flight -= 1
+                    self.delivered += 1
+                    self._condition.notify_all()
+
+    def retry_dead_letters(self):
+        """Requeue every dead-lettered notification with a fresh attempt budget"""
+        with self._condition:
+            count = len(self.dead_letters)
+            while self.dead_letters:
+                entry = self.dead_letters.popleft()
+                self._schedule({"contact": entry["contact"], "attempts": 0}, 0)
+            return count
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+        self._threads = [threading.Thread(target=self._work, name=f"notifier-{n}", daemon=True)
+                         for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop the workers after their current job; undelivered jobs stay queued"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def join(self, timeout=None):
+        """Wait until nothing is queued or in flight; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def dead_letter_summary(self):
+        """Dead letters without the contact payloads"""
+        with self._condition:
+            return [{key: value for key, value in entry.items() if key != "contact"} for entry in self.dead_letters]
+
+    def stats(self):
+        with self._condition:
+            return {
+                "workers": len(self._threads),
+                "queued": len(self._pending),
+                "in_flight": self._in_flight,
+                "enqueued": self.enqueued,
+                "delivered": self.delivered,
+                "retried": self.retried,
+                "dead_lettered": self.dead_lettered,
+                "dead_letters": len(self.dead_letters)
+            }
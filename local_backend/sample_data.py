@@ -0,0 +1,89 @@
+"""
+Sample listings loaded into an empty database at startup, matching the
+production backend's sample data initialization, plus a generator of
+synthetic listings for benchmarks.
+"""
+
+import random
+
+SAMPLE_PROPERTIES = [
+    {
+        "title": "Premium 3BHK Villa",
+        "price": "₹85,00,000",
+        "location": "Mathigiri, Hosur",
+        "bedrooms": 3,
+        "parking": 2,
+        "area": "2,400 sq ft",
+        "type": "For Sale",
+        "image": "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80",
+        "description": "Independent villa with private garden in a gated community.",
+        "features": ["Gated Community", "Garden", "Power Backup", "Security"]
+    },
+    {
+        "title": "Modern 2BHK Apartment",
+        "price": "₹18,000/month",
+        "location": "Rayakottai Road, Hosur",
+        "bedrooms": 2,
+        "parking": 1,
+        "area": "1,150 sq ft",
+        "type": "For Rent",
+        "image": "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?auto=format&fit=crop&w=800&q=80",
+        "description": "Semi-furnished apartment close to the SIPCOT industrial area.",
+        "features": ["Gym", "Lift", "Covered Parking"]
+    },
+    {
+        "title": "Spacious Family Home",
+        "price": "₹62,00,000",
+        "location": "Denkanikottai Road, Hosur",
+        "bedrooms": 3,
+        "parking": 2,
+        "area": "1,900 sq ft",
+        "type": "For Sale",
+        "image": "https://images.unsplash.com/photo-1570129477492-45c003edd2be?auto=format&fit=crop&w=800&q=80",
+        "description": "Well-ventilated home near schools and the Hosur bus stand.",
+        "features": ["Borewell", "Car Parking", "Vastu Compliant"]
+    }
+]
+
+LOCALITIES = [
+    "Mathigiri", "Rayakottai Road", "Denkanikottai Road", "Bagalur Road", "Zuzuvadi",
+    "Alasanatham", "Sipcot Phase 1", "Sipcot Phase 2", "Krishnagiri Road", "Belagondapalli"
+]
+PROPERTY_IMAGE = "https://images.unsplash.com/photo-1600596542815-ffad4c1539a9?auto=format&fit=crop&w=800&q=80"
+
+
+def format_inr(amount):
+    """Format rupees with Indian digit grouping, e.g. 8500000 -> ₹85,00,000"""
+    digits = str(int(amount))
+    if len(digits) > 3:
+        head, tail = digits[:-3], digits[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        digits = ",".join([head] + groups + [tail])
+    return f"₹{digits}"
+
+
+def generate_properties(count, localities=LOCALITIES, start=0, seed=0):
+    """Deterministic synthetic listings for benchmarks"""
+    rng = random.Random(seed + start)
+    for n in range(start, start + count):
+        property_type = ("For Sale", "For Rent", "Investment")[n % 3]
+        bedrooms = rng.randint(1, 5)
+        if property_type == "For Rent":
+            price = f"{format_inr(rng.randint(8, 60) * 1000)}/month"
+        else:
+            price = format_inr(rng.randint(20, 250) * 100000)
+        yield {
+            "title": f"{bedrooms}BHK Listing {n}",
+            "price": price,
+            "location": f"{localities[n % len(localities)]}, Hosur",
+            "bedrooms": bedrooms,
+            "parking": rng.randint(0, 3),
+            "area": f"{rng.randint(6, 40) * 100:,} sq ft",
+            "type": property_type,
+            "image": PROPERTY_IMAGE,
+            "description": f"Synthetic listing {n} for benchmarking.",
+            "features": rng.sample(["Gym", "Swimming Pool", "Security", "Power Backup", "Lift", "Garden"], 3)
+        }
@@ -0,0 +1,208 @@
+"""
+Full-text search over property listings.
+
+An inverted index maps each term to the listings containing it, weighted
+by the field it came from (a match in the title counts for more than one
+in the description). It subscribes to the properties collection's write
+listener, so creates, updates and deletes are reflected immediately and a
+search never scans the collection.
+
+Queries are ranked with BM25. Each query term also matches vocabulary
+terms it is a prefix of ("apart" -> "apartment") and, for longer words,
+terms within a small edit distance ("hosr" -> "hosur"), at a discount.
+Listings matching more of the query terms always rank first.
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+FIELD_WEIGHTS = {"title": 3.0, "location": 2.0, "features": 2.0, "bedrooms": 1.0, "description": 1.0}
+STOPWORDS = frozenset(["a", "an", "and", "at", "for", "in", "near", "of", "on", "the", "to", "with"])
+UNIT_WORDS = frozenset(["bhk", "rk"])  # "3 BHK" and "3BHK" both index as "3bhk"
+TOKEN_PATTERN = re.compile(r"\d+|[^\W\d_]+")
+
+PREFIX_MIN_LENGTH = 3
+PREFIX_EXPANSIONS = 50
+PREFIX_FACTOR = 0.8
+TYPO_MIN_LENGTH = 4
+TYPO_FACTOR = 0.6
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    """Lowercase terms of text, without stopwords; a number followed by a unit word becomes one term"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    terms = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.isdigit() and i + 1 < len(tokens) and tokens[i + 1] in UNIT_WORDS:
+            terms.append(token + tokens[i + 1])
+            i += 2
+            continue
+        if token not in STOPWORDS:
+            terms.append(token)
+        i += 1
+    return terms
+
+
+def _field_text(document, field):
+    if field == "bedrooms":
+        return f"{document['bedrooms']} BHK" if document.get("bedrooms") else ""
+    value = document.get(field) or ""
+    return " ".join(value) if isinstance(value, list) else str(value)
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance between a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def typo_budget(term):
+    """Edits allowed when matching term: none for short words, one, then two for long ones"""
+    if len(term) < TYPO_MIN_LENGTH or not term.isalpha():
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+class SearchIndex:
+    """Inverted index over a collection, kept current by its write listener"""
+
+    def __init__(self, collection, fields=FIELD_WEIGHTS):
+        self.fields = fields
+        self._postings = defaultdict(dict)  # term -> {document id: weighted term frequency}
+        self._lengths = {}  # document id -> weighted document length
+        self._total_length = 0.0
+        self._vocabulary = []  # sorted terms, for prefix lookups
+        self._by_length = defaultdict(set)  # alphabetic term length -> terms, for typo lookups
+        self._lock = threading.Lock()
+        collection.add_listener(self.record)
+        collection.scan(self._add_all)
+
+    def _add_all(self, documents):
+        for document in documents:
+            self.record(None, document)
+
+    def _terms(self, document):
+        weights = Counter()
+        for field, weight in self.fields.items():
+            for term in tokenize(_field_text(document, field)):
+                weights[term] += weight
+        return weights
+
+    def _add_term(self, term):
+        bisect.insort(self._vocabulary, term)
+        if term.isalpha():
+            self._by_length[len(term)].add(term)
+
+    def _remove_term(self, term):
+        del self._postings[term]
+        del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        self._by_length[len(term)].discard(term)
+
+    def record(self, before, after):
+        """Write listener: replace the document's postings"""
+        with self._lock:
+            if before is not None:
+                for term in self._terms(before):
+                    postings = self._postings[term]
+                    postings.pop(before["id"], None)
+                    if not postings:
+                        self._remove_term(term)
+                self._total_length -= self._lengths.pop(before["id"], 0.0)
+            if after is not None:
+                weights = self._terms(after)
+                for term, weight in weights.items():
+                    if term not in self._postings:
+                        self._add_term(term)
+                    self._postings[term][after["id"]] = weight
+                length = sum(weights.values())
+                self._lengths[after["id"]] = length
+                self._total_length += length
+
+    def _expand(self, term):
+        """Vocabulary terms a query term matches, with the factor each match is scored at"""
+        matches = {}
+        if not term.isdigit() and len(term) >= PREFIX_MIN_LENGTH:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + PREFIX_EXPANSIONS]:
+                if not candidate.startswith(term):
+                    break
+                matches[candidate] = PREFIX_FACTOR
+        budget = typo_budget(term)
+        if budget:
+            for length in range(len(term) - budget, len(term) + budget + 1):
+                for candidate in self._by_length.get(length, ()):
+                    if candidate not in matches and edit_distance(term, candidate, budget) <= budget:
+                        matches[candidate] = TYPO_FACTOR
+        if term in self._postings:
+            matches[term] = 1.0
+        return matches
+
+    def search(self, text):
+        """Rank documents for a free-text query; yields (document id, score), best first.
+
+        Documents are ordered by how many query terms they match, then by
+        BM25 score. Each query term contributes its best-scoring match only,
+        so a term with many prefix expansions does not outweigh the rest.
+        Results come off a heap, so a caller that stops after one page
+        never pays for sorting every match.
+        """
+        ranked = [(-matched, -total, document_id) for document_id, (matched, total) in self._score(text).items()]
+        heapq.heapify(ranked)
+        while ranked:
+            _, total, document_id = heapq.heappop(ranked)
+            yield document_id, -total
+
+    def _score(self, text):
+        """{document id: (query terms matched, BM25 score)}"""
+        terms = list(dict.fromkeys(tokenize(text)))
+        with self._lock:
+            count = len(self._lengths)
+            if not terms or not count:
+                return {}
+            lengths = self._lengths
+            base = BM25_K1 * (1 - BM25_B)
+            per_length = BM25_K1 * BM25_B * count / self._total_length
+            results = {}
+            for term in terms:
+                best = {}
+                for candidate, factor in self._expand(term).items():
+                    postings = self._postings[candidate]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    weight = factor * idf * (BM25_K1 + 1)
+                    scores = {document_id: weight * frequency / (frequency + base + per_length * lengths[document_id])
+                              for document_id, frequency in postings.items()}
+                    if best:
+                        for document_id, score in scores.items():
+                            if score > best.get(document_id, 0.0):
+                                best[document_id] = score
+                    else:
+                        best = scores
+                for document_id, score in best.items():
+                    matched, total = results.get(document_id, (0, 0.0))
+                    results[document_id] = (matched + 1, total + score)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {"documents": len(self._lengths), "terms": len(self._postings)}
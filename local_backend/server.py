@@ -0,0 +1,1225 @@
+"""
+In-process stand-in for the Velan Properties ``/api`` surface.
+
+Serves the endpoints listed in contracts.md from an in-memory store using
+only the standard library, so the test and benchmark suites can run on a
+laptop or CI box with no network access (this is what
+``backend_test.py --local`` does):
+
+    # Every test request comes from one address, so the per-IP contact limit is off
+    with LocalBackend(api=LocalAPI(contact_ip_limit=None)) as backend:
+        tester = VelanPropertiesAPITester(base_url=backend.base_url, local_backend=backend)
+        tester.run_all_tests()
+
+Everything beyond contracts.md (numeric price columns, cursors, caching,
+bulk import/export, search, projections, images, the change feed,
+analytics, metrics and the readiness probe) exists only here; the
+production FastAPI/MongoDB backend does not have it. The tester runs those
+checks only when it is given the backend as local_backend, and skips them
+otherwise.
+"""
+
+import base64
+import io
+import json
+import logging
+import math
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import analytics, bulk, compression, images, models
+from .cache import ResponseCache, etag_matches
+from .changes import ChangeFeed
+from .counters import CollectionCounters
+from .jobs import PeriodicJob
+from .limits import ReplayCache, TokenBucketLimiter
+from .metrics import MetricsRegistry
+from .notifications import NotificationQueue, log_notifier
+from .sample_data import SAMPLE_PROPERTIES
+from .search import SearchIndex
+from .store import MemoryDatabase, PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api"
+
+BULK_BATCH_SIZE = 500
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REPLAY_WAIT_TIMEOUT = 10.0  # seconds a duplicate submission waits for the original to finish
+EXPORT_PAGE_SIZE = 500
+CHANGE_COLLECTIONS = ("contacts", "properties")
+PUBLIC_CHANGE_COLLECTIONS = ("properties",)  # contacts hold enquirers' details, so only admins follow them
+CHANGE_STREAM_HEARTBEAT = 15.0  # seconds between keepalive comments on an idle change stream
+CHANGE_STREAM_RETRY_MS = 3000  # reconnect delay suggested to EventSource clients
+DRAIN_CHUNK_SIZE = 64 * 1024
+DRAIN_LIMIT = 1024 * 1024  # unread request body bytes discarded to keep a connection; past this it is closed
+
+# Routes that answer before startup has finished, so probes and scrapers can watch it
+STARTUP_ROUTES = ("/", "/health", "/metrics")
+# Listing requests served from a warm cache as soon as the API is ready
+WARMUP_REQUESTS = [({}, None), ({}, "gzip"), ({"view": "card"}, "gzip")]
+
+LISTING_DEFAULTS = {"limit": "50", "offset": "0", "sort": "newest"}
+
+PROPERTY_SORTS = {
+    "newest": ("created_at", True),
+    "price_asc": ("price_value", False),
+    "price_desc": ("price_value", True),
+    "area_asc": ("area_sqft", False),
+    "area_desc": ("area_sqft", True)
+}
+
+
+class HTTPException(Exception):
+    """Raised by handlers to return an error response, like FastAPI's HTTPException"""
+
+    def __init__(self, status_code, detail, headers=None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+
+
+def dumps(payload):
+    return json.dumps(payload, default=models.json_default).encode("utf-8")
+
+
+def encode_cursor(position):
+    """Opaque cursor for a (created_at, id) keyset position"""
+    if position is None:
+        return None
+    created_at, document_id = position
+    raw = json.dumps([created_at.isoformat(), document_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; an empty cursor means the first page.
+
+    Stored timestamps are naive UTC, so a timestamp with an offset cannot
+    have come from encode_cursor and is rejected like any other bad cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, document_id = json.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is not None:
+            raise ValueError("cursor timestamp has a UTC offset")
+        return created_at, str(document_id)
+    except (ValueError, TypeError):
+        raise HTTPException(422, [{"type": "value_error", "loc": ["query", "cursor"],
+                                   "msg": "Invalid cursor", "input": cursor}])
+
+
+class _FixedLengthBody(io.RawIOBase):
+    """Request body with a Content-Length, read straight off the socket"""
+
+    def __init__(self, rfile, length):
+        self.rfile = rfile
+        self.remaining = length
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        data = self.rfile.read(min(len(buffer), self.remaining))
+        self.remaining -= len(data)
+        self.bytes_read += len(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class _ChunkedBody(io.RawIOBase):
+    """Request body sent with Transfer-Encoding: chunked"""
+
+    def __init__(self, rfile):
+        self.rfile = rfile
+        self.chunk_remaining = 0
+        self.bytes_read = 0
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.done:
+            return 0
+        if self.chunk_remaining == 0:
+            size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                while self.rfile.readline().strip():
+                    pass  # trailers
+                self.done = True
+                return 0
+            self.chunk_remaining = size
+        data = self.rfile.read(min(len(buffer), self.chunk_remaining))
+        self.chunk_remaining -= len(data)
+        self.bytes_read += len(data)
+        if self.chunk_remaining == 0:
+            self.rfile.readline()  # CRLF after the chunk
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class Request:
+    def __init__(self, method, path, query=None, headers=None, body=b"", stream=None, client=None):
+        self.method = method
+        self.path = path
+        self.client = client
+        self.query = query or {}
+        self.headers = headers or {}
+        self.stream = stream if stream is not None else io.BufferedReader(io.BytesIO(body))
+        self._body = None if stream is not None else body
+        self.path_params = {}
+
+    @property
+    def body(self):
+        """The whole request body; handlers that stream should read self.stream instead"""
+        if self._body is None:
+            self._body = self.stream.read()
+        return self._body
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            raise HTTPException(422, [{"type": "json_invalid", "loc": ["body"], "msg": "JSON decode error"}])
+
+    def int_param(self, name, default, ge=None, le=None):
+        """Read an integer query parameter, rejecting bad values with a 422 like FastAPI's Query()"""
+        raw = self.query.get(name)
+        if raw is None or raw == "":
+            return default
+        try:
+            value = int(raw)
+        except ValueError:
+            raise HTTPException(422, [{"type": "int_parsing", "loc": ["query", name],
+                                       "msg": "Input should be a valid integer", "input": raw}])
+        if ge is not None and value < ge:
+            raise HTTPException(422, [{"type": "greater_than_equal", "loc": ["query", name],
+                                       "msg": f"Input should be greater than or equal to {ge}", "input": raw}])
+        if le is not None and value > le:
+            raise HTTPException(422, [{"type": "less_than_equal", "loc": ["query", name],
+                                       "msg": f"Input should be less than or equal to {le}", "input": raw}])
+        return value
+
+    def float_param(self, name):
+        raw = self.query.get(name)
+        if raw is None or raw == "":
+            return None
+        try:
+            return float(raw)
+        except ValueError:
+            raise HTTPException(422, [{"type": "float_parsing", "loc": ["query", name],
+                                       "msg": "Input should be a valid number", "input": raw}])
+
+
+class Response:
+    def __init__(self, payload=None, status_code=200, headers=None, body=None, content_type="application/json",
+                 stream=None):
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self.content_type = content_type
+        self.stream = stream
+        self.payload = payload
+        self._body = body
+        self.route = None
+
+    @property
+    def body(self):
+        """Serialized body, produced on first access so serialization can be timed separately"""
+        if self._body is None and self.stream is None:
+            self._body = dumps(self.payload)
+        return self._body
+
+    @body.setter
+    def body(self, body):
+        self._body = body
+
+
+class LocalAPI:
+    """Routes requests to handlers backed by a MemoryDatabase.
+
+    Requests other than health checks get a 503 until startup() has
+    created the indexes, seeded an empty database and warmed the pool and
+    listing cache; LocalBackend.start() runs it.
+
+    Contact submissions are deduplicated for dedupe_window seconds and
+    rate limited per client IP and per email; a limit is a (burst,
+    period in seconds) pair, or None to disable it. Set
+    trust_forwarded_for when running behind a proxy that sets
+    X-Forwarded-For, so clients are told apart by their own address.
+
+    Writes to both collections are logged to a change feed, compacted
+    every change_compact_interval seconds; delete tombstones are kept for
+    change_tombstone_ttl seconds. The public /changes feed carries only
+    properties; /admin/changes/feed carries contacts too.
+    """
+
+    def __init__(self, db=None, seed=True, cache_size=256, cache_ttl=60.0, reconcile_interval=300.0,
+                 notifier=log_notifier, notification_workers=4, dedupe_window=600.0,
+                 contact_ip_limit=(10, 60.0), contact_email_limit=(3, 600.0), trust_forwarded_for=False,
+                 image_dir=None, image_workers=2, change_compact_interval=300.0, change_tombstone_ttl=86400.0):
+        self.db = db or MemoryDatabase()
+        self.seed = seed
+        self.ready = threading.Event()
+        self.startup_seconds = None
+        self.metrics = MetricsRegistry()
+        self.db.instrument(self.metrics)
+        self.listing_cache = ResponseCache(max_entries=cache_size, ttl=cache_ttl)
+        self.notifications = NotificationQueue(notifier, workers=notification_workers)
+        self.contact_replays = ReplayCache(window=dedupe_window)
+        self.contact_ip_limiter = TokenBucketLimiter(*contact_ip_limit) if contact_ip_limit else None
+        self.contact_email_limiter = TokenBucketLimiter(*contact_email_limit) if contact_email_limit else None
+        self.trust_forwarded_for = trust_forwarded_for
+        self.images = images.ImageStore(image_dir, image_workers, on_ready=self.on_image_ready)
+        self.routes = []
+        self._register_routes()
+        self.db.properties.add_listener(lambda before, after: self.listing_cache.invalidate())
+        self.contact_counters = CollectionCounters(self.db.contacts, ("status",))
+        self.property_counters = CollectionCounters(self.db.properties, ("status", "type"))
+        self.property_search = SearchIndex(self.db.properties)
+        self.locality_aggregates = analytics.LocalityAggregates(self.db.properties)
+        self.changes = ChangeFeed((self.db.contacts, self.db.properties), tombstone_ttl=change_tombstone_ttl)
+        self.jobs = [PeriodicJob("reconcile-counters", reconcile_interval, self.reconcile_counters),
+                     PeriodicJob("compact-changes", change_compact_interval, self.changes.compact)]
+
+    def route(self, method, pattern, handler):
+        regex = re.compile("^" + re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", pattern) + "$")
+        self.routes.append((method, pattern, regex, handler))
+
+    def _register_routes(self):
+        self.route("GET", "/", self.health_check)
+        self.route("GET", "/health", self.readiness)
+        self.route("GET", "/metrics", self.metrics_export)
+        self.route("POST", "/contacts", self.create_contact)
+        self.route("GET", "/contacts", self.list_contacts)
+        self.route("GET", "/properties", self.list_properties)
+        self.route("POST", "/properties", self.create_property)
+        self.route("POST", "/properties/bulk", self.bulk_import_properties)
+        self.route("GET", "/properties/export", self.export_properties)
+        self.route("GET", "/properties/search", self.search_properties)
+        self.route("GET", "/properties/{property_id}", self.get_property)
+        self.route("PUT", "/properties/{property_id}", self.update_property)
+        self.route("DELETE", "/properties/{property_id}", self.delete_property)
+        self.route("POST", "/images", self.upload_image)
+        self.route("GET", "/images/{image_id}", self.get_image)
+        self.route("GET", "/images/files/{name}", self.image_file)
+        self.route("GET", "/changes", self.list_changes)
+        self.route("GET", "/changes/stream", self.stream_changes)
+        self.route("GET", "/admin/dashboard", self.admin_dashboard)
+        self.route("GET", "/admin/contacts", self.list_contacts)
+        self.route("PUT", "/admin/contacts/{contact_id}", self.update_contact)
+        self.route("GET", "/admin/properties", self.admin_list_properties)
+        self.route("GET", "/admin/cache", self.cache_stats)
+        self.route("POST", "/admin/counters/reconcile", self.reconcile_counters_now)
+        self.route("GET", "/admin/notifications", self.notification_stats)
+        self.route("POST", "/admin/notifications/retry", self.retry_notifications)
+        self.route("GET", "/admin/changes", self.change_stats)
+        self.route("GET", "/admin/changes/feed", self.admin_list_changes)
+        self.route("GET", "/admin/changes/stream", self.admin_stream_changes)
+        self.route("GET", "/admin/analytics/overview", self.analytics_overview)
+        self.route("GET", "/admin/analytics/localities", self.analytics_localities)
+        self.route("GET", "/admin/analytics/localities/{locality}", self.analytics_locality)
+        self.route("POST", "/admin/changes/compact", self.compact_changes)
+
+    def _create_indexes(self):
+        properties = self.db.properties
+        properties.create_index("type")
+        properties.create_index("status")
+        properties.create_index("price_unit")
+        properties.create_index("price_value", ordered=True)
+        properties.create_index("area_sqft", ordered=True)
+        properties.create_index("location_key", key=lambda d: models.location_keys(d["location"]))
+        properties.create_index("created_at", ordered=True)
+        properties.create_index("image_key", key=lambda d: models.image_key(d["image"]))
+        self.db.contacts.create_index("status")
+        self.db.contacts.create_index("created_at", ordered=True)
+
+    def startup(self):
+        """One-time startup work, after which the API reports ready.
+
+        Indexes and the seed check run here rather than on the first
+        request, so no user request pays for them.
+        """
+        started = time.perf_counter()
+        self.db.pool.warm()
+        self._create_indexes()
+        if self.seed:
+            self.initialize_sample_data()
+        self.warmup()
+        self.startup_seconds = time.perf_counter() - started
+        self.ready.set()
+        logger.info("API ready in %.3fs", self.startup_seconds)
+
+    def warmup(self):
+        """Prime the listing cache with the requests the home page makes first"""
+        for query, encoding in WARMUP_REQUESTS:
+            headers = {"accept-encoding": encoding} if encoding else {}
+            self.list_properties(Request("GET", API_PREFIX + "/properties", query=dict(query), headers=headers))
+
+    def initialize_sample_data(self):
+        """Load sample listings into an empty properties collection"""
+        if self.db.properties.count() == 0:
+            for sample in SAMPLE_PROPERTIES:
+                self.db.properties.insert_one(models.new_property(sample))
+
+    def load_properties(self, payloads):
+        """Validate and insert property payloads directly, bypassing HTTP (used to seed benchmarks)"""
+        ids = []
+        batch = []
+        for payload in payloads:
+            batch.append(models.new_property(payload))
+            if len(batch) >= BULK_BATCH_SIZE:
+                ids.extend(self.db.properties.insert_many(batch))
+                batch = []
+        ids.extend(self.db.properties.insert_many(batch))
+        return ids
+
+    def start_jobs(self):
+        self.notifications.start()
+        for job in self.jobs:
+            job.start()
+
+    def stop_jobs(self):
+        for job in self.jobs:
+            job.stop()
+        self.notifications.stop()
+        self.images.shutdown()
+        self.changes.close()
+
+    def reconcile_counters(self):
+        """Recount the collections and repair any drift in the dashboard counters and locality aggregates"""
+        return {
+            "contacts": self.contact_counters.reconcile(),
+            "properties": self.property_counters.reconcile(),
+            "localities": self.locality_aggregates.reconcile()
+        }
+
+    def listing_cache_key(self, request):
+        """Normalize listing parameters so equivalent requests share a cache entry"""
+        params = {}
+        for name, value in request.query.items():
+            if name == "location":
+                value = models.normalize_location(value)
+            elif name == "fields":
+                value = ",".join(sorted({field.strip() for field in value.split(",") if field.strip()}))
+            if (value == "" and name != "cursor") or LISTING_DEFAULTS.get(name) == value:
+                continue
+            params[name] = value
+        return request.path.rstrip("/"), tuple(sorted(params.items()))
+
+    def cached(self, request, cache, compute):
+        """Serve a GET through cache, answering a matching If-None-Match with 304.
+
+        A request Cache-Control: no-cache skips the lookup (the fresh result
+        is still stored), which benchmarks use to time the query itself.
+        """
+        encoding = compression.negotiate(request.headers.get("accept-encoding"))
+        key = self.listing_cache_key(request) + (encoding,)
+        bypass = "no-cache" in request.headers.get("cache-control", "")
+        entry = None if bypass else cache.get(key)
+        if entry is None:
+            generation = cache.generation()
+            response = compute()
+            with self.metrics.phase("serialize"):
+                self.compress(request, response)
+            etag = cache.put(key, response.body, generation, response.headers)
+            response.headers["X-Cache"] = "MISS"
+        else:
+            body, etag, headers = entry
+            response = Response(body=body, headers=headers)
+            response.headers["X-Cache"] = "HIT"
+        response.headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, body=b"", headers=response.headers)
+        return response
+
+    def paginate(self, request, collection, query=None, sort_key=None, descending=True, fields=None):
+        """Page a listing by limit/offset, or by keyset when a cursor parameter is present.
+
+        Cursor mode orders newest first by (created_at, id) and answers with
+        {"items": [...], "next_cursor": ...}. Start with an empty cursor and
+        pass next_cursor back until it is null. The offset mode keeps its
+        plain list response so existing clients are unaffected.
+        """
+        limit = request.int_param("limit", 50, ge=1, le=100)
+        if "cursor" in request.query:
+            if sort_key is not None:
+                raise HTTPException(422, [{"type": "value_error", "loc": ["query", "cursor"],
+                                           "msg": "Cursor pagination only supports sort=newest"}])
+            position = decode_cursor(request.query["cursor"])
+            documents, next_position = collection.find_page(query, position=position, limit=limit, fields=fields)
+            return Response({"items": documents, "next_cursor": encode_cursor(next_position)})
+
+        offset = request.int_param("offset", 0, ge=0)
+        if sort_key is None:
+            documents, _ = collection.find_page(query, limit=limit, skip=offset, fields=fields)
+        else:
+            documents = collection.find(query, sort_key=sort_key, reverse=descending, skip=offset, limit=limit,
+                                        fields=fields)
+        return Response(documents)
+
+    def resolve(self, request):
+        """Find the handler for a request: (route pattern, handler), with path_params set.
+
+        Unknown paths resolve to the "unmatched" route and known paths with
+        the wrong method to "method_not_allowed", both with a None handler.
+        """
+        path = request.path
+        if not path.startswith(API_PREFIX):
+            return "unmatched", None
+        path = path[len(API_PREFIX):] or "/"
+        if len(path) > 1:
+            path = path.rstrip("/")
+
+        allowed = False
+        for method, pattern, regex, handler in self.routes:
+            match = regex.match(path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.path_params = match.groupdict()
+            return pattern, handler
+        return ("method_not_allowed" if allowed else "unmatched"), None
+
+    def handle(self, request):
+        """Dispatch a request, recording metrics and turning exceptions into JSON error responses"""
+        route, handler = self.resolve(request)
+        with self.metrics.track(request.method, route) as tracker:
+            if not self.ready.is_set() and route not in STARTUP_ROUTES:
+                response = Response({"detail": "Service is starting"}, 503, headers={"Retry-After": "1"})
+            elif handler is None:
+                response = Response({"detail": "Method Not Allowed" if route == "method_not_allowed" else "Not Found"},
+                                    405 if route == "method_not_allowed" else 404)
+            else:
+                response = self._call(handler, request)
+            with self.metrics.phase("serialize"):
+                self.compress(request, response)
+            tracker.status = response.status_code
+        response.route = route
+        return response
+
+    def compress(self, request, response):
+        """Serialize the body and apply the Content-Encoding the client accepts.
+
+        Only successful compressible responses are encoded, and buffered
+        bodies only past compression.MIN_COMPRESS_SIZE. Responses that
+        already carry a Content-Encoding (cached ones) are left alone.
+        """
+        if response.stream is None:
+            response.body
+        if (response.status_code != 200 or "Content-Encoding" in response.headers
+                or not compression.compressible(response.content_type)):
+            return
+        response.headers["Vary"] = "Accept-Encoding"
+        encoding = compression.negotiate(request.headers.get("accept-encoding"))
+        if encoding is None:
+            return
+        if response.stream is not None:
+            response.stream = compression.compress_stream(response.stream, encoding)
+        elif len(response.body) >= compression.MIN_COMPRESS_SIZE:
+            response.body = compression.compress(response.body, encoding)
+        else:
+            return
+        response.headers["Content-Encoding"] = encoding
+
+    def _call(self, handler, request):
+        try:
+            return handler(request)
+        except HTTPException as e:
+            return Response({"detail": e.detail}, e.status_code, headers=e.headers)
+        except models.ValidationError as e:
+            return Response({"detail": e.errors}, 422)
+        except PoolTimeoutError:
+            return Response({"detail": "Database busy, try again"}, 503, headers={"Retry-After": "1"})
+        except Exception:
+            logger.exception("Unhandled error in %s %s", request.method, request.path)
+            return Response({"detail": "Internal Server Error"}, 500)
+
+    # Health
+
+    def health_check(self, request):
+        return Response({"message": "Velan Properties API", "status": "healthy"})
+
+    def readiness(self, request):
+        """Readiness probe: 503 until startup has finished, with connection pool saturation"""
+        ready = self.ready.is_set()
+        return Response({
+            "status": "ready" if ready else "starting",
+            "ready": ready,
+            "startup_seconds": self.startup_seconds,
+            "pool": self.db.pool.stats()
+        }, 200 if ready else 503)
+
+    def metrics_export(self, request):
+        return Response(body=self.metrics.render().encode("utf-8"), content_type="text/plain; version=0.0.4")
+
+    # Contacts
+
+    def create_contact(self, request):
+        """Store a contact form submission exactly once.
+
+        A repeat of a submission, by Idempotency-Key header or by identical
+        content within the dedupe window, gets the original response back
+        (with Idempotent-Replayed: true) and is neither stored nor notified
+        again. A concurrent repeat waits for the original to finish, and is
+        processed itself if the original fails. New submissions are rate
+        limited per client IP and per email. A submission that fails (rate
+        limited or an error) releases its claims, so a retry is not kept
+        waiting for the failed one.
+        """
+        contact = models.new_contact(request.json())
+        fingerprint = models.contact_fingerprint(contact)
+        keys = [f"content:{fingerprint}"]
+        if request.headers.get("idempotency-key"):
+            keys.insert(0, f"key:{request.headers['idempotency-key']}")
+
+        claimed = []
+        try:
+            for key in keys:
+                entry, owner = self.contact_replays.claim(key, fingerprint)
+                while not owner and entry.fingerprint == fingerprint:
+                    payload = self.contact_replays.wait(entry, REPLAY_WAIT_TIMEOUT)
+                    if payload is not None or not entry.abandoned:
+                        break
+                    # The original failed (e.g. rate limited): process this one in its place
+                    entry, owner = self.contact_replays.claim(key, fingerprint)
+                if owner:
+                    claimed.append((key, entry))
+                    continue
+                if entry.fingerprint != fingerprint:
+                    raise HTTPException(422, [{"type": "value_error", "loc": ["header", "Idempotency-Key"],
+                                               "msg": "Idempotency-Key was already used for a different submission"}])
+                if payload is None:
+                    raise HTTPException(409, "An identical submission is still being processed; please retry",
+                                        headers={"Retry-After": "1"})
+                for _, owned in claimed:
+                    self.contact_replays.finish(owned, payload)
+                claimed = []
+                return Response(payload, headers={"Idempotent-Replayed": "true"})
+
+            self.check_contact_rate(request, contact)
+            self.db.contacts.insert_one(contact)
+            self.notifications.enqueue(contact)
+            payload = {
+                "success": True,
+                "message": "Thank you for your inquiry! We will contact you soon.",
+                "contact_id": contact["id"]
+            }
+            for _, entry in claimed:
+                self.contact_replays.finish(entry, payload)
+            claimed = []
+            return Response(payload)
+        finally:
+            for key, entry in claimed:
+                self.contact_replays.abandon(key, entry)
+
+    def client_ip(self, request):
+        forwarded = request.headers.get("x-forwarded-for")
+        if self.trust_forwarded_for and forwarded:
+            return forwarded.split(",")[0].strip()
+        return request.client
+
+    def check_contact_rate(self, request, contact):
+        """Take a token from the client IP's and the email's buckets, or raise 429"""
+        taken = []
+        for limiter, key in ((self.contact_ip_limiter, self.client_ip(request)),
+                             (self.contact_email_limiter, contact["email"].lower())):
+            if limiter is None:
+                continue
+            wait = limiter.acquire(key)
+            if wait:
+                for other, other_key in taken:
+                    other.refund(other_key)
+                raise HTTPException(429, "Too many submissions, please try again later",
+                                    headers={"Retry-After": str(math.ceil(wait))})
+            taken.append((limiter, key))
+
+    def list_contacts(self, request):
+        query = {"status": request.query["status"]} if request.query.get("status") else None
+        return self.paginate(request, self.db.contacts, query)
+
+    def update_contact(self, request):
+        contact_id = request.path_params["contact_id"]
+        updated = self.db.contacts.update_one(contact_id, models.contact_update(request.json()))
+        if updated is None:
+            raise HTTPException(404, "Contact not found")
+        return Response({"success": True, "message": "Contact updated successfully", "contact": updated})
+
+    # Properties
+
+    def property_query(self, request, status="active"):
+        """Build an indexed store query from the type, location, price and area filters.
+
+        Price bounds come from min_price/max_price or price_range=<min>-<max>
+        (either end may be left empty) and match the numeric price_value
+        column; price_unit=sale|rent separates outright prices from rents.
+        """
+        query = {}
+        if status:
+            query["status"] = status
+        if request.query.get("type"):
+            query["type"] = request.query["type"]
+        if request.query.get("location"):
+            query["location_key"] = models.normalize_location(request.query["location"])
+
+        low = request.float_param("min_price")
+        high = request.float_param("max_price")
+        price_range = request.query.get("price_range")
+        if price_range:
+            low_text, _, high_text = price_range.partition("-")
+            try:
+                low = float(low_text) if low_text.strip() else None
+                high = float(high_text) if high_text.strip() else None
+            except ValueError:
+                raise HTTPException(422, [{"type": "value_error", "loc": ["query", "price_range"],
+                                           "msg": "Expected <min>-<max>", "input": price_range}])
+        if low is not None or high is not None:
+            query["price_value"] = (low, high)
+        if request.query.get("price_unit"):
+            query["price_unit"] = request.query["price_unit"]
+
+        min_area = request.float_param("min_area")
+        max_area = request.float_param("max_area")
+        if min_area is not None or max_area is not None:
+            query["area_sqft"] = (min_area, max_area)
+        return query
+
+    def property_sort(self, request):
+        """Sort key and direction for the sort= parameter; listings without a value sort last.
+
+        The default newest-first order returns a None key so paginate can
+        use the created_at index.
+        """
+        sort = request.query.get("sort") or "newest"
+        if sort not in PROPERTY_SORTS:
+            raise HTTPException(422, [{"type": "enum", "loc": ["query", "sort"],
+                                       "msg": f"Input should be one of: {', '.join(PROPERTY_SORTS)}", "input": sort}])
+        field, descending = PROPERTY_SORTS[sort]
+        if field == "created_at":
+            return None, True
+        if descending:
+            return (lambda d: (d.get(field) is not None, d.get(field) or 0)), True
+        return (lambda d: (d.get(field) is None, d.get(field) or 0)), False
+
+    def list_properties(self, request):
+        return self.cached(request, self.listing_cache, lambda: self._list_properties(request))
+
+    def _list_properties(self, request):
+        sort_key, descending = self.property_sort(request)
+        return self.paginate(request, self.db.properties, self.property_query(request), sort_key, descending,
+                             self.property_fields(request))
+
+    def property_fields(self, request):
+        """Fields to return for view=<name> and/or fields=<a,b,...>, or None for whole documents.
+
+        The projection is applied inside the store, so unrequested fields
+        are never copied or serialized. id is always included.
+        """
+        names = set()
+        view = request.query.get("view")
+        if view:
+            if view not in models.PROPERTY_VIEWS:
+                raise HTTPException(422, [{"type": "enum", "loc": ["query", "view"],
+                                           "msg": f"Input should be one of: {', '.join(models.PROPERTY_VIEWS)}",
+                                           "input": view}])
+            names.update(models.PROPERTY_VIEWS[view])
+        if request.query.get("fields"):
+            requested = {name.strip() for name in request.query["fields"].split(",") if name.strip()}
+            unknown = sorted(requested - set(models.PROPERTY_FIELDS))
+            if unknown:
+                raise HTTPException(422, [{"type": "value_error", "loc": ["query", "fields"],
+                                           "msg": f"Unknown fields: {', '.join(unknown)}",
+                                           "input": request.query["fields"]}])
+            names.update(requested)
+        if not names:
+            return None
+        names.add("id")
+        return tuple(field for field in models.PROPERTY_FIELDS if field in names)
+
+    def search_properties(self, request):
+        return self.cached(request, self.listing_cache, lambda: self._search_properties(request))
+
+    def _search_properties(self, request):
+        """Rank active listings for the free-text q parameter, best match first.
+
+        Accepts the same filters as the listing plus limit/offset; the
+        response is a plain list of properties like GET /properties.
+        """
+        text = request.query.get("q")
+        if text is None or not text.strip():
+            raise HTTPException(422, [{"type": "missing", "loc": ["query", "q"], "msg": "Field required"}])
+        limit = request.int_param("limit", 20, ge=1, le=100)
+        offset = request.int_param("offset", 0, ge=0)
+        query = self.property_query(request)
+        ranked = self.property_search.search(text)
+        documents = self.db.properties.find_ids((document_id for document_id, _ in ranked), query,
+                                                skip=offset, limit=limit, fields=self.property_fields(request))
+        return Response(documents)
+
+    def admin_list_properties(self, request):
+        query = self.property_query(request, status=request.query.get("status"))
+        sort_key, descending = self.property_sort(request)
+        return self.paginate(request, self.db.properties, query, sort_key, descending, self.property_fields(request))
+
+    def bulk_import_properties(self, request):
+        """Import properties from a streamed NDJSON (default) or CSV (Content-Type: text/csv) body.
+
+        Each row is validated on its own and valid rows are written in
+        batches; the response reports the outcome of every row.
+        """
+        if "csv" in request.headers.get("content-type", ""):
+            rows = bulk.read_csv(request.stream)
+        else:
+            rows = bulk.read_ndjson(request.stream)
+
+        results = []
+        batch = []
+        for row, payload in enumerate(rows, start=1):
+            try:
+                if isinstance(payload, models.ValidationError):
+                    raise payload
+                document = models.new_property(payload)
+            except models.ValidationError as e:
+                results.append({"row": row, "status": "error", "errors": e.errors})
+                continue
+            batch.append(document)
+            results.append({"row": row, "status": "created", "property_id": document["id"]})
+            if len(batch) >= BULK_BATCH_SIZE:
+                self.db.properties.insert_many(batch)
+                self.fill_image_variants(batch)
+                batch = []
+        if batch:
+            self.db.properties.insert_many(batch)
+            self.fill_image_variants(batch)
+
+        created = sum(1 for result in results if result["status"] == "created")
+        return Response({
+            "success": created == len(results),
+            "total": len(results),
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        })
+
+    def export_properties(self, request):
+        """Stream every property as NDJSON (default) or CSV (format=csv), one index page at a time"""
+        export_format = request.query.get("format") or "ndjson"
+        if export_format not in ("ndjson", "csv"):
+            raise HTTPException(422, [{"type": "enum", "loc": ["query", "format"],
+                                       "msg": "Input should be 'ndjson' or 'csv'", "input": export_format}])
+        query = {"status": request.query["status"]} if request.query.get("status") else None
+
+        def documents():
+            position = None
+            while True:
+                page, position = self.db.properties.find_page(query, position=position, limit=EXPORT_PAGE_SIZE)
+                yield from page
+                if position is None:
+                    return
+
+        if export_format == "csv":
+            return Response(stream=bulk.write_csv(documents()), content_type="text/csv; charset=utf-8",
+                            headers={"Content-Disposition": 'attachment; filename="properties.csv"'})
+        return Response(stream=bulk.write_ndjson(documents()), content_type="application/x-ndjson")
+
+    def get_property(self, request):
+        document = self.db.properties.find_one(request.path_params["property_id"])
+        if document is None:
+            raise HTTPException(404, "Property not found")
+        return Response(document)
+
+    def create_property(self, request):
+        document = models.new_property(request.json())
+        document["image_variants"] = self.image_variants(document["image"])
+        self.db.properties.insert_one(document)
+        self.fill_image_variants([document])
+        return Response({
+            "success": True,
+            "message": "Property created successfully",
+            "property_id": document["id"],
+            "property": document
+        })
+
+    def update_property(self, request):
+        property_id = request.path_params["property_id"]
+        changes = models.property_update(request.json())
+        if "image" in changes:
+            changes["image_variants"] = self.image_variants(changes["image"])
+        updated = self.db.properties.update_one(
+            property_id, lambda stored: {**changes, **models.numeric_changes(stored, changes)})
+        if updated is None:
+            raise HTTPException(404, "Property not found")
+        self.fill_image_variants([updated])
+        return Response({"success": True, "message": "Property updated successfully", "property": updated})
+
+    def delete_property(self, request):
+        if self.db.properties.delete_one(request.path_params["property_id"]) is None:
+            raise HTTPException(404, "Property not found")
+        return Response({"success": True, "message": "Property deleted successfully"})
+
+    # Images
+
+    def image_manifest(self, url):
+        """Pipeline manifest for a listing image URL, or None if it was never submitted"""
+        key = models.image_key(url)
+        image_id = key[len("image:"):] if key.startswith("image:") else images.ImageStore.id_for(url=key)
+        return self.images.get(image_id)
+
+    def image_variants(self, url):
+        """Variant URLs for a listing image by format, widest last, or None until they exist"""
+        manifest = self.image_manifest(url)
+        if manifest is None or manifest["status"] != "ready":
+            return None
+        return self.variant_urls(manifest)
+
+    def variant_urls(self, manifest):
+        variants = {}
+        for variant in manifest["variants"]:
+            variants.setdefault(variant["format"], []).append(
+                {"width": variant["width"], "url": f"{API_PREFIX}/images/files/{variant['file']}"})
+        return variants
+
+    def fill_image_variants(self, documents):
+        """Attach variants that became ready while documents were being written.
+
+        Images that finish later are attached by on_image_ready instead.
+        """
+        for document in documents:
+            if document.get("image_variants") is None:
+                variants = self.image_variants(document["image"])
+                if variants:
+                    self.db.properties.update_one(document["id"], {"image_variants": variants})
+
+    def on_image_ready(self, manifest):
+        """Image pipeline callback: give every listing using the image its variant URLs"""
+        keys = [f"image:{manifest['image_id']}"]
+        if manifest.get("source_url"):
+            keys.append(manifest["source_url"])
+        variants = self.variant_urls(manifest)
+        for key in keys:
+            for document in self.db.properties.find({"image_key": key}, fields=("id",)):
+                self.db.properties.update_one(document["id"], {"image_variants": variants})
+
+    def image_status(self, manifest):
+        status = {
+            "image_id": manifest["image_id"],
+            "status": manifest["status"],
+            "url": f"{API_PREFIX}/images/{manifest['image_id']}",
+            "source_url": manifest.get("source_url"),
+            "variants": [dict(variant, url=f"{API_PREFIX}/images/files/{variant['file']}")
+                         for variant in manifest["variants"]]
+        }
+        if manifest.get("error"):
+            status["error"] = manifest["error"]
+        return status
+
+    def upload_image(self, request):
+        """Queue an image for thumbnailing, from a raw image body or JSON {"url": ...}.
+
+        Answers 202 while the variants are being rendered in the process
+        pool (poll GET /images/{image_id}), or 200 when the same source was
+        processed before. Use the returned url as a property's image to
+        have listings carry the variant URLs.
+        """
+        if not images.ImageStore.available():
+            raise HTTPException(503, "Image processing is not available on this server")
+        if "json" in request.headers.get("content-type", ""):
+            payload = request.json()
+            url = payload.get("url") if isinstance(payload, dict) else None
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                raise HTTPException(422, [{"type": "value_error", "loc": ["body", "url"],
+                                           "msg": "Expected an http(s) image URL", "input": url}])
+            manifest = self.images.submit(url=url)
+        else:
+            data = request.stream.read(images.MAX_SOURCE_BYTES + 1)
+            if len(data) > images.MAX_SOURCE_BYTES:
+                raise HTTPException(413, f"Images are limited to {images.MAX_SOURCE_BYTES} bytes")
+            if not images.looks_like_image(data):
+                raise HTTPException(415, "Expected a PNG, JPEG, GIF or WebP image")
+            manifest = self.images.submit(data=data)
+        return Response(self.image_status(manifest), 202 if manifest["status"] == "pending" else 200)
+
+    def get_image(self, request):
+        manifest = self.images.get(request.path_params["image_id"])
+        if manifest is None:
+            raise HTTPException(404, "Image not found")
+        return Response(self.image_status(manifest))
+
+    def image_file(self, request):
+        """Serve a variant; its name is a content hash, so it can be cached forever"""
+        name = request.path_params["name"]
+        data = self.images.read(name)
+        if data is None:
+            raise HTTPException(404, "Image not found")
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": f'"{name}"'}
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, body=b"", headers=headers)
+        return Response(body=data, content_type=images.content_type(name), headers=headers)
+
+    # Admin
+
+    # Market analytics, served from aggregates maintained on every property write
+
+    def analytics_overview(self, request):
+        """Market-wide active listing counts, type mix and median price per sq ft by listing type"""
+        return Response(self.locality_aggregates.overview())
+
+    def analytics_localities(self, request):
+        """Every locality's summary, sorted by listings (default), a median_*_per_sqft key or locality"""
+        sort = request.query.get("sort") or "listings"
+        if sort not in analytics.SORT_KEYS:
+            raise HTTPException(422, [{"type": "enum", "loc": ["query", "sort"],
+                                       "msg": "Input should be one of " + ", ".join(map(repr, analytics.SORT_KEYS)),
+                                       "input": sort}])
+        limit = request.int_param("limit", None, ge=1, le=1000)
+        localities = self.locality_aggregates.localities(sort, limit)
+        return Response({"localities": localities, "count": len(localities)})
+
+    def analytics_locality(self, request):
+        summary = self.locality_aggregates.locality(unquote(request.path_params["locality"]))
+        if summary is None:
+            raise HTTPException(404, "Locality not found")
+        return Response(summary)
+
+    # Change feed
+
+    def change_collections(self, request, allowed=CHANGE_COLLECTIONS):
+        """The collection=contacts,properties filter, limited to allowed"""
+        raw = request.query.get("collection")
+        if not raw:
+            return set(allowed)
+        names = {name.strip() for name in raw.split(",") if name.strip()}
+        unknown = names.difference(allowed)
+        if unknown:
+            expected = " or ".join(f"'{name}'" for name in allowed)
+            raise HTTPException(422, [{"type": "enum", "loc": ["query", "collection"],
+                                       "msg": f"Input should be {expected}", "input": raw}])
+        return names
+
+    def list_changes(self, request):
+        """Property changes after since; the public feed for listing mirrors"""
+        return self._list_changes(request, self.change_collections(request, PUBLIC_CHANGE_COLLECTIONS))
+
+    def admin_list_changes(self, request):
+        return self._list_changes(request, self.change_collections(request))
+
+    def stream_changes(self, request):
+        return self._stream_changes(request, self.change_collections(request, PUBLIC_CHANGE_COLLECTIONS))
+
+    def admin_stream_changes(self, request):
+        return self._stream_changes(request, self.change_collections(request))
+
+    def _list_changes(self, request, collections):
+        """Changes to collections after since, oldest first.
+
+        Pass the returned last_seq as since to read on; has_more says
+        whether to do so straight away. With reset set, the entries start
+        from zero and the client must discard its copy and rebuild.
+        """
+        since = request.int_param("since", 0, ge=0)
+        limit = request.int_param("limit", 100, ge=1, le=1000)
+        entries, head, reset = self.changes.read(since, limit, collections)
+        # A short page means everything up to head was read, even entries the filter skipped
+        last_seq = entries[-1]["seq"] if len(entries) == limit else head
+        return Response({"changes": entries, "last_seq": last_seq, "head": head,
+                         "has_more": last_seq < head, "reset": reset})
+
+    def _stream_changes(self, request, collections):
+        """Follow the changes to collections as server-sent events.
+
+        Starts after since (or the Last-Event-ID an EventSource sends when
+        reconnecting). Each event's id is its seq; a "reset" event tells
+        the client to discard its copy before the replay from zero.
+        """
+        since = request.int_param("since", 0, ge=0)
+        last_event_id = request.headers.get("last-event-id", "")
+        if last_event_id.isdigit():
+            since = int(last_event_id)
+
+        def events():
+            position = since
+            yield b"retry: %d\n\n" % CHANGE_STREAM_RETRY_MS
+            while True:
+                entries, head, reset = self.changes.read(position, 100, collections)
+                if reset:
+                    yield b"event: reset\ndata: {}\n\n"
+                for entry in entries:
+                    yield b"id: %d\nevent: change\ndata: %s\n\n" % (entry["seq"], dumps(entry))
+                position = entries[-1]["seq"] if len(entries) == 100 else head
+                if position < head:
+                    continue
+                if not self.changes.wait(position, CHANGE_STREAM_HEARTBEAT):
+                    if self.changes.closed:
+                        return
+                    yield b": keepalive\n\n"
+
+        return Response(stream=events(), content_type="text/event-stream",
+                        headers={"Cache-Control": "no-cache"})
+
+    def change_stats(self, request):
+        return Response({"changes": self.changes.stats()})
+
+    def compact_changes(self, request):
+        return Response({"success": True, "compaction": self.changes.compact()})
+
+    def cache_stats(self, request):
+        return Response({"listing_cache": self.listing_cache.stats()})
+
+    def notification_stats(self, request):
+        return Response({"notifications": self.notifications.stats(),
+                         "dead_letters": self.notifications.dead_letter_summary()})
+
+    def retry_notifications(self, request):
+        return Response({"success": True, "requeued": self.notifications.retry_dead_letters()})
+
+    def reconcile_counters_now(self, request):
+        return Response({"success": True, "drift": self.reconcile_counters()})
+
+    def admin_dashboard(self, request):
+        """Dashboard stats from incrementally maintained counters, O(1) in collection size"""
+        contacts = self.contact_counters.snapshot()
+        contacts["new"] = self.contact_counters.get("status", "new")
+        properties = self.property_counters.snapshot()
+        properties["active"] = self.property_counters.get("status", "active")
+        return Response({"contacts": contacts, "properties": properties})
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    api = None  # set per server by LocalBackend
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            raw_body = _ChunkedBody(self.rfile)
+        else:
+            raw_body = _FixedLengthBody(self.rfile, int(self.headers.get("Content-Length") or 0))
+        request = Request(
+            method=self.command,
+            path=url.path,
+            query={k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()},
+            headers={k.lower(): v for k, v in self.headers.items()},
+            stream=io.BufferedReader(raw_body),
+            client=self.client_address[0]
+        )
+        response = self.api.handle(request)
+        drained = self._drain(request.stream)
+
+        self.send_response(response.status_code)
+        if not drained:
+            self.send_header("Connection", "close")
+        if response.status_code != 304:
+            self.send_header("Content-Type", response.content_type)
+            if response.stream is None:
+                self.send_header("Content-Length", str(len(response.body)))
+            else:
+                self.send_header("Transfer-Encoding", "chunked")
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        sent = 0
+        if self.command != "HEAD" and response.status_code != 304:
+            if response.stream is None:
+                self.wfile.write(response.body)
+                sent = len(response.body)
+            else:
+                try:
+                    for chunk in response.stream:
+                        if chunk:
+                            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                            sent += len(chunk)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client went away mid-stream, e.g. an event stream being closed
+                    self.close_connection = True
+                finally:
+                    response.stream.close()
+        self.api.metrics.observe_payload(self.command, response.route, raw_body.bytes_read, sent)
+
+    @staticmethod
+    def _drain(stream):
+        """Discard what the handler left of the body so the connection can be reused.
+
+        Reads fixed-size chunks up to DRAIN_LIMIT; returns False if the body
+        goes on past that, in which case the connection must be closed.
+        """
+        drained = 0
+        while drained <= DRAIN_LIMIT:
+            chunk = stream.read(DRAIN_CHUNK_SIZE)
+            if not chunk:
+                return True
+            drained += len(chunk)
+        return False
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalBackend:
+    """Runs a LocalAPI on a loopback HTTP server in a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, api=None):
+        self.api = api or LocalAPI()
+        handler = type("LocalAPIRequestHandler", (_RequestHandler,), {"api": self.api})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+        self._startup = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self, wait=True):
+        """Start serving right away and run API startup in the background.
+
+        With wait (the default) this returns once the API is ready;
+        otherwise callers can watch GET /api/health until it is.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, name="local-backend", daemon=True)
+        self._thread.start()
+        self._startup = threading.Thread(target=self._start_api, name="local-backend-startup", daemon=True)
+        self._startup.start()
+        if wait:
+            self._startup.join()
+        return self
+
+    def _start_api(self):
+        try:
+            self.api.startup()
+        except Exception:
+            logger.exception("API startup failed")
+            return
+        self.api.start_jobs()
+
+    def stop(self):
+        if self._startup is not None:
+            self._startup.join()
+        self.api.stop_jobs()
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,517 @@
+"""
+In-memory document store that stands in for MongoDB.
+
+Each collection keeps documents keyed by ``id`` and hands out copies, so
+callers can never mutate stored state behind the store's back. Secondary
+indexes are maintained on every write and used by ``find``/``count`` to
+avoid scanning the whole collection.
+"""
+
+import bisect
+import copy
+import functools
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+
+
+class HashIndex:
+    """Equality index: key value -> set of document ids.
+
+    A key function that returns a list makes the index multikey, like a
+    MongoDB index on an array field.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._entries = {}
+
+    def _values(self, document):
+        value = self.key(document)
+        return value if isinstance(value, (list, tuple, set)) else [value]
+
+    def add(self, document):
+        for value in self._values(document):
+            self._entries.setdefault(value, set()).add(document["id"])
+
+    def remove(self, document):
+        for value in self._values(document):
+            ids = self._entries.get(value)
+            if ids is not None:
+                ids.discard(document["id"])
+                if not ids:
+                    del self._entries[value]
+
+    def lookup(self, value):
+        return self._entries.get(value, set())
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _entry_value(entry):
+    return entry[0]
+
+
+class SortedIndex:
+    """Ordered index over a numeric key, for range queries"""
+
+    def __init__(self, key):
+        self.key = key
+        self._entries = []
+
+    def add(self, document):
+        value = self.key(document)
+        if value is not None:
+            bisect.insort(self._entries, (value, document["id"]))
+
+    def remove(self, document):
+        value = self.key(document)
+        if value is None:
+            return
+        position = bisect.bisect_left(self._entries, (value, document["id"]))
+        if position < len(self._entries) and self._entries[position] == (value, document["id"]):
+            del self._entries[position]
+
+    def lookup(self, value):
+        return self.range(value, value)
+
+    def _span(self, low, high):
+        start = 0 if low is None else bisect.bisect_left(self._entries, low, key=_entry_value)
+        end = len(self._entries) if high is None else bisect.bisect_right(self._entries, high, key=_entry_value)
+        return start, end
+
+    def range(self, low=None, high=None):
+        start, end = self._span(low, high)
+        return {document_id for _, document_id in self._entries[start:end]}
+
+    def count(self, low=None, high=None):
+        """Number of documents in range, without collecting their ids"""
+        start, end = self._span(low, high)
+        return max(end - start, 0)
+
+    def clear(self):
+        self._entries.clear()
+
+    def walk(self, position=None, descending=True):
+        """Yield (value, id) entries in order, starting strictly past a (value, id) position"""
+        if descending:
+            end = len(self._entries) if position is None else bisect.bisect_left(self._entries, position)
+            for i in range(end - 1, -1, -1):
+                yield self._entries[i]
+        else:
+            start = 0 if position is None else bisect.bisect_right(self._entries, position)
+            for i in range(start, len(self._entries)):
+                yield self._entries[i]
+
+
+def _project(documents, fields):
+    """Copies of documents for the caller, restricted to fields when given"""
+    if fields is None:
+        return copy.deepcopy(documents)
+    return [copy.deepcopy({field: document[field] for field in fields if field in document})
+            for document in documents]
+
+
+class PoolTimeoutError(Exception):
+    """No pooled connection became free within the pool's wait timeout"""
+
+
+class ConnectionPool:
+    """Bounded pool of simulated database connections, like a driver's maxPoolSize.
+
+    Every collection operation checks out a connection for its duration;
+    when all size connections are busy, callers queue until one is
+    returned or wait_timeout passes. latency adds a simulated network
+    round trip to each operation and connect_latency the cost of opening
+    a connection, so pool sizing behaves as it would against a remote
+    server. Connections are opened on demand, or up front by warm().
+    """
+
+    def __init__(self, size=100, min_size=0, wait_timeout=None, latency=0.0, connect_latency=0.0):
+        self.size = size
+        self.min_size = min(min_size, size)
+        self.wait_timeout = wait_timeout
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self._condition = threading.Condition()
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    def warm(self):
+        """Open connections up to min_size ahead of the first request"""
+        with self._condition:
+            missing = max(0, self.min_size - self.open)
+            self.open += missing
+        time.sleep(missing * self.connect_latency)
+        return missing
+
+    def _checkout(self):
+        """Reserve a connection; returns True when a new one has to be opened"""
+        started = time.monotonic()
+        with self._condition:
+            self.waiting += 1
+            try:
+                while self.in_use >= self.size:
+                    remaining = None
+                    if self.wait_timeout is not None:
+                        remaining = self.wait_timeout - (time.monotonic() - started)
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            raise PoolTimeoutError(f"No connection free within {self.wait_timeout}s")
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            opening = self.in_use >= self.open
+            if opening:
+                self.open += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.checkouts += 1
+            self.wait_seconds += time.monotonic() - started
+            return opening
+
+    def _checkin(self):
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        opening = self._checkout()
+        try:
+            if opening and self.connect_latency:
+                time.sleep(self.connect_latency)
+            if self.latency:
+                time.sleep(self.latency)
+            yield
+        finally:
+            self._checkin()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "size": self.size,
+                "min_size": self.min_size,
+                "open": self.open,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "saturation": self.in_use / self.size,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0
+            }
+
+
+def _operation(method):
+    """Run a collection operation on a pooled connection and report its duration to the metrics registry.
+
+    The reported time includes waiting for a connection, since that is
+    part of what the operation costs the caller.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            if self.pool is None:
+                return method(self, *args, **kwargs)
+            with self.pool.connection():
+                return method(self, *args, **kwargs)
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_db(self.name, method.__name__, time.perf_counter() - started)
+    return wrapper
+
+
+class Collection:
+    """A thread-safe collection of documents keyed by ``id``"""
+
+    def __init__(self, name):
+        self.name = name
+        self.metrics = None
+        self.pool = None
+        self._documents = {}
+        self._indexes = {}
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    def add_listener(self, listener):
+        """Call listener(before, after) after every write, inside the write lock.
+
+        before is None for inserts and after is None for deletes. Listeners
+        see writes in commit order and must be quick; they must not mutate
+        the documents they are given.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, before, after):
+        for listener in self._listeners:
+            listener(before, after)
+
+    @_operation
+    def scan(self, reducer):
+        """Run reducer over all documents while holding the lock, for consistent snapshots"""
+        with self._lock:
+            return reducer(self._documents.values())
+
+    def create_index(self, name, key=None, ordered=False):
+        """Index documents by key (defaults to the field called name).
+
+        Queries passed to find/count use the index registered under the
+        same name; ordered indexes also answer (low, high) range queries.
+        """
+        key = key or (lambda document, field=name: document.get(field))
+        index = SortedIndex(key) if ordered else HashIndex(key)
+        with self._lock:
+            for document in self._documents.values():
+                index.add(document)
+            self._indexes[name] = index
+
+    def _index_add(self, document):
+        for index in self._indexes.values():
+            index.add(document)
+
+    def _index_remove(self, document):
+        for index in self._indexes.values():
+            index.remove(document)
+
+    def _candidates(self, query):
+        """Plan a query: drive it from the smallest matching index entry, filter the rest.
+
+        Returns (candidate ids or None for a full scan, remaining conditions).
+        Every indexed condition is sized first (a set length for equality,
+        two bisects for a range), and only the smallest is turned into ids;
+        the other conditions are checked per candidate document, which is
+        cheaper than intersecting them when they match a large share of
+        the collection (e.g. type).
+        """
+        driver = None
+        remaining = {}
+        for name, condition in (query or {}).items():
+            index = self._indexes.get(name)
+            if index is None:
+                remaining[name] = condition
+                continue
+            if isinstance(condition, tuple):
+                size = index.count(*condition)
+            elif isinstance(index, SortedIndex):
+                size = index.count(condition, condition)
+            else:
+                size = len(index.lookup(condition))
+            if driver is None or size < driver[0]:
+                if driver is not None:
+                    remaining[driver[1]] = driver[2]
+                driver = (size, name, condition, index)
+                if size == 0:
+                    return set(), {}
+            else:
+                remaining[name] = condition
+
+        if driver is None:
+            return None, remaining
+        _, name, condition, index = driver
+        candidates = index.range(*condition) if isinstance(condition, tuple) else index.lookup(condition)
+        return candidates, remaining
+
+    def _matches(self, document, conditions, predicate):
+        for name, condition in conditions.items():
+            index = self._indexes.get(name)
+            value = index.key(document) if index is not None else document.get(name)
+            if isinstance(condition, tuple):
+                low, high = condition
+                if value is None or (low is not None and value < low) or (high is not None and value > high):
+                    return False
+            elif isinstance(value, (list, tuple, set)):
+                if condition not in value:
+                    return False
+            elif value != condition:
+                return False
+        return predicate is None or predicate(document)
+
+    def _select(self, query, predicate):
+        candidates, remaining = self._candidates(query)
+        if candidates is None:
+            documents = self._documents.values()
+        else:
+            documents = (self._documents[document_id] for document_id in candidates)
+        return [d for d in documents if self._matches(d, remaining, predicate)]
+
+    @_operation
+    def insert_one(self, document):
+        with self._lock:
+            document = copy.deepcopy(document)
+            self._documents[document["id"]] = document
+            self._index_add(document)
+            self._notify(None, document)
+        return document["id"]
+
+    @_operation
+    def insert_many(self, documents):
+        """Insert a batch under a single lock acquisition"""
+        with self._lock:
+            for document in documents:
+                document = copy.deepcopy(document)
+                self._documents[document["id"]] = document
+                self._index_add(document)
+                self._notify(None, document)
+        return [document["id"] for document in documents]
+
+    @_operation
+    def find_one(self, document_id):
+        with self._lock:
+            document = self._documents.get(document_id)
+            return copy.deepcopy(document) if document is not None else None
+
+    @_operation
+    def find_ids(self, ids, query=None, skip=0, limit=None, fields=None):
+        """Documents for ids, in the order given, that match query; unknown ids are skipped.
+
+        Stops as soon as the slice is filled, so callers can pass a long
+        ranked list of ids and only pay for the page they return.
+        """
+        with self._lock:
+            documents = []
+            for document_id in ids:
+                document = self._documents.get(document_id)
+                if document is None or not self._matches(document, query or {}, None):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                documents.append(document)
+                if limit is not None and len(documents) >= limit:
+                    break
+            return _project(documents, fields)
+
+    @_operation
+    def find(self, query=None, predicate=None, sort_key=None, reverse=False, skip=0, limit=None, fields=None):
+        """Return matching documents, optionally sorted and sliced.
+
+        query maps field or index names to a value (equality) or a
+        (low, high) tuple (inclusive range, either end may be None).
+        fields, when given, limits the returned documents to those fields.
+        """
+        with self._lock:
+            documents = self._select(query, predicate)
+            if sort_key is not None:
+                documents.sort(key=sort_key, reverse=reverse)
+            end = skip + limit if limit is not None else None
+            return _project(documents[skip:end], fields)
+
+    @_operation
+    def find_page(self, query=None, order="created_at", position=None, limit=50, descending=True, skip=0,
+                  fields=None):
+        """Keyset pagination over the ordered index called order.
+
+        position is the (value, id) key of the last document of the previous
+        page, or None for the first page. Returns (documents, next_position);
+        next_position is None once there are no further matches. Unlike
+        skip/limit this never touches rows before the page, and rows
+        inserted or deleted elsewhere cannot shift the page boundaries.
+        skip is only there so offset pagination can share the index walk.
+        """
+        with self._lock:
+            index = self._indexes[order]
+            candidates, remaining = self._candidates(query)
+            if candidates is not None and len(candidates) * 8 < len(self._documents):
+                # Selective query: order the few matches directly
+                keyed = []
+                for document_id in candidates:
+                    document = self._documents[document_id]
+                    key = (index.key(document), document_id)
+                    if position is not None and ((key >= position) if descending else (key <= position)):
+                        continue
+                    if self._matches(document, remaining, None):
+                        keyed.append((key, document))
+                select = heapq.nlargest if descending else heapq.nsmallest
+                page = select(skip + limit + 1, keyed, key=lambda item: item[0])[skip:]
+            else:
+                # Broad query: walk the index from the cursor until the page is full
+                page = []
+                for key in index.walk(position, descending):
+                    if candidates is not None and key[1] not in candidates:
+                        continue
+                    document = self._documents[key[1]]
+                    if self._matches(document, remaining, None):
+                        if skip:
+                            skip -= 1
+                            continue
+                        page.append((key, document))
+                        if len(page) > limit:
+                            break
+            next_position = page[limit - 1][0] if len(page) > limit else None
+            return _project([document for _, document in page[:limit]], fields), next_position
+
+    @_operation
+    def update_one(self, document_id, changes):
+        """Apply changes ($set semantics); returns the updated document or None.
+
+        changes may also be a function of the stored document returning the
+        changes, for updates that depend on it; it runs under the lock.
+        """
+        with self._lock:
+            document = self._documents.get(document_id)
+            if document is None:
+                return None
+            if callable(changes):
+                changes = changes(document)
+            before = dict(document)
+            self._index_remove(document)
+            document.update(copy.deepcopy(changes))
+            self._index_add(document)
+            self._notify(before, document)
+            return copy.deepcopy(document)
+
+    @_operation
+    def delete_one(self, document_id):
+        """Remove a document; returns the deleted document or None"""
+        with self._lock:
+            document = self._documents.pop(document_id, None)
+            if document is not None:
+                self._index_remove(document)
+                self._notify(document, None)
+            return document
+
+    @_operation
+    def count(self, query=None, predicate=None):
+        with self._lock:
+            if query is None and predicate is None:
+                return len(self._documents)
+            return len(self._select(query, predicate))
+
+    def clear(self):
+        with self._lock:
+            documents = list(self._documents.values())
+            self._documents.clear()
+            for index in self._indexes.values():
+                index.clear()
+            for document in documents:
+                self._notify(document, None)
+
+
+class MemoryDatabase:
+    """The collections the Velan Properties API uses, sharing one connection pool.
+
+    Pool arguments are passed to ConnectionPool; the defaults match the
+    async MongoDB driver's (100 connections, opened on demand).
+    """
+
+    def __init__(self, pool_size=100, min_pool_size=0, wait_timeout=None, latency=0.0, connect_latency=0.0):
+        self.pool = ConnectionPool(pool_size, min_pool_size, wait_timeout, latency, connect_latency)
+        self.contacts = Collection("contacts")
+        self.properties = Collection("properties")
+        for collection in (self.contacts, self.properties):
+            collection.pool = self.pool
+
+    def instrument(self, metrics):
+        """Time every collection operation with a MetricsRegistry"""
+        for collection in (self.contacts, self.properties):
+            collection.metrics = metrics